@@ -0,0 +1,562 @@
+"""
+HTTP/WebSocket API
+REST endpoints for sessions, volume, mute, batches and hotkeys, plus a WebSocket that pushes changes
+
+    GET    /api/                         health check
+    GET    /api/sessions                 every session with volume and mute (?refresh=1 rescans)
+    GET    /api/sessions/{app}           one session
+    PUT    /api/sessions/{app}/volume    {"volume": 0.5} or {"delta": -0.1}
+    PUT    /api/sessions/{app}/mute      {"muted": true} or {"toggle": true}
+    POST   /api/batch                    {"operations": [{"op": "volume", "app": ..., "volume": ...}, ...]}
+    GET    /api/hotkeys                  hotkey mappings
+    POST   /api/hotkeys                  {"hotkey": ..., "app": ..., "action": ..., "step": 0.1}, replaces an existing mapping
+    DELETE /api/hotkeys/{hotkey}
+    GET    /api/ws                       snapshot, then session_added/session_removed/volume/mute/hotkeys deltas
+
+PUT, POST and DELETE requests need "Authorization: Bearer <token>", /api/ws takes it
+as ?token=. The token is new on every run and written to a file only the user can
+read (control_server.default_token_path()). Request bodies must be application/json,
+and browsers may only connect from the origins in CORS_ORIGINS (the frontend dev
+server by default).
+"""
+
+import os
+import hmac
+import math
+import secrets
+import asyncio
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from task_pool import init_com_for_thread
+from control_server import default_token_path
+from hotkey_manager import ACTIONS
+
+try:
+    from aiohttp import web, WSMsgType
+except ImportError:
+    # The API is optional, HotVolume runs without it
+    web = None
+    WSMsgType = None
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api'
+DEFAULT_PORT = 8001
+
+# Browser origins allowed unless CORS_ORIGINS says otherwise: the frontend's dev server
+DEFAULT_CORS_ORIGINS = ['http://localhost:3000']
+
+# Methods that change state and need the token
+TOKEN_METHODS = ('PUT', 'POST', 'DELETE')
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _rounded(volume: Optional[float]) -> Optional[float]:
+    """Volumes read back from the audio API differ in the last bits from what was written"""
+    return None if volume is None else round(volume, 4)
+
+def _volume_from(body: Dict, current: Optional[float]) -> float:
+    """Read an absolute "volume" or relative "delta" from a request body"""
+    try:
+        if 'volume' in body:
+            volume = float(body['volume'])
+        elif 'delta' in body:
+            if current is None:
+                raise ApiError(404, "app has no audio session")
+            volume = current + float(body['delta'])
+        else:
+            raise ApiError(400, "expected \"volume\" or \"delta\"")
+    except (TypeError, ValueError):
+        raise ApiError(400, "volume must be a number")
+    return max(0.0, min(1.0, volume))
+
+class ApiServer:
+    def __init__(self, audio_controller, hotkey_manager=None, host: str = '127.0.0.1',
+                 port: int = DEFAULT_PORT, cors_origins: Optional[List[str]] = None, metrics_registry=None,
+                 token: Optional[str] = None, token_path: Optional[str] = None):
+        """Initialize the API server, start() runs it on its own event loop thread
+        
+        With metrics_registry set, GET /metrics serves it in Prometheus text format.
+        start() writes the token to token_path and stop() removes it. WebSocket
+        clients only hear about changes made outside HotVolume once
+        audio_controller.start_session_notifications() has been called.
+        """
+        if web is None:
+            raise ImportError("aiohttp is required for the HTTP API (pip install -r requirements-api.txt)")
+        
+        self.audio_controller = audio_controller
+        self.hotkey_manager = hotkey_manager
+        self.metrics_registry = metrics_registry
+        self.host = host
+        self.port = port
+        if cors_origins is None:
+            configured = os.environ.get('CORS_ORIGINS')
+            cors_origins = [origin.strip() for origin in configured.split(',')] if configured else DEFAULT_CORS_ORIGINS
+        if '*' in cors_origins:
+            # Any web page could drive the volume, and with the token in a URL read it too
+            logger.warning("Ignoring \"*\" in CORS_ORIGINS, list the allowed origins instead")
+        self.cors_origins = [origin for origin in cors_origins if origin and origin != '*']
+        self.token = token or secrets.token_urlsafe(32)
+        self.token_path = token_path or default_token_path()
+        
+        # Audio and config calls block, so they run here instead of on the event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="hotvolume-api", initializer=init_com_for_thread
+        )
+        self.loop = None
+        self.thread = None
+        self.runner = None
+        self.websockets = set()
+        self._started = threading.Event()
+        self._stopping = None
+        
+        # Last state pushed to WebSocket clients: app -> {'volume', 'muted'}
+        self.state: Dict[str, Dict] = {}
+    
+    # Lifecycle
+    
+    def start(self, timeout: float = 5.0) -> bool:
+        """Start serving on a background thread"""
+        self.thread = threading.Thread(target=self._run, name="hotvolume-api-loop", daemon=True)
+        self.thread.start()
+        self._started.wait(timeout)
+        return self.runner is not None
+    
+    def stop(self, timeout: float = 5.0):
+        """Close client connections and stop the event loop"""
+        if self.loop and self._stopping and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stopping.set)
+        if self.thread:
+            self.thread.join(timeout)
+        self.executor.shutdown(wait=False)
+    
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve())
+        except Exception as e:
+            logger.error(f"API server stopped with an error: {e}")
+        finally:
+            self._started.set()
+            self.loop.close()
+    
+    async def serve(self):
+        """Serve until stop() is called"""
+        self._stopping = asyncio.Event()
+        
+        self.runner = web.AppRunner(self.create_app())
+        await self.runner.setup()
+        try:
+            await web.TCPSite(self.runner, self.host, self.port).start()
+        except OSError as e:
+            logger.error(f"Could not start API server on {self.host}:{self.port}: {e}")
+            await self.runner.cleanup()
+            self.runner = None
+            return
+        
+        try:
+            self._write_token()
+        except OSError as e:
+            logger.error(f"Could not write API token to {self.token_path}: {e}")
+            await self.runner.cleanup()
+            self.runner = None
+            return
+        
+        logger.info(f"API server listening on http://{self.host}:{self.port}{API_PREFIX}")
+        self._started.set()
+        
+        try:
+            await self._stopping.wait()
+        finally:
+            await self.runner.cleanup()
+            self._remove_token()
+            logger.info("API server stopped")
+    
+    async def _attach(self, app):
+        """Start listening for changes to push, runs when the app starts"""
+        self.loop = asyncio.get_running_loop()
+        self.audio_controller.add_listener(self._on_audio_changed)
+        if self.hotkey_manager:
+            self.hotkey_manager.add_listener(self._on_hotkeys_changed)
+    
+    async def _detach(self, app):
+        """Stop listening and close client connections, runs when the app shuts down"""
+        self.audio_controller.remove_listener(self._on_audio_changed)
+        if self.hotkey_manager:
+            self.hotkey_manager.remove_listener(self._on_hotkeys_changed)
+        for ws in list(self.websockets):
+            await ws.close()
+    
+    def _write_token(self):
+        """Write the token readable by this user only, replacing one left by a previous run"""
+        try:
+            os.remove(self.token_path)
+        except FileNotFoundError:
+            pass
+        fd = os.open(self.token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as token_file:
+            token_file.write(self.token)
+    
+    def _remove_token(self):
+        try:
+            os.remove(self.token_path)
+        except OSError:
+            pass
+    
+    def _check_token(self, request):
+        """Raise a 401 ApiError unless the request carries this run's token"""
+        supplied = ''
+        authorization = request.headers.get('Authorization', '')
+        if authorization.startswith('Bearer '):
+            supplied = authorization[len('Bearer '):].strip()
+        elif request.path == f'{API_PREFIX}/ws':
+            # Browsers can't set headers on a WebSocket upgrade
+            supplied = request.query.get('token', '')
+        if not hmac.compare_digest(supplied.encode(), self.token.encode()):
+            raise ApiError(401, "missing or invalid token")
+    
+    def create_app(self):
+        """Build the aiohttp application"""
+        @web.middleware
+        async def error_middleware(request, handler):
+            try:
+                return await handler(request)
+            except ApiError as e:
+                return web.json_response({'error': e.message}, status=e.status)
+        
+        @web.middleware
+        async def cors_middleware(request, handler):
+            # Browsers send Origin with cross-origin requests and every WebSocket upgrade,
+            # so other web pages are turned away here before any handler runs. Outermost,
+            # so allowed origins can read error responses too.
+            origin = request.headers.get('Origin')
+            if origin is not None and origin not in self.cors_origins:
+                return web.json_response({'error': f"origin not allowed: {origin}"}, status=403)
+            
+            if request.method == 'OPTIONS':
+                response = web.Response()
+            else:
+                response = await handler(request)
+            
+            if origin is not None:
+                response.headers['Access-Control-Allow-Origin'] = origin
+                response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+                response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+                response.headers['Vary'] = 'Origin'
+            return response
+        
+        @web.middleware
+        async def token_middleware(request, handler):
+            if request.method in TOKEN_METHODS or request.path == f'{API_PREFIX}/ws':
+                self._check_token(request)
+            return await handler(request)
+        
+        app = web.Application(middlewares=[cors_middleware, error_middleware, token_middleware])
+        app.router.add_get(f'{API_PREFIX}/', self.handle_root)
+        app.router.add_get(f'{API_PREFIX}/sessions', self.handle_sessions)
+        app.router.add_get(f'{API_PREFIX}/sessions/{{app}}', self.handle_session)
+        app.router.add_put(f'{API_PREFIX}/sessions/{{app}}/volume', self.handle_volume)
+        app.router.add_put(f'{API_PREFIX}/sessions/{{app}}/mute', self.handle_mute)
+        app.router.add_post(f'{API_PREFIX}/batch', self.handle_batch)
+        app.router.add_get(f'{API_PREFIX}/hotkeys', self.handle_hotkeys)
+        app.router.add_post(f'{API_PREFIX}/hotkeys', self.handle_add_hotkey)
+        app.router.add_delete(f'{API_PREFIX}/hotkeys/{{hotkey}}', self.handle_remove_hotkey)
+        app.router.add_get(f'{API_PREFIX}/ws', self.handle_websocket)
+        if self.metrics_registry is not None:
+            # Where Prometheus scrapers look by default, outside the JSON API
+            app.router.add_get('/metrics', self.handle_metrics)
+        app.on_startup.append(self._attach)
+        app.on_shutdown.append(self._detach)
+        return app
+    
+    async def _call(self, func, *args):
+        """Run a blocking call on the API executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+    
+    # Blocking operations, shared by the single endpoints and /batch
+    
+    def _require_app(self, app_name) -> str:
+        if not isinstance(app_name, str) or not app_name:
+            raise ApiError(400, "missing app name")
+        if not self.audio_controller.find_app(app_name):
+            raise ApiError(404, f"no audio session for {app_name}")
+        return app_name
+    
+    def _session_state(self, app_name: str) -> Dict:
+        volume = self.audio_controller.get_app_volume(app_name)
+        muted = self.audio_controller.is_app_muted(app_name)
+        return {'app': app_name, 'volume': _rounded(volume), 'muted': bool(muted)}
+    
+    def _list_sessions(self, refresh: bool) -> Dict:
+        if refresh or not self.audio_controller.get_session_names():
+            self.audio_controller.refresh_sessions()
+        levels = self.audio_controller.get_session_levels()
+        return {
+            'version': self.audio_controller.sessions_version,
+            'sessions': [
+                {'app': app_name, 'volume': _rounded(volume), 'muted': muted, 'peak': peak}
+                for app_name, (volume, muted, peak) in sorted(levels.items())
+            ]
+        }
+    
+    def apply_operation(self, operation: Dict) -> Dict:
+        """Run one get/volume/mute operation, raising ApiError if it fails"""
+        if not isinstance(operation, dict):
+            raise ApiError(400, "operation must be an object")
+        op = operation.get('op')
+        app_name = self._require_app(operation.get('app'))
+        
+        if op == 'get':
+            return self._session_state(app_name)
+        
+        if op == 'volume':
+            current = self.audio_controller.get_app_volume(app_name) if 'delta' in operation else None
+            volume = _volume_from(operation, current)
+            self.audio_controller.cancel_ramp(app_name)
+            if not self.audio_controller.set_app_volume(app_name, volume):
+                raise ApiError(500, f"could not set volume of {app_name}")
+            return {'app': app_name, 'volume': volume}
+        
+        if op == 'mute':
+            if operation.get('toggle'):
+                muted = self.audio_controller.is_app_muted(app_name)
+                if muted is None:
+                    raise ApiError(500, f"could not read mute state of {app_name}")
+                mute = not muted
+            elif 'muted' in operation:
+                mute = bool(operation['muted'])
+            else:
+                raise ApiError(400, "expected \"muted\" or \"toggle\"")
+            if not self.audio_controller.mute_app(app_name, mute):
+                raise ApiError(500, f"could not change mute state of {app_name}")
+            return {'app': app_name, 'muted': mute}
+        
+        raise ApiError(400, f"unknown op: {op}")
+    
+    def apply_batch(self, operations: List[Dict]) -> List[Dict]:
+        """Run operations in order in one executor call, failures don't stop the rest"""
+        results = []
+        for operation in operations:
+            try:
+                results.append(dict(self.apply_operation(operation), ok=True))
+            except ApiError as e:
+                results.append({'ok': False, 'status': e.status, 'error': e.message})
+        return results
+    
+    # HTTP handlers
+    
+    async def _json_body(self, request) -> Dict:
+        # Other content types are sent cross-origin without a CORS preflight
+        if request.content_type != 'application/json':
+            raise ApiError(403, "request body must be application/json")
+        try:
+            body = await request.json()
+        except ValueError:
+            raise ApiError(400, "request body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "request body must be a JSON object")
+        return body
+    
+    async def handle_root(self, request):
+        return web.json_response({'message': "HotVolume API"})
+    
+    async def handle_metrics(self, request):
+        return web.Response(text=self.metrics_registry.render(), content_type='text/plain', charset='utf-8')
+    
+    async def handle_sessions(self, request):
+        refresh = request.query.get('refresh') in ('1', 'true')
+        return web.json_response(await self._call(self._list_sessions, refresh))
+    
+    async def handle_session(self, request):
+        operation = {'op': 'get', 'app': request.match_info['app']}
+        return web.json_response(await self._call(self.apply_operation, operation))
+    
+    async def handle_volume(self, request):
+        operation = dict(await self._json_body(request), op='volume', app=request.match_info['app'])
+        return web.json_response(await self._call(self.apply_operation, operation))
+    
+    async def handle_mute(self, request):
+        operation = dict(await self._json_body(request), op='mute', app=request.match_info['app'])
+        return web.json_response(await self._call(self.apply_operation, operation))
+    
+    async def handle_batch(self, request):
+        operations = (await self._json_body(request)).get('operations')
+        if not isinstance(operations, list):
+            raise ApiError(400, "expected \"operations\" list")
+        return web.json_response({'results': await self._call(self.apply_batch, operations)})
+    
+    def _require_hotkey_manager(self):
+        if self.hotkey_manager is None:
+            raise ApiError(503, "hotkeys are not available")
+        return self.hotkey_manager
+    
+    async def handle_hotkeys(self, request):
+        return web.json_response({'mappings': self._require_hotkey_manager().get_active_mappings()})
+    
+    async def handle_add_hotkey(self, request):
+        hotkey_manager = self._require_hotkey_manager()
+        body = await self._json_body(request)
+        hotkey, app_name, action = body.get('hotkey'), body.get('app'), body.get('action')
+        if not (isinstance(hotkey, str) and hotkey and isinstance(app_name, str) and app_name):
+            raise ApiError(400, "expected non-empty \"hotkey\" and \"app\" strings")
+        if action not in ACTIONS:
+            raise ApiError(400, f"action must be one of: {', '.join(ACTIONS)}")
+        step = body.get('step', 0.1)
+        if isinstance(step, bool) or not isinstance(step, (int, float)) or not math.isfinite(step) or step <= 0:
+            raise ApiError(400, "step must be a positive number")
+        step = float(step)
+        if not hotkey_manager.test_hotkey(hotkey):
+            raise ApiError(400, f"invalid hotkey: {hotkey}")
+        # add_hotkey_mapping unhooks an existing mapping for the hotkey before replacing it
+        replaced = hotkey in hotkey_manager.app_mappings
+        if not await self._call(hotkey_manager.add_hotkey_mapping, hotkey, app_name, action, step):
+            raise ApiError(500, f"could not add hotkey {hotkey}")
+        return web.json_response({'hotkey': hotkey, 'app': app_name, 'action': action, 'step': step},
+                                 status=200 if replaced else 201)
+    
+    async def handle_remove_hotkey(self, request):
+        hotkey = request.match_info['hotkey']
+        if not await self._call(self._require_hotkey_manager().remove_hotkey_mapping, hotkey):
+            raise ApiError(404, f"no mapping for {hotkey}")
+        return web.json_response({'removed': hotkey})
+    
+    # WebSocket push
+    
+    async def handle_websocket(self, request):
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+        
+        snapshot = await self._call(self._list_sessions, False)
+        for session in snapshot['sessions']:
+            self.state[session['app']] = {'volume': session['volume'], 'muted': session['muted']}
+        await ws.send_json(dict(snapshot, type='snapshot'))
+        
+        self.websockets.add(ws)
+        try:
+            async for message in ws:
+                # Clients may send operations over the socket too, results come back inline
+                if message.type == WSMsgType.TEXT:
+                    await self._handle_ws_message(ws, message)
+                elif message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.websockets.discard(ws)
+        return ws
+    
+    async def _handle_ws_message(self, ws, message):
+        try:
+            data = message.json()
+        except ValueError:
+            await ws.send_json({'type': 'error', 'error': "message must be JSON"})
+            return
+        operations = data.get('operations') if isinstance(data, dict) else None
+        if not isinstance(operations, list):
+            await ws.send_json({'type': 'error', 'error': "expected \"operations\" list"})
+            return
+        results = await self._call(self.apply_batch, operations)
+        await ws.send_json({'type': 'results', 'id': data.get('id'), 'results': results})
+    
+    async def broadcast(self, message: Dict):
+        """Send a message to every connected WebSocket client"""
+        if not self.websockets:
+            return
+        clients = list(self.websockets)
+        results = await asyncio.gather(*(ws.send_json(message) for ws in clients), return_exceptions=True)
+        for ws, result in zip(clients, results):
+            if isinstance(result, Exception):
+                logger.debug(f"Dropping WebSocket client: {result}")
+                self.websockets.discard(ws)
+    
+    def _on_audio_changed(self, event, app_name, data):
+        """Audio controller listener, called on whatever thread made the change"""
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._audio_event, event, app_name, data)
+        except RuntimeError:
+            # Loop closed between the check and the call
+            pass
+    
+    def _audio_event(self, event, app_name, data):
+        """Push changes that differ from the last state sent, on the event loop"""
+        if event == 'sessions':
+            asyncio.ensure_future(self._sessions_changed(data))
+            return
+        
+        key = 'volume' if event == 'volume' else 'muted'
+        if key == 'volume':
+            data = _rounded(data)
+        state = self.state.setdefault(app_name, {'volume': None, 'muted': False})
+        if state.get(key) != data:
+            state[key] = data
+            asyncio.ensure_future(self.broadcast({'type': event, 'app': app_name, key: data}))
+    
+    async def _sessions_changed(self, change):
+        """Tell clients about apps whose sessions started or all ended"""
+        for app_name in change.get('removed', ()):
+            if self.state.pop(app_name, None) is not None:
+                await self.broadcast({'type': 'session_removed', 'app': app_name})
+        for app_name in change.get('added', ()):
+            try:
+                session = await self._call(self._session_state, app_name)
+            except Exception as e:
+                logger.debug(f"Error reading new session of {app_name}: {e}")
+                continue
+            self.state[app_name] = {'volume': session['volume'], 'muted': session['muted']}
+            await self.broadcast(dict(session, type='session_added'))
+    
+    def _on_hotkeys_changed(self, event):
+        if event != 'mappings' or self.loop is None or self.loop.is_closed():
+            return
+        mappings = self.hotkey_manager.get_active_mappings()
+        try:
+            self.loop.call_soon_threadsafe(
+                lambda: asyncio.ensure_future(self.broadcast({'type': 'hotkeys', 'mappings': mappings}))
+            )
+        except RuntimeError:
+            pass
+
+def main():
+    """Run the API alone, e.g. against the simulated backend for frontend work"""
+    import argparse
+    import time
+    
+    parser = argparse.ArgumentParser(description="HotVolume HTTP/WebSocket API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--simulate', action='store_true', help="use simulated audio sessions instead of Windows audio")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    
+    from audio_controller import AudioController
+    from metrics import MetricsRegistry
+    session_source = None
+    if args.simulate:
+        from simulated_audio import SimulatedAudioBackend
+        session_source = SimulatedAudioBackend({'Spotify.exe': 0.6, 'chrome.exe': 1.0, 'discord.exe': 0.8})
+    audio_controller = AudioController(session_source=session_source)
+    audio_controller.start_session_notifications()
+    metrics_registry = MetricsRegistry()
+    metrics_registry.add_source(audio_controller)
+    
+    server = ApiServer(audio_controller, host=args.host, port=args.port, metrics_registry=metrics_registry)
+    if not server.start():
+        return
+    logger.info(f"API token written to {server.token_path}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+        audio_controller.stop_session_notifications()
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,33 @@ Handles detection and monitoring of running applications
 """
 
 import psutil
-import pygetwindow as gw
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import time
+from concurrent.futures import Future
+
+from metrics import Counter, Gauge, Histogram
+
+from proc_scanner import ProcScanner
+from process_index import ProcessNameIndex
+from process_tree import ProcessTree
 
 logger = logging.getLogger(__name__)
 
 class AppDetector:
-    def __init__(self):
-        """Initialize the application detector"""
+    def __init__(self, index_ttl: float = 2.0, app_registry=None, backend: str = 'auto'):
+        """Initialize the application detector
+        
+        backend selects the process scanner: 'psutil', 'proc' (Linux procfs)
+        or 'auto' to use procfs whenever it is available.
+        """
+        self.app_registry = app_registry
+        self.proc_scanner = None
+        if backend == 'proc' or (backend == 'auto' and ProcScanner.is_available()):
+            self.proc_scanner = ProcScanner()
+        elif backend not in ('auto', 'psutil'):
+            raise ValueError(f"Unknown process scanner backend: {backend}")
+        self.backend = 'proc' if self.proc_scanner else 'psutil'
         self.common_apps = {
             'spotify.exe': 'Spotify',
             'chrome.exe': 'Google Chrome',
@@ -43,20 +60,57 @@ class AppDetector:
             'skype.exe': 'Skype',
             'slack.exe': 'Slack'
         }
+        
+        # Parent-child tree and name index are both maintained from the same snapshot
+        self.process_tree = ProcessTree()
+        self.name_index = ProcessNameIndex(self._load_snapshot, ttl=index_ttl)
+        
+        # Resolved once the first process snapshot has been loaded
+        self.ready = Future()
+        
+        self.scan_seconds = Histogram("hotvolume_process_scan_seconds", "Duration of full process scans", ['backend'])
+        self.metrics = [
+            self.scan_seconds,
+            Gauge("hotvolume_processes", "Processes in the last snapshot",
+                  func=lambda: len(self.process_tree)),
+            Counter("hotvolume_process_index_lookups_total", "Process index freshness checks by result", ['result'],
+                    func=lambda: {('hit',): self.name_index.hits, ('reload',): self.name_index.reloads}),
+        ]
     
-    def get_running_processes(self) -> List[Dict]:
-        """Get all currently running processes"""
+    def warm_up(self):
+        """Load the first process snapshot ahead of the first lookup"""
+        try:
+            self.name_index.ensure_fresh()
+        finally:
+            # Resolve even if the scan failed, lookups retry on their own
+            self._mark_ready()
+    
+    def _mark_ready(self):
+        """Resolve the readiness future after the first snapshot"""
+        if not self.ready.done():
+            try:
+                self.ready.set_result(True)
+            except Exception:
+                # Another thread resolved it first
+                pass
+    
+    def _scan_processes(self) -> List[Dict]:
+        """Scan all named processes, including ones whose exe is not readable"""
+        if self.proc_scanner:
+            return self._scan_processes_proc()
+        
         processes = []
         try:
-            for process in psutil.process_iter(['pid', 'name', 'exe']):
+            for process in psutil.process_iter(['pid', 'name', 'exe', 'ppid']):
                 try:
                     proc_info = process.info
-                    if proc_info['name'] and proc_info['exe']:
+                    if proc_info['name']:
                         display_name = self.common_apps.get(proc_info['name'].lower(), proc_info['name'])
                         processes.append({
                             'pid': proc_info['pid'],
                             'name': proc_info['name'],
                             'exe': proc_info['exe'],
+                            'ppid': proc_info['ppid'],
                             'display_name': display_name
                         })
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
@@ -66,6 +120,64 @@ class AppDetector:
         
         return processes
     
+    def _scan_processes_proc(self) -> List[Dict]:
+        """Scan processes through the procfs backend"""
+        processes = []
+        try:
+            for process in self.proc_scanner.scan():
+                if process['name']:
+                    process['display_name'] = self.common_apps.get(process['name'].lower(), process['name'])
+                    processes.append(process)
+        except Exception as e:
+            logger.error(f"Error getting running processes: {e}")
+        
+        return processes
+    
+    def _load_snapshot(self) -> List[Dict]:
+        """Scan processes and update the process tree with the result"""
+        with self.scan_seconds.time(self.backend):
+            processes = self._scan_processes()
+        self.process_tree.update(processes)
+        self._mark_ready()
+        return processes
+    
+    def get_running_processes(self) -> List[Dict]:
+        """Get all currently running processes"""
+        all_processes = self._load_snapshot()
+        # A full scan is as fresh as it gets, so reuse it for the name index
+        self.name_index.rebuild(all_processes)
+        return [process for process in all_processes if process['exe']]
+    
+    def _lookup_process(self, pid: int) -> Optional[Tuple[str, Optional[int]]]:
+        """Name and parent PID of a single process, None if it is gone"""
+        if self.proc_scanner:
+            process = self.proc_scanner.read_process(pid)
+            return (process['name'], process['ppid']) if process else None
+        try:
+            process = psutil.Process(pid)
+            return process.name(), process.ppid()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+    
+    def get_root_process(self, pid: int, name: Optional[str] = None) -> Dict:
+        """Get the top-level application process that a PID belongs to
+        
+        Renderer, GPU and helper processes resolve to the process that owns
+        them, so multi-process apps can be treated as one. Never scans every
+        process: PIDs missing from the tree, or known under a different name
+        than the caller's, are looked up one at a time.
+        """
+        self.process_tree.resolve(pid, self._lookup_process, name)
+        root_pid = self.process_tree.get_root(pid)
+        name = self.process_tree.get_name(root_pid)
+        if name is None:
+            return None
+        return {
+            'pid': root_pid,
+            'name': name,
+            'display_name': self.common_apps.get(name.lower(), name)
+        }
+    
     def get_audio_capable_apps(self) -> List[Dict]:
         """Get applications that are likely to produce audio"""
         audio_keywords = [
@@ -93,10 +205,35 @@ class AppDetector:
         
         return audio_apps
     
+    def get_known_audio_apps(self) -> List[Dict]:
+        """Get every app that has ever owned an audio session, most used first
+        
+        Served from the learned registry, so no process scan is needed.
+        Falls back to the keyword scan until the registry has learned something.
+        """
+        if self.app_registry is None or len(self.app_registry) == 0:
+            return self.get_audio_capable_apps()
+        
+        known_apps = []
+        for app in self.app_registry.get_known_apps():
+            display_name = self.common_apps.get(app['name'].lower(), app['display_name'])
+            known_apps.append({
+                'pid': None,
+                'name': app['name'],
+                'exe': None,
+                'display_name': display_name,
+                'first_seen': app['first_seen'],
+                'last_seen': app['last_seen'],
+                'use_count': app['use_count']
+            })
+        return known_apps
+    
     def get_visible_windows(self) -> List[Dict]:
         """Get all visible windows"""
         windows = []
         try:
+            # Imported on first use, window enumeration is not needed at startup
+            import pygetwindow as gw
             for window in gw.getAllWindows():
                 if window.title and window.visible and not window.isMinimized:
                     windows.append({
@@ -114,21 +251,12 @@ class AppDetector:
     
     def find_process_by_name(self, process_name: str) -> List[Dict]:
         """Find processes by name (partial match)"""
-        matching_processes = []
-        all_processes = self.get_running_processes()
-        
-        for process in all_processes:
-            if process_name.lower() in process['name'].lower():
-                matching_processes.append(process)
-        
-        return matching_processes
+        return [process for process in self.name_index.find(process_name) if process['exe']]
     
     def is_process_running(self, process_name: str) -> bool:
         """Check if a specific process is running"""
         try:
-            for process in psutil.process_iter(['name']):
-                if process.info['name'] and process_name.lower() in process.info['name'].lower():
-                    return True
+            return self.name_index.contains(process_name)
         except Exception as e:
             logger.error(f"Error checking if process {process_name} is running: {e}")
         
@@ -0,0 +1,117 @@
+"""
+Learned Audio App Registry
+Remembers every executable that has ever owned an audio session
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class AppRegistry:
+    def __init__(self, registry_file: Path = Path("app_registry.json"), save_interval: float = 60.0):
+        """Initialize the registry and load it from disk"""
+        self.registry_file = Path(registry_file)
+        self.save_interval = save_interval
+        self.apps: Dict[str, Dict] = {}
+        self._active = set()
+        self._dirty = False
+        self._last_save = time.time()
+        self._lock = threading.Lock()
+        
+        self.load()
+    
+    def load(self):
+        """Load the registry from file"""
+        try:
+            if self.registry_file.exists():
+                with open(self.registry_file, 'r') as f:
+                    data = json.load(f)
+                self.apps = data.get('apps', {})
+                logger.info(f"Loaded {len(self.apps)} known audio apps from {self.registry_file}")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading app registry: {e}")
+            self.apps = {}
+            return False
+    
+    def save(self):
+        """Save the registry to file"""
+        try:
+            with self._lock:
+                payload = json.dumps({'apps': self.apps, 'version': '1.0'}, indent=2)
+                
+                # Write to a temp file first so a crash never leaves a truncated registry
+                tmp_file = self.registry_file.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    f.write(payload)
+                os.replace(tmp_file, self.registry_file)
+                
+                self._dirty = False
+                self._last_save = time.time()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving app registry: {e}")
+            return False
+    
+    def observe_sessions(self, sessions: Iterable[str], display_names: Optional[Dict[str, str]] = None):
+        """Record the executables that currently own audio sessions
+        
+        Each app counts as one use when it appears, not on every refresh it
+        stays around for.
+        """
+        display_names = display_names or {}
+        now = time.time()
+        current = set(sessions)
+        new_app = False
+        
+        with self._lock:
+            for name in current:
+                entry = self.apps.get(name)
+                if entry is None:
+                    entry = {
+                        'display_name': display_names.get(name) or name,
+                        'first_seen': now,
+                        'last_seen': now,
+                        'use_count': 0
+                    }
+                    self.apps[name] = entry
+                    new_app = True
+                    logger.info(f"Learned new audio app: {name}")
+                elif display_names.get(name) and entry['display_name'] == name:
+                    entry['display_name'] = display_names[name]
+                
+                entry['last_seen'] = now
+                if name not in self._active:
+                    entry['use_count'] += 1
+                self._dirty = True
+            
+            self._active = current
+        
+        # New apps are persisted right away, timestamps only once in a while
+        if new_app or (self._dirty and now - self._last_save > self.save_interval):
+            self.save()
+    
+    def flush(self):
+        """Save pending changes, if any"""
+        if self._dirty:
+            return self.save()
+        return True
+    
+    def get_known_apps(self) -> List[Dict]:
+        """Get all known audio apps, most used first"""
+        with self._lock:
+            apps = [dict(entry, name=name) for name, entry in self.apps.items()]
+        apps.sort(key=lambda app: (-app['use_count'], -app['last_seen']))
+        return apps
+    
+    def __contains__(self, name):
+        return name in self.apps
+    
+    def __len__(self):
+        return len(self.apps)
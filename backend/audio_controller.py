@@ -3,47 +3,483 @@ Windows Audio Session API Controller
 Handles volume control for individual applications
 """
 
-import ctypes
-from ctypes import wintypes
-from comtypes import CLSCTX_ALL, GUID
-from pycaw.pycaw import AudioUtilities, AudioSession, ISimpleAudioVolume
 import logging
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from logging_setup import RateLimiter, log_rate_limited
+from metrics import Counter, Gauge, Histogram
+from task_pool import TaskPool
+
+try:
+    from pycaw.pycaw import AudioUtilities, IAudioMeterInformation
+except ImportError:
+    # Without pycaw (e.g. off Windows) only a session_source such as the simulated backend works
+    AudioUtilities = None
+    IAudioMeterInformation = None
+
+try:
+    from pycaw.callbacks import AudioSessionNotification
+except ImportError:
+    # Older pycaw releases have no session notification support
+    AudioSessionNotification = None
+
+try:
+    from pycaw.callbacks import AudioSessionEvents
+except ImportError:
+    AudioSessionEvents = None
 
 logger = logging.getLogger(__name__)
 
-class AudioController:
+if AudioSessionNotification is not None:
+    class SessionCreatedCallback(AudioSessionNotification):
+        """Forwards WASAPI session-created events to a callback"""
+        def __init__(self, on_created):
+            super().__init__()
+            self.on_created = on_created
+        
+        def on_session_created(self, new_session):
+            self.on_created()
+
+if AudioSessionEvents is not None:
+    class SessionEventsCallback(AudioSessionEvents):
+        """Forwards one session's IAudioSessionEvents: volume and mute changes, and its end"""
+        def __init__(self, on_changed, on_expired):
+            super().__init__()
+            self.on_changed = on_changed
+            self.on_expired = on_expired
+        
+        def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+            self.on_changed(new_volume, bool(new_mute))
+        
+        def on_state_changed(self, new_state, new_state_id):
+            if new_state == 'Expired':
+                self.on_expired()
+        
+        def on_session_disconnected(self, disconnect_reason):
+            self.on_expired()
+
+class PycawSessionSource:
+    """Audio sessions from the Windows audio session API"""
     def __init__(self):
-        """Initialize the audio controller"""
+        if AudioUtilities is None:
+            raise ImportError("pycaw is required for Windows audio sessions")
+        self._session_manager = None
+        self._session_callback = None
+    
+    def get_all_sessions(self):
+        """Enumerate the current audio sessions"""
+        return AudioUtilities.GetAllSessions()
+    
+    def get_meter(self, session):
+        """Get the peak meter interface of a session"""
+        return session._ctl.QueryInterface(IAudioMeterInformation)
+    
+    def subscribe(self, on_created):
+        """Call on_created() whenever a new session appears"""
+        if AudioSessionNotification is None:
+            logger.info("Session notifications not supported by this pycaw version, absent apps expire after TTL")
+            return False
+        
+        try:
+            self._session_manager = AudioUtilities.GetAudioSessionManager()
+            self._session_callback = SessionCreatedCallback(on_created)
+            self._session_manager.RegisterSessionNotification(self._session_callback)
+            # Notifications are only delivered once the session list has been enumerated
+            self._session_manager.GetSessionEnumerator()
+            logger.info("Subscribed to audio session notifications")
+            return True
+        except Exception as e:
+            logger.error(f"Error subscribing to audio session notifications: {e}")
+            self._session_manager = None
+            self._session_callback = None
+            return False
+    
+    def unsubscribe(self):
+        """Stop session-created notifications"""
+        try:
+            if self._session_manager and self._session_callback:
+                self._session_manager.UnregisterSessionNotification(self._session_callback)
+        except Exception as e:
+            logger.error(f"Error unsubscribing from audio session notifications: {e}")
+        finally:
+            self._session_manager = None
+            self._session_callback = None
+    
+    def watch_session(self, session, on_changed, on_expired):
+        """Call on_changed(volume, muted) on volume changes and on_expired() when the session ends
+        
+        Returns a handle for unwatch_session(), None if the session can't be watched.
+        WASAPI forbids unregistering from inside one of these callbacks.
+        """
+        if AudioSessionEvents is None:
+            return None
+        try:
+            callback = SessionEventsCallback(on_changed, on_expired)
+            session._ctl.RegisterAudioSessionNotification(callback)
+            return session, callback
+        except Exception as e:
+            logger.debug(f"Could not watch audio session of {session.Process and session.Process.name()}: {e}")
+            return None
+    
+    def unwatch_session(self, handle):
+        session, callback = handle
+        try:
+            session._ctl.UnregisterAudioSessionNotification(callback)
+        except Exception as e:
+            # Sessions that have ended may already be gone
+            logger.debug(f"Error unwatching audio session: {e}")
+
+class AudioController:
+    def __init__(self, app_registry=None, absent_ttl=5.0, warning_interval=60.0, auto_refresh=True,
+                 session_source=None):
+        """Initialize the audio controller
+        
+        session_source enumerates sessions, defaulting to the Windows audio
+        session API; simulated_audio.SimulatedAudioBackend stands in for it in tests.
+        """
+        self.session_source = session_source or PycawSessionSource()
         self.sessions = {}
-        self.refresh_sessions()
+        self.app_groups = {}
+        self.app_registry = app_registry
+        self.app_detector = None
+        # (session PID, process name) -> root process from the app detector, only new ones are looked up
+        self._session_roots = {}
+        
+        # Negative cache: app name -> time until which it is known to have no session
+        self.absent_ttl = absent_ttl
+        self.absent_apps = {}
+        self.warning_interval = warning_interval
+        self._missing_warnings = RateLimiter(warning_interval)
+        
+        # Bumped whenever the set of apps with sessions changes
+        self.sessions_version = 0
+        self.listeners = []
+        
+        # Resolved once the first session scan has finished, successful or not
+        self.ready = Future()
+        
+        # Session event registration and the work events trigger, set by start_session_notifications()
+        self._events = None
+        # Session instance identifier -> session source watch handle, used on the events thread only
+        self._session_watches = {}
+        
+        # Per-app ramp generation, cancel_ramp() (called by a newer ramp and by user volume changes) stops a running ramp
+        self._ramp_generations = {}
+        self._ramp_lock = threading.Lock()
+        
+        # Metrics, collected by a MetricsRegistry
+        self.refresh_count = Counter("hotvolume_session_refreshes_total", "Audio session refreshes")
+        self.refresh_seconds = Histogram("hotvolume_session_refresh_seconds", "Audio session refresh duration")
+        self.com_call_seconds = Histogram("hotvolume_com_call_seconds", "Audio API call latency", labels=('call',))
+        self.absent_cache_lookups = Counter(
+            "hotvolume_absent_cache_lookups_total", "Negative cache lookups for apps without a session", labels=('result',)
+        )
+        self.meter_cache_lookups = Counter(
+            "hotvolume_meter_cache_lookups_total", "Peak meter interface cache lookups", labels=('result',)
+        )
+        self.metrics = [
+            self.refresh_count, self.refresh_seconds, self.com_call_seconds,
+            self.absent_cache_lookups, self.meter_cache_lookups,
+            Gauge("hotvolume_audio_sessions", "Apps with an audio session", func=lambda: len(self.sessions)),
+        ]
+        
+        # The first scan can be deferred so startup is not blocked on it
+        if auto_refresh:
+            self.refresh_sessions()
+    
+    def add_listener(self, callback):
+        """Register a callback(event, app_name, data) for session and volume changes
+        
+        Events are 'volume' and 'mute' with the new value as data, and
+        'sessions' with {'added': [...], 'removed': [...]} app names.
+        """
+        self.listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """Unregister a change callback"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def _notify_listeners(self, event, app_name, data=None):
+        """Call every registered listener, isolating their errors"""
+        for callback in list(self.listeners):
+            try:
+                callback(event, app_name, data)
+            except Exception as e:
+                logger.error(f"Error in audio change listener: {e}")
+    
+    def start_session_notifications(self):
+        """Subscribe to session events so listeners hear about changes made outside HotVolume
+        
+        New sessions are picked up through the session-created notification. Each
+        known session is watched for volume and mute changes and for its end.
+        
+        Everything is registered from a thread of its own in the multithreaded
+        apartment, so WASAPI calls the callbacks on its worker threads directly.
+        The caller's apartment doesn't matter, and the main thread can stay in the
+        single-threaded apartment the tray icon's window needs.
+        """
+        if self._events is None:
+            # One thread, so registrations and the changes they cause are handled in order
+            self._events = TaskPool(max_workers=1, name="hotvolume-audio-events")
+        subscribed = self._events.submit(self.session_source.subscribe, self.on_session_created).result()
+        self._events.submit(self._sync_session_watches)
+        return subscribed
+    
+    def stop_session_notifications(self):
+        """Unsubscribe from session-created events and stop watching sessions"""
+        events, self._events = self._events, None
+        if events is None:
+            return
+        try:
+            # On the events thread, after anything still queued there
+            events.submit(self.session_source.unsubscribe).result(timeout=5)
+            events.submit(self._unwatch_all_sessions).result(timeout=5)
+        except Exception as e:
+            logger.error(f"Error stopping audio session notifications: {e}")
+        events.shutdown()
+    
+    def on_session_created(self):
+        """Handle a new audio session appearing"""
+        # We don't know which app it belongs to without a refresh, so forget every absence
+        self.absent_apps.clear()
+        # Refreshing from inside the notification is not allowed, it would deadlock
+        events = self._events
+        if events is not None:
+            events.submit(self.refresh_sessions)
+    
+    def _sync_session_watches(self):
+        """Watch sessions new since the last sync and drop watches of sessions that are gone"""
+        watch_session = getattr(self.session_source, 'watch_session', None)
+        if watch_session is None:
+            return
+        current = {
+            session_info['instance_id']: session_info
+            for session_list in self.sessions.values() for session_info in session_list
+            if session_info.get('instance_id')
+        }
+        for instance_id in self._session_watches.keys() - current.keys():
+            self.session_source.unwatch_session(self._session_watches.pop(instance_id))
+        for instance_id, session_info in current.items():
+            if instance_id in self._session_watches:
+                continue
+            handle = watch_session(
+                session_info['session'],
+                partial(self._on_session_volume, session_info['name'], instance_id),
+                partial(self._on_session_expired, instance_id),
+            )
+            if handle is not None:
+                self._session_watches[instance_id] = handle
+    
+    def _unwatch_all_sessions(self):
+        for handle in self._session_watches.values():
+            self.session_source.unwatch_session(handle)
+        self._session_watches.clear()
+    
+    def _on_session_volume(self, app_name, instance_id, volume, muted):
+        """Session event: a volume or mute change, from HotVolume or anywhere else"""
+        # An app's volume is its first session's, as in get_app_volume()
+        session_list = self.sessions.get(app_name)
+        if not session_list or session_list[0].get('instance_id') != instance_id:
+            return
+        self._notify_listeners('volume', app_name, volume)
+        self._notify_listeners('mute', app_name, muted)
+    
+    def _on_session_expired(self, instance_id):
+        """Session event: the session expired or was disconnected"""
+        events = self._events
+        if events is not None:
+            events.submit(self._drop_session, instance_id)
+    
+    def _drop_session(self, instance_id):
+        """Forget an ended session, notifying listeners if its app has no sessions left"""
+        handle = self._session_watches.pop(instance_id, None)
+        if handle is not None:
+            self.session_source.unwatch_session(handle)
+        
+        new_sessions = {}
+        for app_name, session_list in self.sessions.items():
+            kept = [session_info for session_info in session_list if session_info.get('instance_id') != instance_id]
+            if kept:
+                new_sessions[app_name] = kept
+        if sum(map(len, new_sessions.values())) == sum(map(len, self.sessions.values())):
+            return
+        
+        removed = sorted(self.sessions.keys() - new_sessions.keys())
+        self.sessions = new_sessions
+        self._rebuild_app_groups()
+        logger.debug(f"Audio session ended, {len(self.sessions)} applications with audio sessions")
+        if removed:
+            self.sessions_version += 1
+            self._notify_listeners('sessions', None, {'added': [], 'removed': removed})
+    
+    def is_app_absent(self, app_name):
+        """Check if an application is known to have no audio session right now"""
+        expires = self.absent_apps.get(app_name)
+        if expires is None:
+            self.absent_cache_lookups.inc('miss')
+            return False
+        if time.monotonic() >= expires:
+            self.absent_apps.pop(app_name, None)
+            self.absent_cache_lookups.inc('expired')
+            return False
+        self.absent_cache_lookups.inc('hit')
+        return True
+    
+    def _app_missing(self, app_name):
+        """Remember that an app has no session and warn about it at most once per interval"""
+        now = time.monotonic()
+        self.absent_apps[app_name] = now + self.absent_ttl
+        
+        log_rate_limited(
+            logger, self._missing_warnings, app_name, logging.WARNING,
+            f"Application {app_name} not found in audio sessions"
+        )
+    
+    def set_app_detector(self, detector):
+        """Set the app detector used to group helper processes under their application"""
+        self.app_detector = detector
+        self._session_roots = {}
+        self._rebuild_app_groups()
     
     def refresh_sessions(self):
         """Refresh the list of available audio sessions"""
+        self.refresh_count.inc()
+        started = time.perf_counter()
         try:
-            self.sessions.clear()
-            sessions = AudioUtilities.GetAllSessions()
+            # Build into a new dict and swap it in, so readers never see a half-built snapshot
+            new_sessions = {}
+            display_names = {}
+            with self.com_call_seconds.time('GetAllSessions'):
+                sessions = self.session_source.get_all_sessions()
             
             for session in sessions:
                 if session.Process and session.Process.name():
                     process_name = session.Process.name()
-                    if process_name not in self.sessions:
-                        self.sessions[process_name] = []
+                    if process_name not in new_sessions:
+                        new_sessions[process_name] = []
+                        if session.DisplayName:
+                            display_names[process_name] = session.DisplayName
                     
                     # Get the simple audio volume interface
                     volume = session.SimpleAudioVolume
                     if volume:
-                        self.sessions[process_name].append({
+                        new_sessions[process_name].append({
                             'session': session,
                             'volume': volume,
-                            'pid': session.Process.pid if session.Process else None
+                            'pid': session.Process.pid if session.Process else None,
+                            'name': process_name,
+                            # Stable across enumerations, unlike the session wrapper
+                            'instance_id': session.InstanceIdentifier,
                         })
             
-            logger.info(f"Found {len(self.sessions)} applications with audio sessions")
+            added = sorted(new_sessions.keys() - self.sessions.keys())
+            removed = sorted(self.sessions.keys() - new_sessions.keys())
+            self.sessions = new_sessions
+            self._rebuild_app_groups()
+            events = self._events
+            if events is not None:
+                events.submit(self._sync_session_watches)
+            
+            # Apps that showed up are no longer absent
+            for app_name in list(self.absent_apps):
+                if self._get_target_sessions(app_name):
+                    del self.absent_apps[app_name]
+                    self._missing_warnings.reset(app_name)
+            
+            logger.debug(f"Found {len(self.sessions)} applications with audio sessions")
+            
+            # Remember every app that has owned a session for pickers and completion
+            if self.app_registry is not None:
+                self.app_registry.observe_sessions(self.sessions.keys(), display_names)
+            
+            if added or removed:
+                self.sessions_version += 1
+                self._notify_listeners('sessions', None, {'added': added, 'removed': removed})
             return True
             
         except Exception as e:
             logger.error(f"Error refreshing audio sessions: {e}")
             return False
+        finally:
+            self.refresh_seconds.observe(time.perf_counter() - started)
+            self._mark_ready()
+    
+    def _mark_ready(self):
+        """Resolve the readiness future after the first scan"""
+        if not self.ready.done():
+            try:
+                self.ready.set_result(True)
+            except Exception:
+                # Another thread resolved it first
+                pass
+    
+    def _rebuild_app_groups(self):
+        """Group session entries under the top-level application that owns them
+        
+        Runs on every refresh, including on the keyboard hook thread, so only
+        PIDs that weren't in the previous snapshot go to the app detector.
+        """
+        groups = {}
+        roots = {}
+        if self.app_detector:
+            for session_list in self.sessions.values():
+                for session_info in session_list:
+                    pid = session_info['pid']
+                    if pid is None:
+                        continue
+                    # With the name, a reused PID counts as new
+                    key = (pid, session_info['name'])
+                    if key not in roots:
+                        if key in self._session_roots:
+                            roots[key] = self._session_roots[key]
+                        else:
+                            roots[key] = self.app_detector.get_root_process(pid, session_info['name'])
+                    root = roots[key]
+                    if root:
+                        groups.setdefault(root['name'], []).append(session_info)
+        self._session_roots = roots
+        self.app_groups = groups
+    
+    def _get_target_sessions(self, app_name):
+        """Get every session controlled by an app name, including its helper processes"""
+        targets = list(self.sessions.get(app_name, []))
+        for session_info in self.app_groups.get(app_name, []):
+            if not any(session_info is target for target in targets):
+                targets.append(session_info)
+        return targets
+    
+    def get_app_groups(self):
+        """Get top-level applications mapped to the session process names they own"""
+        groups = {}
+        for root_name, session_list in self.app_groups.items():
+            names = groups.setdefault(root_name, [])
+            for session_info in session_list:
+                if session_info['name'] not in names:
+                    names.append(session_info['name'])
+        return groups
+    
+    def get_session_names(self):
+        """Get apps from the last session snapshot without refreshing"""
+        return list(self.sessions.keys())
+    
+    def has_app(self, app_name):
+        """Check if the last session snapshot has a session for an app, without refreshing"""
+        return bool(self._get_target_sessions(app_name))
+    
+    def find_app(self, app_name):
+        """Check if an app has a session, refreshing once if it is missing but not known absent"""
+        if self._get_target_sessions(app_name):
+            return True
+        if self.is_app_absent(app_name):
+            return False
+        self.refresh_sessions()
+        if self._get_target_sessions(app_name):
+            return True
+        self._app_missing(app_name)
+        return False
     
     def get_available_apps(self):
         """Get list of applications currently playing audio"""
@@ -53,15 +489,17 @@ class AudioController:
     def get_app_volume(self, app_name):
         """Get current volume level for an application (0.0 to 1.0)"""
         try:
-            if app_name in self.sessions:
+            targets = self._get_target_sessions(app_name)
+            if targets:
                 # Get the first session for this app
-                session_info = self.sessions[app_name][0]
+                session_info = targets[0]
                 volume_interface = session_info['volume']
-                current_volume = volume_interface.GetMasterVolume()
-                logger.info(f"Current volume for {app_name}: {current_volume}")
+                with self.com_call_seconds.time('GetMasterVolume'):
+                    current_volume = volume_interface.GetMasterVolume()
+                logger.debug(f"Current volume for {app_name}: {current_volume}")
                 return current_volume
             else:
-                logger.warning(f"Application {app_name} not found in audio sessions")
+                self._app_missing(app_name)
                 return None
         except Exception as e:
             logger.error(f"Error getting volume for {app_name}: {e}")
@@ -70,22 +508,67 @@ class AudioController:
     def set_app_volume(self, app_name, volume_level):
         """Set volume level for an application (0.0 to 1.0)"""
         try:
-            if app_name in self.sessions:
+            targets = self._get_target_sessions(app_name)
+            if targets:
                 # Set volume for all sessions of this app
-                for session_info in self.sessions[app_name]:
+                for session_info in targets:
                     volume_interface = session_info['volume']
-                    volume_interface.SetMasterVolume(volume_level, None)
+                    with self.com_call_seconds.time('SetMasterVolume'):
+                        volume_interface.SetMasterVolume(volume_level, None)
                 
-                logger.info(f"Set volume for {app_name} to {volume_level}")
+                logger.debug(f"Set volume for {app_name} to {volume_level}")
+                self._notify_listeners('volume', app_name, volume_level)
                 return True
             else:
-                logger.warning(f"Application {app_name} not found in audio sessions")
+                self._app_missing(app_name)
                 return False
                 
         except Exception as e:
             logger.error(f"Error setting volume for {app_name}: {e}")
             return False
     
+    def _next_ramp_generation(self, app_name):
+        with self._ramp_lock:
+            generation = self._ramp_generations.get(app_name, 0) + 1
+            self._ramp_generations[app_name] = generation
+            return generation
+    
+    def ramp_app_volume(self, app_name, target, duration=0.5, interval=0.02, generation=None):
+        """Fade an application's volume to target over duration seconds (blocking)
+        
+        Starting another ramp for the same app stops this one early. generation,
+        from cancel_ramp(), lets a ramp be claimed before it starts so that a later
+        cancel stops it even if it has not begun yet.
+        Returns True if the target was reached.
+        """
+        if generation is None:
+            generation = self._next_ramp_generation(app_name)
+        start_volume = self.get_app_volume(app_name)
+        if start_volume is None:
+            return False
+        
+        target = max(0.0, min(1.0, target))
+        steps = max(1, int(duration / interval))
+        started = time.monotonic()
+        
+        for step in range(1, steps + 1):
+            if self._ramp_generations.get(app_name) != generation:
+                logger.debug(f"Volume ramp for {app_name} superseded")
+                return False
+            volume = start_volume + (target - start_volume) * step / steps
+            if not self.set_app_volume(app_name, volume):
+                return False
+            if step < steps:
+                # Sleep to the next step's deadline so slow writes don't stretch the ramp
+                delay = started + step * interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        return True
+    
+    def cancel_ramp(self, app_name):
+        """Stop a running volume ramp for an app, returns the generation a new ramp can claim"""
+        return self._next_ramp_generation(app_name)
+    
     def increase_app_volume(self, app_name, step=0.1):
         """Increase volume for an application by specified step"""
         current_volume = self.get_app_volume(app_name)
@@ -105,29 +588,73 @@ class AudioController:
     def mute_app(self, app_name, mute=True):
         """Mute or unmute an application"""
         try:
-            if app_name in self.sessions:
-                for session_info in self.sessions[app_name]:
+            targets = self._get_target_sessions(app_name)
+            if targets:
+                for session_info in targets:
                     volume_interface = session_info['volume']
-                    volume_interface.SetMute(mute, None)
+                    with self.com_call_seconds.time('SetMute'):
+                        volume_interface.SetMute(mute, None)
                 
-                logger.info(f"{'Muted' if mute else 'Unmuted'} {app_name}")
+                logger.debug(f"{'Muted' if mute else 'Unmuted'} {app_name}")
+                self._notify_listeners('mute', app_name, mute)
                 return True
             else:
-                logger.warning(f"Application {app_name} not found in audio sessions")
+                self._app_missing(app_name)
                 return False
                 
         except Exception as e:
             logger.error(f"Error muting {app_name}: {e}")
             return False
     
+    def _get_meter(self, session_info):
+        """Get (and cache) the peak meter interface for a session"""
+        meter = session_info.get('meter')
+        if meter is None:
+            self.meter_cache_lookups.inc('miss')
+            with self.com_call_seconds.time('QueryMeter'):
+                meter = self.session_source.get_meter(session_info['session'])
+            session_info['meter'] = meter
+        else:
+            self.meter_cache_lookups.inc('hit')
+        return meter
+    
+    def get_session_levels(self, peaks_only=False):
+        """Read volume, mute and peak level for every app in one pass
+        
+        Uses the current session snapshot without refreshing it, so it is cheap
+        enough to call once per UI frame. Returns {app_name: (volume, muted, peak)};
+        with peaks_only, volume and muted are None.
+        """
+        levels = {}
+        for app_name, session_list in list(self.sessions.items()):
+            if not session_list:
+                continue
+            try:
+                volume = muted = None
+                if not peaks_only:
+                    volume_interface = session_list[0]['volume']
+                    volume = volume_interface.GetMasterVolume()
+                    muted = bool(volume_interface.GetMute())
+                peak = 0.0
+                for session_info in session_list:
+                    peak = max(peak, self._get_meter(session_info).GetPeakValue())
+                levels[app_name] = (volume, muted, peak)
+            except Exception as e:
+                # Session went away mid-read, the next refresh drops it
+                logger.debug(f"Error reading levels for {app_name}: {e}")
+        return levels
+    
     def is_app_muted(self, app_name):
         """Check if an application is muted"""
         try:
-            if app_name in self.sessions:
-                session_info = self.sessions[app_name][0]
+            targets = self._get_target_sessions(app_name)
+            if targets:
+                session_info = targets[0]
                 volume_interface = session_info['volume']
-                is_muted = volume_interface.GetMute()
+                with self.com_call_seconds.time('GetMute'):
+                    is_muted = volume_interface.GetMute()
                 return is_muted
+            self._app_missing(app_name)
             return None
         except Exception as e:
             logger.error(f"Error checking mute status for {app_name}: {e}")
@@ -8,34 +8,53 @@ from tkinter import ttk, messagebox
 import logging
 from typing import Dict, List
 import threading
+import queue
+
+from mapping_table import MappingTable
+from mixer_panel import MixerPanel
+from task_pool import get_shared_pool
 
 logger = logging.getLogger(__name__)
 
+# How often the Tk thread drains UI commands and results from background loads
+RESULT_POLL_INTERVAL_MS = 50
+
 class ConfigGUI:
-    def __init__(self, audio_controller=None, hotkey_manager=None, app_detector=None):
+    def __init__(self, audio_controller=None, hotkey_manager=None, app_detector=None, task_pool=None):
         """Initialize the configuration GUI"""
         self.audio_controller = audio_controller
         self.hotkey_manager = hotkey_manager
         self.app_detector = app_detector
         
+        # Slow loads run on the pool, results come back to the Tk thread through this queue
+        self.task_pool = task_pool or get_shared_pool()
+        self.results = queue.Queue()
+        
+        # Tk is not thread-safe: one long-lived UI thread owns the root and runs these commands
+        self.commands = queue.Queue()
+        self.ui_thread = None
+        self._ui_thread_lock = threading.Lock()
+        
         self.root = None
-        self.hotkey_listbox = None
+        self.hotkey_table = None
         self.app_combo = None
         self.action_combo = None
         self.hotkey_entry = None
         self.step_var = None
+        self.notebook = None
+        self.mixer_panel = None
         
         self.window_open = False
     
     def create_window(self):
-        """Create the main configuration window"""
-        if self.window_open:
-            logger.warning("Configuration window is already open")
+        """Create the main configuration window (UI thread only)"""
+        if self.root:
+            logger.warning("Configuration window already exists")
             return
         
         self.root = tk.Tk()
         self.root.title("HotVolume Configuration")
-        self.root.geometry("700x500")
+        self.root.geometry("700x560")
         self.root.resizable(True, True)
         
         # Set window icon (if we had an icon file)
@@ -45,14 +64,12 @@ class ConfigGUI:
         except:
             pass
         
-        self.window_open = True
-        
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # Create the UI elements
         self.create_widgets()
-        self.refresh_data()
+        self.root.after(RESULT_POLL_INTERVAL_MS, self._poll_results)
     
     def create_widgets(self):
         """Create all GUI widgets"""
@@ -70,24 +87,28 @@ class ConfigGUI:
         title_label = ttk.Label(main_frame, text="HotVolume Configuration", font=("Arial", 16, "bold"))
         title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
         
+        # Tabs: hotkey configuration and the live mixer
+        self.notebook = ttk.Notebook(main_frame)
+        self.notebook.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 20))
+        
+        hotkeys_tab = ttk.Frame(self.notebook, padding="10")
+        hotkeys_tab.columnconfigure(0, weight=1)
+        hotkeys_tab.rowconfigure(0, weight=1)
+        self.notebook.add(hotkeys_tab, text="Hotkeys")
+        
+        self.mixer_panel = MixerPanel(self.notebook, self.audio_controller, self.task_pool)
+        self.notebook.add(self.mixer_panel.frame, text="Mixer")
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
         # Current hotkeys section
-        hotkey_frame = ttk.LabelFrame(main_frame, text="Current Hotkey Mappings", padding="10")
-        hotkey_frame.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 20))
+        hotkey_frame = ttk.LabelFrame(hotkeys_tab, text="Current Hotkey Mappings", padding="10")
+        hotkey_frame.grid(row=0, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 20))
         hotkey_frame.columnconfigure(0, weight=1)
         hotkey_frame.rowconfigure(0, weight=1)
         
-        # Hotkey listbox with scrollbar
-        listbox_frame = ttk.Frame(hotkey_frame)
-        listbox_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        listbox_frame.columnconfigure(0, weight=1)
-        listbox_frame.rowconfigure(0, weight=1)
-        
-        self.hotkey_listbox = tk.Listbox(listbox_frame, height=8)
-        self.hotkey_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        scrollbar = ttk.Scrollbar(listbox_frame, orient=tk.VERTICAL, command=self.hotkey_listbox.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.hotkey_listbox.configure(yscrollcommand=scrollbar.set)
+        # Hotkey table with filter box and sortable columns
+        self.hotkey_table = MappingTable(hotkey_frame, height=8)
+        self.hotkey_table.frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Buttons for hotkey management
         button_frame = ttk.Frame(hotkey_frame)
@@ -97,8 +118,8 @@ class ConfigGUI:
         ttk.Button(button_frame, text="Refresh", command=self.refresh_hotkeys).pack(side=tk.LEFT)
         
         # Add new hotkey section
-        add_frame = ttk.LabelFrame(main_frame, text="Add New Hotkey", padding="10")
-        add_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 20))
+        add_frame = ttk.LabelFrame(hotkeys_tab, text="Add New Hotkey", padding="10")
+        add_frame.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E))
         add_frame.columnconfigure(1, weight=1)
         
         # Hotkey input
@@ -129,33 +150,38 @@ class ConfigGUI:
         
         # Control buttons
         control_frame = ttk.Frame(main_frame)
-        control_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E))
+        control_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E))
         
         ttk.Button(control_frame, text="Start Hotkeys", command=self.start_hotkeys).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(control_frame, text="Stop Hotkeys", command=self.stop_hotkeys).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(control_frame, text="Test Hotkey", command=self.test_hotkey).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(control_frame, text="Close", command=self.on_closing).pack(side=tk.RIGHT)
     
+    def on_tab_changed(self, event=None):
+        """Run the mixer frame loop only while its tab is visible"""
+        self._update_mixer_state()
+    
+    def _update_mixer_state(self):
+        if not self.mixer_panel:
+            return
+        mixer_visible = self.window_open and self.notebook.select() == str(self.mixer_panel.frame)
+        if mixer_visible:
+            self.mixer_panel.start()
+        else:
+            self.mixer_panel.stop()
+    
     def refresh_data(self):
         """Refresh all data in the GUI"""
         self.refresh_hotkeys()
         self.refresh_applications()
     
     def refresh_hotkeys(self):
-        """Refresh the hotkey listbox"""
-        if not self.hotkey_listbox or not self.hotkey_manager:
+        """Refresh the hotkey table"""
+        if not self.hotkey_table or not self.hotkey_manager:
             return
         
         try:
-            self.hotkey_listbox.delete(0, tk.END)
-            
-            mappings = self.hotkey_manager.get_active_mappings()
-            for hotkey, mapping in mappings.items():
-                display_text = f"{hotkey} → {mapping['app']} ({mapping['action']})"
-                if mapping.get('step'):
-                    display_text += f" [step: {mapping['step']:.2f}]"
-                self.hotkey_listbox.insert(tk.END, display_text)
-                
+            self.hotkey_table.sync(self.hotkey_manager.get_active_mappings())
         except Exception as e:
             logger.error(f"Error refreshing hotkeys: {e}")
     
@@ -164,6 +190,11 @@ class ConfigGUI:
         if not self.app_combo:
             return
         
+        # Session enumeration and the registry/process lookup are too slow for the Tk thread
+        self.task_pool.submit(self._load_applications, key='config_applications')
+    
+    def _load_applications(self):
+        """Collect application names (runs on a worker thread)"""
         try:
             apps = []
             
@@ -172,9 +203,9 @@ class ConfigGUI:
                 audio_apps = self.audio_controller.get_available_apps()
                 apps.extend(audio_apps)
             
-            # Get applications from app detector
+            # Get applications that have owned audio sessions before
             if self.app_detector:
-                detected_apps = self.app_detector.get_audio_capable_apps()
+                detected_apps = self.app_detector.get_known_audio_apps()
                 for app in detected_apps:
                     if app['name'] not in apps:
                         apps.append(app['name'])
@@ -186,14 +217,46 @@ class ConfigGUI:
                     apps.append(app)
             
             apps.sort()
-            self.app_combo['values'] = apps
-            
-            if apps and not self.app_combo.get():
-                self.app_combo.set(apps[0])
+            self.results.put(('applications', apps))
                 
         except Exception as e:
             logger.error(f"Error refreshing applications: {e}")
     
+    def _poll_results(self):
+        """Run queued UI commands and apply finished background loads on the Tk thread"""
+        try:
+            while True:
+                command = self.commands.get_nowait()
+                if not self._run_command(command):
+                    return
+        except queue.Empty:
+            pass
+        
+        try:
+            while True:
+                kind, payload = self.results.get_nowait()
+                if kind == 'applications':
+                    self._apply_applications(payload)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logger.error(f"Error applying background results: {e}")
+        
+        if self.root:
+            self.root.after(RESULT_POLL_INTERVAL_MS, self._poll_results)
+    
+    def _apply_applications(self, apps):
+        """Update the application combobox if its values changed"""
+        if not self.app_combo:
+            return
+        
+        values = tuple(apps)
+        if tuple(self.app_combo['values']) != values:
+            self.app_combo['values'] = values
+        
+        if apps and not self.app_combo.get():
+            self.app_combo.set(apps[0])
+    
     def add_hotkey(self):
         """Add a new hotkey mapping"""
         try:
@@ -234,24 +297,20 @@ class ConfigGUI:
             messagebox.showerror("Error", f"Failed to add hotkey: {str(e)}")
     
     def remove_hotkey(self):
-        """Remove the selected hotkey mapping"""
+        """Remove the selected hotkey mappings"""
         try:
-            selection = self.hotkey_listbox.curselection()
-            if not selection:
+            hotkeys = self.hotkey_table.selected_hotkeys()
+            if not hotkeys:
                 messagebox.showwarning("Warning", "Please select a hotkey to remove")
                 return
             
-            # Get the hotkey from the selected text
-            selected_text = self.hotkey_listbox.get(selection[0])
-            hotkey = selected_text.split(" →")[0]
-            
             if self.hotkey_manager:
-                success = self.hotkey_manager.remove_hotkey_mapping(hotkey)
-                if success:
-                    self.refresh_hotkeys()
-                    messagebox.showinfo("Success", f"Removed hotkey: {hotkey}")
+                failed = [hotkey for hotkey in hotkeys if not self.hotkey_manager.remove_hotkey_mapping(hotkey)]
+                self.refresh_hotkeys()
+                if failed:
+                    messagebox.showerror("Error", f"Failed to remove hotkey mapping: {', '.join(failed)}")
                 else:
-                    messagebox.showerror("Error", "Failed to remove hotkey mapping")
+                    messagebox.showinfo("Success", f"Removed hotkey: {', '.join(hotkeys)}")
             
         except Exception as e:
             logger.error(f"Error removing hotkey: {e}")
@@ -288,43 +347,87 @@ class ConfigGUI:
             else:
                 messagebox.showerror("Error", f"Invalid hotkey format: '{hotkey}'")
     
-    def on_closing(self):
-        """Handle window closing"""
+    def _on_ui_thread(self):
+        """Check whether the caller is the thread that owns the Tk root"""
+        return self.ui_thread is not None and threading.current_thread() is self.ui_thread
+    
+    def _ensure_ui_thread(self):
+        """Start the UI thread the first time the window is needed"""
+        with self._ui_thread_lock:
+            if self.ui_thread is None or not self.ui_thread.is_alive():
+                self.ui_thread = threading.Thread(target=self._run_ui, name="hotvolume-ui", daemon=True)
+                self.ui_thread.start()
+    
+    def _run_ui(self):
+        """UI thread body: owns the Tk root for the lifetime of the application"""
         try:
-            self.window_open = False
-            if self.root:
-                self.root.withdraw()  # Hide instead of destroy
-                logger.info("Configuration window hidden")
+            self.create_window()
+            self.root.withdraw()
+            # Commands queued before the root existed are picked up by the first poll
+            self.root.mainloop()
         except Exception as e:
-            logger.error(f"Error hiding configuration window: {e}")
+            logger.error(f"Error in configuration UI thread: {e}")
+        finally:
+            self.root = None
+            self.window_open = False
     
-    def show(self):
-        """Show the configuration window"""
-        def run_gui():
-            if not self.root:
-                self.create_window()
-            else:
-                # Refresh data and show existing window
+    def _run_command(self, command):
+        """Execute one UI command on the Tk thread, returning False once the UI quits"""
+        try:
+            if command == 'show':
                 self.refresh_data()
                 self.root.deiconify()  # Show the window
                 self.root.lift()
                 self.root.attributes('-topmost', True)
                 self.root.attributes('-topmost', False)
-            
-            if self.root:
-                self.root.mainloop()
-        
-        if not self.window_open:
-            self.window_open = True
-            gui_thread = threading.Thread(target=run_gui, daemon=True)
-            gui_thread.start()
-        else:
-            # Bring existing window to front
-            if self.root:
-                self.root.deiconify()
-                self.root.lift()
-                self.root.attributes('-topmost', True)
-                self.root.attributes('-topmost', False)
+                self.window_open = True
+                self._update_mixer_state()
+            elif command == 'hide':
+                self.root.withdraw()  # Hide instead of destroy
+                self.window_open = False
+                self._update_mixer_state()
+                logger.info("Configuration window hidden")
+            elif command == 'refresh':
+                self.refresh_data()
+            elif command == 'quit':
+                self.window_open = False
+                self._update_mixer_state()
+                self.root.destroy()
+                return False
+        except Exception as e:
+            logger.error(f"Error running configuration window command '{command}': {e}")
+        return True
+    
+    def _send_command(self, command):
+        """Queue a command for the UI thread"""
+        self.commands.put(command)
+    
+    def on_closing(self):
+        """Handle window closing"""
+        self.window_open = False
+        if self._on_ui_thread():
+            self._run_command('hide')
+        elif self.ui_thread is not None:
+            self._send_command('hide')
+    
+    def show(self):
+        """Show the configuration window"""
+        self.window_open = True
+        self._ensure_ui_thread()
+        self._send_command('show')
+    
+    def refresh(self):
+        """Reload the data shown in the window"""
+        if self.ui_thread is not None:
+            self._send_command('refresh')
+    
+    def shutdown(self, timeout=2.0):
+        """Destroy the window and stop the UI thread"""
+        if self.ui_thread is None or not self.ui_thread.is_alive():
+            return
+        self._send_command('quit')
+        if not self._on_ui_thread():
+            self.ui_thread.join(timeout)
 
 # Test the configuration GUI
 if __name__ == "__main__":
@@ -0,0 +1,322 @@
+"""
+Control Server
+Local control channel (Unix socket or Windows named pipe) for scripts and external tools
+
+Each request and response is one length-prefixed message (multiprocessing.connection
+framing). Requests are a command line such as "set Spotify.exe 0.5", responses start
+with "ok" or "err". Responses on a connection come back in request order, so clients
+can pipeline many requests before reading.
+"""
+
+import os
+import math
+import shlex
+import tempfile
+import threading
+import logging
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List
+
+from task_pool import init_com_for_thread
+
+logger = logging.getLogger(__name__)
+
+# Longest request accepted, anything bigger is treated as a broken client
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Fades running at once, each holds a thread for its duration
+MAX_RAMPS = 16
+
+# Longest fade accepted, in seconds
+MAX_RAMP_DURATION = 60.0
+
+def default_address() -> str:
+    """Per-user address of the control channel"""
+    if os.name == 'nt':
+        user = os.environ.get('USERNAME', 'user')
+        return rf'\\.\pipe\hotvolume-{user}'
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f'hotvolume-{os.getuid()}.sock')
+
+def default_token_path() -> str:
+    """Per-user file holding the running instance's HTTP API token, next to the control channel
+    
+    A named pipe has no directory, on Windows the file goes to the user's own temp directory.
+    """
+    if os.name == 'nt':
+        user = os.environ.get('USERNAME', 'user')
+        return os.path.join(tempfile.gettempdir(), f'hotvolume-{user}.token')
+    return os.path.splitext(default_address())[0] + '.token'
+
+def address_family(address: str) -> str:
+    return 'AF_PIPE' if address.startswith('\\\\') else 'AF_UNIX'
+
+class CommandError(Exception):
+    """A request that could not be carried out, reported to the client as "err <message>" """
+
+def parse_volume(text: str, current=None) -> float:
+    """Parse an absolute volume (0.5, 50%) or a relative one (+0.1, -10%)"""
+    relative = text[:1] in '+-'
+    try:
+        if text.endswith('%'):
+            value = float(text[:-1]) / 100
+        else:
+            value = float(text)
+    except ValueError:
+        raise CommandError(f"invalid volume: {text}")
+    
+    if relative:
+        if current is None:
+            raise CommandError("app has no audio session")
+        value += current
+    return max(0.0, min(1.0, value))
+
+class ControlServer:
+    def __init__(self, audio_controller, address: str = None):
+        """Initialize the control server"""
+        self.audio_controller = audio_controller
+        self.address = address or default_address()
+        self.listener = None
+        self.accept_thread = None
+        self.running = False
+        self.connections = set()
+        self._connections_lock = threading.Lock()
+        # App -> thread running its fade, at most one per app
+        self.ramps: Dict[str, threading.Thread] = {}
+        self._ramps_lock = threading.Lock()
+        
+        # Command name -> handler(args) returning the response payload
+        self.commands: Dict[str, Callable[[List[str]], str]] = {
+            'ping': self._cmd_ping,
+            'list': self._cmd_list,
+            'get': self._cmd_get,
+            'set': self._cmd_set,
+            'mute': self._cmd_mute,
+            'ramp': self._cmd_ramp,
+        }
+    
+    def register_command(self, name: str, handler: Callable[[List[str]], str]):
+        """Add a command, handler gets the arguments after the name and returns the payload"""
+        self.commands[name] = handler
+    
+    def start(self) -> bool:
+        """Start accepting connections"""
+        if self.running:
+            return True
+        
+        family = address_family(self.address)
+        try:
+            if family == 'AF_UNIX' and os.path.exists(self.address):
+                if self._address_in_use():
+                    logger.error(f"Control channel {self.address} is already in use by another instance")
+                    return False
+                # Left behind by an instance that did not shut down cleanly
+                os.unlink(self.address)
+            
+            old_umask = os.umask(0o077) if family == 'AF_UNIX' else None
+            try:
+                self.listener = Listener(self.address, family=family)
+            finally:
+                if old_umask is not None:
+                    os.umask(old_umask)
+        except OSError as e:
+            logger.error(f"Could not open control channel {self.address}: {e}")
+            return False
+        
+        self.running = True
+        self.accept_thread = threading.Thread(target=self._accept_loop, name="hotvolume-control", daemon=True)
+        self.accept_thread.start()
+        logger.info(f"Control channel listening on {self.address}")
+        return True
+    
+    def _address_in_use(self) -> bool:
+        try:
+            Client(self.address, family=address_family(self.address)).close()
+            return True
+        except OSError:
+            return False
+    
+    def stop(self):
+        """Stop accepting connections and close open ones"""
+        if not self.running:
+            return
+        self.running = False
+        
+        # accept() does not return on close everywhere, so wake it with a throwaway connection
+        try:
+            Client(self.address, family=address_family(self.address)).close()
+        except OSError:
+            pass
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        
+        with self._connections_lock:
+            for connection in list(self.connections):
+                connection.close()
+            self.connections.clear()
+        logger.info("Control channel closed")
+    
+    def _accept_loop(self):
+        while self.running:
+            try:
+                connection = self.listener.accept()
+            except OSError as e:
+                if self.running:
+                    logger.error(f"Error accepting control connection: {e}")
+                continue
+            
+            if not self.running:
+                connection.close()
+                break
+            
+            with self._connections_lock:
+                self.connections.add(connection)
+            threading.Thread(
+                target=self._serve_connection, args=(connection,),
+                name="hotvolume-control-client", daemon=True
+            ).start()
+    
+    def _serve_connection(self, connection):
+        """Answer requests on one connection in order until the client disconnects"""
+        init_com_for_thread()
+        try:
+            while self.running:
+                try:
+                    request = connection.recv_bytes(MAX_REQUEST_BYTES)
+                except (EOFError, OSError):
+                    break
+                connection.send_bytes(self.handle_request(request.decode('utf-8', 'replace')).encode('utf-8'))
+        except OSError as e:
+            logger.debug(f"Control connection closed: {e}")
+        finally:
+            with self._connections_lock:
+                self.connections.discard(connection)
+            connection.close()
+    
+    def handle_request(self, request: str) -> str:
+        """Run one command line and build its response"""
+        try:
+            parts = shlex.split(request)
+        except ValueError as e:
+            return f"err {e}"
+        if not parts:
+            return "err empty request"
+        
+        handler = self.commands.get(parts[0].lower())
+        if handler is None:
+            return f"err unknown command: {parts[0]}"
+        
+        try:
+            payload = handler(parts[1:])
+        except CommandError as e:
+            return f"err {e}"
+        except Exception as e:
+            logger.error(f"Error handling control command {request!r}: {e}")
+            return f"err {e}"
+        return f"ok {payload}" if payload else "ok"
+    
+    def _require_app(self, args: List[str], usage: str) -> str:
+        if not args:
+            raise CommandError(f"usage: {usage}")
+        app_name = args[0]
+        if not self.audio_controller.find_app(app_name):
+            raise CommandError(f"no audio session for {app_name}")
+        return app_name
+    
+    def _cmd_ping(self, args):
+        return "pong"
+    
+    def _cmd_list(self, args):
+        """list: session count, then one "app<TAB>volume<TAB>muted" line per session"""
+        if args[:1] == ['--refresh'] or not self.audio_controller.get_session_names():
+            self.audio_controller.refresh_sessions()
+        levels = self.audio_controller.get_session_levels()
+        lines = []
+        for app_name in sorted(levels):
+            volume, muted, _ = levels[app_name]
+            volume_text = 'unknown' if volume is None else f"{volume:.2f}"
+            lines.append(f"{app_name}\t{volume_text}\t{'muted' if muted else 'unmuted'}")
+        return '\n'.join([str(len(lines))] + lines)
+    
+    def _cmd_get(self, args):
+        """get APP: current volume"""
+        app_name = self._require_app(args, "get APP")
+        volume = self.audio_controller.get_app_volume(app_name)
+        if volume is None:
+            raise CommandError(f"could not read volume of {app_name}")
+        return f"{volume:.2f}"
+    
+    def _cmd_set(self, args):
+        """set APP VOLUME: absolute (0.5, 50%) or relative (+0.1, -5%) volume"""
+        app_name = self._require_app(args, "set APP VOLUME")
+        if len(args) != 2:
+            raise CommandError("usage: set APP VOLUME")
+        current = self.audio_controller.get_app_volume(app_name) if args[1][:1] in '+-' else None
+        volume = parse_volume(args[1], current)
+        
+        # An explicit value wins over a fade in progress
+        self.audio_controller.cancel_ramp(app_name)
+        if not self.audio_controller.set_app_volume(app_name, volume):
+            raise CommandError(f"could not set volume of {app_name}")
+        return f"{volume:.2f}"
+    
+    def _cmd_mute(self, args):
+        """mute APP [on|off|toggle]"""
+        app_name = self._require_app(args, "mute APP [on|off|toggle]")
+        mode = args[1].lower() if len(args) > 1 else 'toggle'
+        if mode == 'toggle':
+            muted = self.audio_controller.is_app_muted(app_name)
+            if muted is None:
+                raise CommandError(f"could not read mute state of {app_name}")
+            mute = not muted
+        elif mode in ('on', 'off'):
+            mute = mode == 'on'
+        else:
+            raise CommandError("usage: mute APP [on|off|toggle]")
+        
+        if not self.audio_controller.mute_app(app_name, mute):
+            raise CommandError(f"could not change mute state of {app_name}")
+        return 'muted' if mute else 'unmuted'
+    
+    def _cmd_ramp(self, args):
+        """ramp APP VOLUME [MILLISECONDS]: fade in the background, answers immediately"""
+        app_name = self._require_app(args, "ramp APP VOLUME [MILLISECONDS]")
+        if len(args) not in (2, 3):
+            raise CommandError("usage: ramp APP VOLUME [MILLISECONDS]")
+        current = self.audio_controller.get_app_volume(app_name) if args[1][:1] in '+-' else None
+        target = parse_volume(args[1], current)
+        try:
+            duration = float(args[2]) / 1000 if len(args) == 3 else 0.5
+        except ValueError:
+            raise CommandError(f"invalid duration: {args[2]}")
+        if not math.isfinite(duration) or not 0 <= duration <= MAX_RAMP_DURATION:
+            raise CommandError(f"duration must be 0 to {MAX_RAMP_DURATION * 1000:.0f} milliseconds")
+        
+        with self._ramps_lock:
+            previous = self.ramps.get(app_name)
+            if previous is None and len(self.ramps) >= MAX_RAMPS:
+                raise CommandError(f"{MAX_RAMPS} ramps already running")
+            # The new fade replaces this app's running one, which stops at its next step
+            generation = self.audio_controller.cancel_ramp(app_name)
+            # Own thread rather than the shared pool, a fade would hold a worker for its whole duration
+            thread = threading.Thread(
+                target=self._run_ramp, args=(app_name, target, duration, generation, previous),
+                name="hotvolume-ramp", daemon=True
+            )
+            self.ramps[app_name] = thread
+            thread.start()
+        return f"{target:.2f}"
+    
+    def _run_ramp(self, app_name, target, duration, generation, previous=None):
+        try:
+            if previous is not None:
+                # Start from where the cancelled fade left off
+                previous.join()
+            init_com_for_thread()
+            self.audio_controller.ramp_app_volume(app_name, target, duration, generation=generation)
+        finally:
+            with self._ramps_lock:
+                if self.ramps.get(app_name) is threading.current_thread():
+                    del self.ramps[app_name]
@@ -0,0 +1,112 @@
+"""
+HotVolume Control Client
+Sends commands to a running HotVolume over its control channel
+
+    run_hotvolume.py ctl set Spotify.exe 50%
+    run_hotvolume.py ctl -c "mute chrome.exe on" -c "ramp Spotify.exe 0.2 1000"
+    my-script | run_hotvolume.py ctl -        (one command per line, pipelined)
+"""
+
+import sys
+import shlex
+import argparse
+from collections import deque
+from multiprocessing.connection import Client
+from typing import Iterable, Iterator, Tuple
+
+from control_server import address_family, default_address
+
+# Requests sent ahead of their responses, bounded so neither side blocks on a full pipe
+DEFAULT_WINDOW = 64
+
+class ControlClient:
+    def __init__(self, address: str = None, window: int = DEFAULT_WINDOW):
+        """Initialize the client, connect() opens the connection"""
+        self.address = address or default_address()
+        self.window = window
+        self.connection = None
+    
+    def connect(self):
+        """Connect to the running instance, raises OSError if there is none"""
+        if self.connection is None:
+            self.connection = Client(self.address, family=address_family(self.address))
+        return self
+    
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+    
+    def __enter__(self):
+        return self.connect()
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def request(self, command: str) -> str:
+        """Send one command and wait for its response"""
+        self.connect()
+        self.connection.send_bytes(command.encode('utf-8'))
+        return self.connection.recv_bytes().decode('utf-8')
+    
+    def pipeline(self, commands: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """Send commands without waiting for each response, yielding (command, response) in order"""
+        self.connect()
+        pending = deque()
+        for command in commands:
+            command = command.strip()
+            if not command or command.startswith('#'):
+                continue
+            if len(pending) >= self.window:
+                yield pending.popleft(), self.connection.recv_bytes().decode('utf-8')
+            self.connection.send_bytes(command.encode('utf-8'))
+            pending.append(command)
+        
+        while pending:
+            yield pending.popleft(), self.connection.recv_bytes().decode('utf-8')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="hotvolume ctl",
+        description="Control a running HotVolume: ping, list, get APP, set APP VOLUME, mute APP [on|off|toggle], ramp APP VOLUME [MS], metrics, profile [start|stop]"
+    )
+    parser.add_argument('command', nargs='*', help="one command, or - to read commands from stdin")
+    parser.add_argument('-c', '--command', dest='commands', action='append', default=[],
+                        help="a command to send, can be repeated")
+    parser.add_argument('--address', default=None, help="control channel address")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="requests in flight at once")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only print errors")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """Entry point for `hotvolume ctl`, returns the exit code"""
+    args = parse_args(argv)
+    
+    if args.command == ['-']:
+        commands = sys.stdin
+    else:
+        commands = list(args.commands)
+        if args.command:
+            commands.append(shlex.join(args.command))
+    if not commands:
+        print("No command given, try: ctl list", file=sys.stderr)
+        return 2
+    
+    failed = False
+    try:
+        with ControlClient(args.address, window=max(1, args.window)) as client:
+            for command, response in client.pipeline(commands):
+                status, _, payload = response.partition(' ')
+                if status != 'ok':
+                    failed = True
+                    print(f"{command}: {payload}", file=sys.stderr)
+                elif payload and not args.quiet:
+                    print(payload)
+    except (OSError, EOFError) as e:
+        print(f"Could not reach HotVolume at {args.address or default_address()}: {e}", file=sys.stderr)
+        return 2
+    
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
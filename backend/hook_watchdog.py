@@ -0,0 +1,269 @@
+"""
+Hotkey Hook Watchdog
+Supervises the keyboard hook and re-registers the hotkeys when it dies or stalls
+"""
+
+import sys
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# How often the watchdog looks at the hook
+CHECK_INTERVAL = 1.0
+
+# A hook callback running longer than this blocks every key press. Windows also
+# drops low-level hooks that miss its LowLevelHooksTimeout (a few hundred ms by
+# default) too often, without telling the process.
+STALL_TIMEOUT = 2.0
+
+# One slow callback (a config save, a COM call after resume) can happen; the hook
+# is only restarted after this many overruns within STALL_WINDOW seconds
+STALL_OVERRUNS = 3
+STALL_WINDOW = 60.0
+
+# Delay before a restart, doubled after each restart that did not hold
+MIN_RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 60.0
+
+# Hook latency buckets: key events normally reach Python within a few milliseconds
+HOOK_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def load_keyboard():
+    """The keyboard module, imported on first use so trace replays and tests run without it"""
+    import keyboard
+    return keyboard
+
+# Private attributes of keyboard's listener (as of keyboard 0.13.5) that hook death
+# detection relies on, checked once the listener has started
+LISTENER_ATTRIBUTES = ('listening', 'listening_thread', 'lock')
+
+# None until a started listener has been checked
+_listener_supported: Optional[bool] = None
+
+def _keyboard_listener():
+    """keyboard's listener once it has started, None if it hasn't or has unexpected internals"""
+    global _listener_supported
+    # Nothing is hooked before keyboard has been imported
+    listener = getattr(sys.modules.get('keyboard'), '_listener', None)
+    if not getattr(listener, 'listening', False):
+        return None
+    if _listener_supported is None:
+        _listener_supported = all(hasattr(listener, attribute) for attribute in LISTENER_ATTRIBUTES)
+        if not _listener_supported:
+            logger.warning("Unrecognized keyboard module internals, the hook watchdog will not detect a dead "
+                           "keyboard hook thread (stalls and listener failures are still handled)")
+    return listener if _listener_supported else None
+
+def keyboard_hook_alive() -> bool:
+    """Whether the keyboard module's hook thread is still running
+    
+    keyboard does not expose this, so its listener is looked at directly. A
+    listener that has not started, or whose internals are not recognized,
+    counts as alive.
+    """
+    listener = _keyboard_listener()
+    return listener is None or listener.listening_thread.is_alive()
+
+def reset_keyboard_hook():
+    """Let keyboard install a fresh hook on the next registration if its hook thread died"""
+    listener = _keyboard_listener()
+    if listener is not None and not listener.listening_thread.is_alive():
+        with listener.lock:
+            listener.listening = False
+
+class HookWatchdog:
+    def __init__(self, hotkey_manager, check_interval: float = CHECK_INTERVAL, stall_timeout: float = STALL_TIMEOUT,
+                 stall_overruns: int = STALL_OVERRUNS, stall_window: float = STALL_WINDOW):
+        """Initialize the watchdog, start() begins supervising"""
+        self.hotkey_manager = hotkey_manager
+        self.check_interval = check_interval
+        self.stall_timeout = stall_timeout
+        self.stall_overruns = stall_overruns
+        self.stall_window = stall_window
+        
+        self.restart_count = 0
+        self.last_failure: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+        
+        # perf_counter() when the running hook callback started, None when idle
+        self._callback_started: Optional[float] = None
+        self._stall_reported = False
+        # monotonic() times of recent callback overruns
+        self._overruns = deque(maxlen=stall_overruns)
+        # Set once callbacks overran often enough, handled on the watchdog thread
+        self._pending_failure: Optional[str] = None
+        self.last_event_at: Optional[float] = None
+        self._probe = None
+        
+        self._restart_delay = MIN_RESTART_DELAY
+        self._next_restart_at = 0.0
+        self._last_restart_at = 0.0
+        self._stop_event = threading.Event()
+        self.thread = None
+        
+        self.callback_seconds = Histogram(
+            "hotvolume_hook_callback_seconds", "Time spent inside hotkey hook callbacks", buckets=HOOK_LATENCY_BUCKETS
+        )
+        self.event_latency = Histogram(
+            "hotvolume_hook_event_latency_seconds",
+            "Delay between a key event and keyboard's event processing thread handling it, "
+            "including time spent in suppressing hotkey callbacks on the hook thread",
+            buckets=HOOK_LATENCY_BUCKETS
+        )
+        self.restarts = Counter("hotvolume_hook_restarts_total", "Hotkey hook restarts by cause", labels=('cause',))
+        self.metrics = [
+            self.callback_seconds, self.event_latency, self.restarts,
+            Gauge("hotvolume_hook_last_failure_timestamp_seconds", "Unix time of the last hook failure",
+                  func=lambda: self.last_failure_at or 0),
+            Gauge("hotvolume_hook_seconds_since_last_event",
+                  "Seconds since keyboard's event processing thread last handled a key event",
+                  func=lambda: time.monotonic() - self.last_event_at if self.last_event_at else 0),
+        ]
+    
+    def start(self):
+        """Start the supervising thread and the latency probe (no-op if running)"""
+        self.install_probe()
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="hotvolume-hook-watchdog", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop supervising"""
+        self._stop_event.set()
+        self.remove_probe()
+        if self.thread:
+            self.thread.join(timeout=self.check_interval * 2)
+            self.thread = None
+    
+    def install_probe(self):
+        """Hook every key event to heartbeat keyboard's event processing and time event delivery"""
+        if self._probe is None:
+            try:
+                self._probe = load_keyboard().hook(self._on_key_event)
+            except Exception as e:
+                logger.debug(f"Could not install hook latency probe: {e}")
+    
+    def remove_probe(self):
+        if self._probe is not None:
+            try:
+                load_keyboard().unhook(self._probe)
+            except Exception:
+                pass
+            self._probe = None
+    
+    def _on_key_event(self, event):
+        # Not a suppressing hook, so keyboard calls this on its event processing thread
+        # once the hook thread has queued the event. event.time is stamped on the hook
+        # thread, the latency therefore covers the suppressing hotkey callbacks that ran
+        # first plus the wait in keyboard's queue. Runs for every key event, keep it cheap.
+        self.last_event_at = time.monotonic()
+        event_time = getattr(event, 'time', None)
+        if event_time:
+            self.event_latency.observe(max(0.0, time.time() - event_time))
+    
+    @contextmanager
+    def track_callback(self):
+        """Time a hotkey callback, the hook thread is blocked while it runs"""
+        started = time.perf_counter()
+        self._callback_started = started
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            self._callback_started = None
+            self.callback_seconds.observe(duration)
+            if duration > self.stall_timeout:
+                self._callback_overran(duration)
+    
+    def _callback_overran(self, duration: float):
+        now = time.monotonic()
+        self._overruns.append(now)
+        recent = sum(1 for overrun in self._overruns if now - overrun <= self.stall_window)
+        if recent >= self.stall_overruns:
+            self._overruns.clear()
+            self._pending_failure = (f"hook callback blocked for {duration:.1f}s, "
+                                     f"{recent} overruns within {self.stall_window:.0f}s")
+        else:
+            logger.warning(f"Hotkey callback blocked the hook for {duration:.1f}s "
+                           f"({recent} of {self.stall_overruns} overruns before a restart)")
+    
+    def check(self) -> Optional[str]:
+        """Return why the hook needs a restart, None if it looks healthy"""
+        manager = self.hotkey_manager
+        if not manager.listener_wanted:
+            return None
+        
+        started = self._callback_started
+        if started is not None and time.perf_counter() - started > self.stall_timeout:
+            # Nothing can be re-registered while the hook thread is stuck, report it
+            # now and restart once the callback returns
+            if not self._stall_reported:
+                self._stall_reported = True
+                logger.warning(f"Hotkey callback has been running for over {self.stall_timeout:.1f}s, key presses are blocked")
+            return None
+        self._stall_reported = False
+        
+        if self._pending_failure:
+            return self._pending_failure
+        if not keyboard_hook_alive():
+            return "keyboard hook thread exited"
+        thread = manager.hotkey_thread
+        if not manager.is_running or thread is None or not thread.is_alive():
+            error = manager.last_listener_error
+            return f"hotkey listener stopped: {error}" if error else "hotkey listener stopped"
+        return None
+    
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                reason = self.check()
+                if reason and time.monotonic() >= self._next_restart_at:
+                    self.restart(reason)
+            except Exception as e:
+                logger.error(f"Error in hotkey watchdog: {e}")
+    
+    def restart(self, reason: str):
+        """Re-register the current mapping set on a fresh hook"""
+        now = time.monotonic()
+        # Restarts that hold for a while start the backoff over
+        if now - self._last_restart_at > MAX_RESTART_DELAY:
+            self._restart_delay = MIN_RESTART_DELAY
+        
+        self.restart_count += 1
+        self.last_failure = reason
+        self.last_failure_at = time.time()
+        self._pending_failure = None
+        self._overruns.clear()
+        self.restarts.inc(self._cause_of(reason))
+        logger.warning(f"Restarting hotkey hook ({reason}), restart #{self.restart_count}")
+        
+        self.remove_probe()
+        reset_keyboard_hook()
+        restarted = self.hotkey_manager.restart_hotkey_listener()
+        self.install_probe()
+        
+        self._last_restart_at = now
+        self._next_restart_at = now + self._restart_delay
+        self._restart_delay = min(self._restart_delay * 2, MAX_RESTART_DELAY)
+        if not restarted:
+            logger.error(f"Hotkey hook restart failed, retrying in {self._next_restart_at - now:.0f}s")
+        self.hotkey_manager._state_changed('watchdog')
+        return restarted
+    
+    @staticmethod
+    def _cause_of(reason: str) -> str:
+        """Low-cardinality metric label for a failure reason"""
+        if reason.startswith("hook callback"):
+            return 'stalled'
+        if reason.startswith("keyboard hook"):
+            return 'hook_thread'
+        return 'listener'
@@ -3,9 +3,13 @@ Global Hotkey Manager
 Handles registration and execution of global keyboard shortcuts
 """
 
-import keyboard
 import threading
 import logging
+from collections import deque
+from concurrent.futures import Future
+from logging_setup import RateLimiter, log_rate_limited
+from metrics import Counter, Gauge, Histogram
+from hook_watchdog import HookWatchdog, load_keyboard
 from typing import Dict, Callable, List
 import time
 import json
@@ -14,14 +18,63 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Presses kept while audio sessions are still loading, older ones are dropped
+MAX_PENDING_ACTIONS = 32
+
+# What a mapping's 'action' may be
+ACTIONS = ('increase', 'decrease', 'mute', 'unmute', 'toggle_mute')
+
+# Repeated action failures for the same app and action are logged once a minute
+FAILURE_WARNING_INTERVAL = 60.0
+
 class HotkeyManager:
-    def __init__(self, audio_controller=None):
-        """Initialize the hotkey manager"""
+    def __init__(self, audio_controller=None, load_config=True):
+        """Initialize the hotkey manager
+        
+        With load_config=False the saved configuration is loaded later by
+        calling load_configuration(), e.g. from a startup worker.
+        """
         self.audio_controller = audio_controller
         self.registered_hotkeys = {}
         self.app_mappings = {}
         self.is_running = False
         self.hotkey_thread = None
+        # Whether the listener should be running, the watchdog restarts it if it is not
+        self.listener_wanted = False
+        self.last_listener_error = None
+        self.watchdog = HookWatchdog(self)
+        # Set while presses are being recorded (see hotkey_trace)
+        self.trace_recorder = None
+        
+        # Bumped whenever mappings or listener state change
+        self.state_version = 0
+        self.listeners = []
+        
+        # Resolved once the configuration has been loaded
+        self.ready = Future()
+        
+        # Actions pressed before the audio controller is ready, None once they have been flushed
+        self._pending_actions = None
+        self._pending_lock = threading.Lock()
+        self._watch_audio_ready()
+        self._failure_warnings = RateLimiter(FAILURE_WARNING_INTERVAL)
+        
+        # Metrics, collected by a MetricsRegistry
+        self.press_count = Counter("hotvolume_hotkey_presses_total", "Hotkey presses", labels=('hotkey',))
+        self.action_seconds = Histogram(
+            "hotvolume_hotkey_action_seconds", "Time to carry out a hotkey action", labels=('action',)
+        )
+        self.failure_count = Counter(
+            "hotvolume_hotkey_action_failures_total", "Hotkey actions that did not change anything", labels=('action',)
+        )
+        self.metrics = [
+            self.press_count, self.action_seconds, self.failure_count,
+            # Presses run inline on the hook thread, the only queue is the one held back at startup
+            Gauge("hotvolume_hotkey_startup_pending_actions",
+                  "Hotkey actions held back until the first audio session scan finishes, zero after startup",
+                  func=lambda: len(self._pending_actions or ())),
+            Gauge("hotvolume_hotkey_mappings", "Configured hotkey mappings", func=lambda: len(self.app_mappings)),
+        ] + self.watchdog.metrics
         
         # Configuration file path
         self.config_file = Path("hotkey_config.json")
@@ -40,22 +93,81 @@ class HotkeyManager:
         }
         
         # Load saved configuration
-        self.load_configuration()
+        if load_config:
+            self.load_configuration()
     
     def set_audio_controller(self, controller):
         """Set the audio controller instance"""
         self.audio_controller = controller
+        self._watch_audio_ready()
+    
+    def _watch_audio_ready(self):
+        """Queue actions until the audio controller's first session scan has finished"""
+        ready = getattr(self.audio_controller, 'ready', None)
+        with self._pending_lock:
+            if ready is None or ready.done():
+                self._pending_actions = None
+                return
+            if self._pending_actions is None:
+                self._pending_actions = deque(maxlen=MAX_PENDING_ACTIONS)
+        ready.add_done_callback(self._flush_pending_actions)
+    
+    def _dispatch_hotkey_action(self, mapping: Dict):
+        """Run a hotkey action now, or queue it while audio sessions are loading"""
+        with self._pending_lock:
+            if self._pending_actions is not None:
+                self._pending_actions.append(mapping)
+                logger.debug(f"Audio sessions not ready yet, queued {mapping['action']} on {mapping['app']}")
+                return
+        self._execute_hotkey_action(mapping)
+    
+    def _flush_pending_actions(self, _future=None):
+        """Run queued actions in press order, then execute new presses directly"""
+        while True:
+            with self._pending_lock:
+                if not self._pending_actions:
+                    self._pending_actions = None
+                    return
+                batch = list(self._pending_actions)
+                self._pending_actions.clear()
+            
+            logger.info(f"Audio sessions ready, running {len(batch)} queued hotkey actions")
+            for mapping in batch:
+                self._execute_hotkey_action(mapping)
+    
+    def add_listener(self, callback):
+        """Register a callback(event) for mapping and listener state changes"""
+        self.listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """Unregister a state change callback"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def _state_changed(self, event):
+        """Bump the state version and notify listeners"""
+        self.state_version += 1
+        for callback in list(self.listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in hotkey state listener: {e}")
     
     def add_hotkey_mapping(self, hotkey: str, app_name: str, action: str, step: float = 0.1):
-        """Add a new hotkey mapping"""
+        """Add a new hotkey mapping, replacing any existing one for the same hotkey"""
         try:
             mapping = {
                 'app': app_name,
-                'action': action,  # 'increase', 'decrease', 'mute', 'unmute'
+                'action': action,  # one of ACTIONS
                 'step': step
             }
+            # Unhook the old mapping, otherwise one press would run both actions
+            if self.is_running and hotkey in self.registered_hotkeys:
+                load_keyboard().remove_hotkey(hotkey)
+                del self.registered_hotkeys[hotkey]
             self.app_mappings[hotkey] = mapping
             logger.info(f"Added hotkey mapping: {hotkey} -> {app_name} ({action})")
+            self._state_changed('mappings')
             
             # Save configuration
             self.save_configuration()
@@ -80,10 +192,11 @@ class HotkeyManager:
                 
                 # If hotkeys are running, unregister this one
                 if self.is_running:
-                    keyboard.remove_hotkey(hotkey)
+                    load_keyboard().remove_hotkey(hotkey)
                     if hotkey in self.registered_hotkeys:
                         del self.registered_hotkeys[hotkey]
                 
+                self._state_changed('mappings')
                 logger.info(f"Removed hotkey mapping: {hotkey}")
                 return True
         except Exception as e:
@@ -94,16 +207,41 @@ class HotkeyManager:
         """Register a single hotkey"""
         try:
             def hotkey_callback():
-                self._execute_hotkey_action(mapping)
+                self.handle_hotkey_press(hotkey, mapping)
             
             # Register the hotkey with keyboard library
-            keyboard.add_hotkey(hotkey, hotkey_callback, suppress=True)
+            load_keyboard().add_hotkey(hotkey, hotkey_callback, suppress=True)
             self.registered_hotkeys[hotkey] = mapping
             logger.info(f"Registered hotkey: {hotkey}")
             
         except Exception as e:
             logger.error(f"Error registering hotkey {hotkey}: {e}")
     
+    def handle_hotkey_press(self, hotkey: str, mapping: Dict):
+        """Everything a press does, run on the keyboard hook thread (or by a trace replay)"""
+        with self.watchdog.track_callback():
+            self.press_count.inc(hotkey)
+            recorder = self.trace_recorder
+            if recorder is not None:
+                recorder.record(hotkey, mapping)
+            self._dispatch_hotkey_action(mapping)
+    
+    def start_trace(self, path: str):
+        """Record presses with their timing to path until stop_trace()"""
+        from hotkey_trace import TraceRecorder
+        self.stop_trace()
+        self.trace_recorder = TraceRecorder(path)
+        logger.info(f"Recording hotkey trace to {path}")
+    
+    def stop_trace(self) -> int:
+        """Stop recording, returns the number of presses recorded"""
+        recorder, self.trace_recorder = self.trace_recorder, None
+        if recorder is None:
+            return 0
+        count = recorder.close()
+        logger.info(f"Recorded {count} hotkey presses to {recorder.path}")
+        return count
+    
     def _execute_hotkey_action(self, mapping: Dict):
         """Execute the action for a hotkey"""
         try:
@@ -115,11 +253,20 @@ class HotkeyManager:
             action = mapping['action']
             step = mapping.get('step', 0.1)
             
-            logger.info(f"Executing action: {action} on {app_name}")
+            # Skip the session refresh entirely while the app is known to be absent
+            if self.audio_controller.is_app_absent(app_name):
+                logger.debug(f"Skipping {action} on {app_name} - app has no audio session")
+                return
+            
+            logger.debug(f"Executing action: {action} on {app_name}")
+            started = time.perf_counter()
             
             # Refresh audio sessions to get latest state
             self.audio_controller.refresh_sessions()
             
+            if action in ('increase', 'decrease'):
+                # A key press wins over a running ramp instead of being overwritten by its next step
+                self.audio_controller.cancel_ramp(app_name)
             if action == 'increase':
                 success = self.audio_controller.increase_app_volume(app_name, step)
             elif action == 'decrease':
@@ -139,10 +286,20 @@ class HotkeyManager:
                 logger.error(f"Unknown action: {action}")
                 return
             
+            self.action_seconds.observe(time.perf_counter() - started, action)
+            if not success:
+                self.failure_count.inc(action)
+            
             if success:
-                logger.info(f"Successfully executed {action} on {app_name}")
+                logger.debug(f"Successfully executed {action} on {app_name}")
+            elif self.audio_controller.is_app_absent(app_name):
+                # The audio controller already reported the missing app
+                logger.debug(f"Failed to execute {action} on {app_name} - app has no audio session")
             else:
-                logger.warning(f"Failed to execute {action} on {app_name} - app may not be running or have audio")
+                log_rate_limited(
+                    logger, self._failure_warnings, (app_name, action), logging.WARNING,
+                    f"Failed to execute {action} on {app_name} - app may not be running or have audio"
+                )
                 
         except Exception as e:
             logger.error(f"Error executing hotkey action: {e}")
@@ -164,25 +321,35 @@ class HotkeyManager:
                 logger.warning("Hotkey listener is already running")
                 return True
             
+            # Fail once here rather than for every hotkey if keyboard is not installed
+            load_keyboard()
+            
             # Register all current mappings
             for hotkey, mapping in self.app_mappings.items():
                 self._register_single_hotkey(hotkey, mapping)
             
             self.is_running = True
+            self.listener_wanted = True
+            self.last_listener_error = None
             
             def hotkey_listener():
                 try:
                     logger.info("Hotkey listener started")
-                    keyboard.wait()  # This blocks until keyboard.stop() is called
+                    load_keyboard().wait()  # This blocks until keyboard.stop() is called
                 except Exception as e:
+                    self.last_listener_error = str(e)
                     logger.error(f"Error in hotkey listener: {e}")
                 finally:
                     self.is_running = False
+                    self._state_changed('listener')
             
-            # Start the listener in a separate thread
-            self.hotkey_thread = threading.Thread(target=hotkey_listener, daemon=True)
-            self.hotkey_thread.start()
+            # Start the listener in a separate thread, unless the one from a previous start is still waiting
+            if self.hotkey_thread is None or not self.hotkey_thread.is_alive():
+                self.hotkey_thread = threading.Thread(target=hotkey_listener, name="hotvolume-hotkeys", daemon=True)
+                self.hotkey_thread.start()
+            self.watchdog.start()
             
+            self._state_changed('listener')
             logger.info(f"Started hotkey listener with {len(self.app_mappings)} mappings")
             return True
             
@@ -190,8 +357,20 @@ class HotkeyManager:
             logger.error(f"Error starting hotkey listener: {e}")
             return False
     
+    def restart_hotkey_listener(self) -> bool:
+        """Drop whatever is left of the hook and register the current mappings again"""
+        try:
+            load_keyboard().unhook_all_hotkeys()
+        except Exception as e:
+            logger.debug(f"Error clearing hotkeys before restart: {e}")
+        self.registered_hotkeys.clear()
+        self.is_running = False
+        return self.start_hotkey_listener()
+    
     def stop_hotkey_listener(self):
         """Stop listening for hotkeys"""
+        self.listener_wanted = False
+        self.watchdog.stop()
         try:
             if not self.is_running:
                 logger.warning("Hotkey listener is not running")
@@ -199,12 +378,13 @@ class HotkeyManager:
             
             # Unregister all hotkeys
             for hotkey in list(self.registered_hotkeys.keys()):
-                keyboard.remove_hotkey(hotkey)
+                load_keyboard().remove_hotkey(hotkey)
             
             self.registered_hotkeys.clear()
-            keyboard.unhook_all_hotkeys()
+            load_keyboard().unhook_all_hotkeys()
             
             self.is_running = False
+            self._state_changed('listener')
             logger.info("Stopped hotkey listener")
             return True
             
@@ -224,7 +404,7 @@ class HotkeyManager:
         """Test if a hotkey combination is valid"""
         try:
             # Try to parse the hotkey
-            keyboard.parse_hotkey(hotkey)
+            load_keyboard().parse_hotkey(hotkey)
             return True
         except Exception as e:
             logger.error(f"Invalid hotkey format '{hotkey}': {e}")
@@ -257,6 +437,7 @@ class HotkeyManager:
                 # Load mappings
                 if 'app_mappings' in config_data:
                     self.app_mappings = config_data['app_mappings']
+                    self._state_changed('mappings')
                     logger.info(f"Loaded {len(self.app_mappings)} hotkey mappings from {self.config_file}")
                 else:
                     logger.info("No saved mappings found, using defaults")
@@ -272,6 +453,9 @@ class HotkeyManager:
             logger.info("Loading default mappings instead")
             self.load_default_mappings()
             return False
+        finally:
+            if not self.ready.done():
+                self.ready.set_result(True)
 
 # Test the hotkey manager
 if __name__ == "__main__":
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Hotkey Trace Recorder and Replayer
+Records hotkey presses to a compact file and replays them against HotkeyManager as a load test
+
+    hotkey_trace.py synthesize storm.hvtrace --pattern mixed
+    hotkey_trace.py replay storm.hvtrace --speed 10
+    hotkey_trace.py replay recorded.hvtrace --speed max
+"""
+
+import io
+import json
+import queue
+import random
+import struct
+import threading
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# File layout: header, then records. A mapping record assigns an ID to a hotkey and its
+# mapping the first time it is pressed, a press record is 7 bytes.
+MAGIC = b'HVTRACE'
+VERSION = 1
+HEADER = struct.Struct('<7sB')
+RECORD_MAPPING = 0
+RECORD_PRESS = 1
+# Mapping ID and JSON length
+MAPPING_RECORD = struct.Struct('<HH')
+# Microseconds since the previous press (saturating) and mapping ID
+PRESS_RECORD = struct.Struct('<IH')
+MAX_DELTA_US = 0xFFFFFFFF
+
+class TraceFormatError(Exception):
+    pass
+
+class TraceRecorder:
+    def __init__(self, path: str):
+        """Open path for writing, record() appends presses until close()"""
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION))
+        self._ids: Dict[str, int] = {}
+        self._last_press: Optional[float] = None
+        self._lock = threading.Lock()
+        self.count = 0
+    
+    def record(self, hotkey: str, mapping: Dict):
+        """Append one press, called from the hook thread so it only buffers"""
+        now = time.perf_counter()
+        with self._lock:
+            if self._file is None:
+                return
+            mapping_id = self._ids.get(hotkey)
+            if mapping_id is None:
+                mapping_id = self._ids[hotkey] = len(self._ids)
+                encoded = json.dumps({'hotkey': hotkey, **mapping}).encode('utf-8')
+                self._file.write(bytes([RECORD_MAPPING]) + MAPPING_RECORD.pack(mapping_id, len(encoded)) + encoded)
+            
+            delta_us = 0 if self._last_press is None else int((now - self._last_press) * 1e6)
+            self._last_press = now
+            self._file.write(bytes([RECORD_PRESS]) + PRESS_RECORD.pack(min(delta_us, MAX_DELTA_US), mapping_id))
+            self.count += 1
+    
+    def close(self) -> int:
+        """Finish the file, returns the number of presses recorded"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        return self.count
+
+class Trace:
+    def __init__(self, mappings: Optional[List[Dict]] = None, events: Optional[List[Tuple[float, int]]] = None):
+        """Mappings by ID, and presses as (seconds since the first press, mapping ID)"""
+        self.mappings = mappings or []
+        self.events = events or []
+    
+    @property
+    def duration(self) -> float:
+        return self.events[-1][0] if self.events else 0.0
+    
+    def add_mapping(self, hotkey: str, app: str, action: str, step: float = 0.1) -> int:
+        self.mappings.append({'hotkey': hotkey, 'app': app, 'action': action, 'step': step})
+        return len(self.mappings) - 1
+    
+    def save(self, path: str):
+        """Write the trace in the recorder's format"""
+        buffer = io.BytesIO()
+        buffer.write(HEADER.pack(MAGIC, VERSION))
+        written = set()
+        previous = 0.0
+        for offset, mapping_id in self.events:
+            if mapping_id not in written:
+                written.add(mapping_id)
+                encoded = json.dumps(self.mappings[mapping_id]).encode('utf-8')
+                buffer.write(bytes([RECORD_MAPPING]) + MAPPING_RECORD.pack(mapping_id, len(encoded)) + encoded)
+            delta_us = min(int(round((offset - previous) * 1e6)), MAX_DELTA_US)
+            previous = offset
+            buffer.write(bytes([RECORD_PRESS]) + PRESS_RECORD.pack(delta_us, mapping_id))
+        with open(path, 'wb') as trace_file:
+            trace_file.write(buffer.getvalue())
+    
+    @classmethod
+    def load(cls, path: str) -> 'Trace':
+        """Read a trace file, raises TraceFormatError if it is not one"""
+        with open(path, 'rb') as trace_file:
+            data = trace_file.read()
+        if len(data) < HEADER.size:
+            raise TraceFormatError(f"{path} is not a hotkey trace")
+        magic, version = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise TraceFormatError(f"{path} is not a hotkey trace")
+        if version != VERSION:
+            raise TraceFormatError(f"{path} has unsupported trace version {version}")
+        
+        mappings: Dict[int, Dict] = {}
+        events = []
+        offset = 0.0
+        position = HEADER.size
+        try:
+            while position < len(data):
+                kind = data[position]
+                position += 1
+                if kind == RECORD_MAPPING:
+                    mapping_id, length = MAPPING_RECORD.unpack_from(data, position)
+                    position += MAPPING_RECORD.size
+                    mappings[mapping_id] = json.loads(data[position:position + length].decode('utf-8'))
+                    position += length
+                elif kind == RECORD_PRESS:
+                    delta_us, mapping_id = PRESS_RECORD.unpack_from(data, position)
+                    position += PRESS_RECORD.size
+                    if mapping_id not in mappings:
+                        raise TraceFormatError(f"press of undefined mapping {mapping_id}")
+                    offset += delta_us / 1e6
+                    events.append((offset, mapping_id))
+                else:
+                    raise TraceFormatError(f"unknown record type {kind} at byte {position - 1}")
+        except (struct.error, ValueError) as e:
+            raise TraceFormatError(f"{path} is truncated or corrupt: {e}")
+        
+        trace = cls([mappings.get(index, {}) for index in range(max(mappings, default=-1) + 1)], events)
+        return trace
+
+def synthesize(pattern: str = 'mixed', apps: int = 3, duration: float = 10.0, seed: int = 0) -> Trace:
+    """Build a bursty trace without recording one
+    
+    'held' is a volume key held down with 30 Hz auto-repeat, 'storm' fires every
+    mapping within a millisecond like a macro pad, 'mixed' alternates both with pauses.
+    """
+    rng = random.Random(seed)
+    trace = Trace()
+    ids = []
+    for index in range(apps):
+        app = f"app{index}.exe"
+        for action in ('increase', 'decrease', 'toggle_mute'):
+            ids.append(trace.add_mapping(f"ctrl+shift+f{len(ids) + 1}", app, action, 0.02))
+    volume_ids = [mapping_id for mapping_id in ids if trace.mappings[mapping_id]['action'] != 'toggle_mute']
+    
+    offset = 0.0
+    while offset < duration:
+        burst = pattern if pattern != 'mixed' else rng.choice(('held', 'storm'))
+        if burst == 'held':
+            mapping_id = rng.choice(volume_ids)
+            # About half a second before auto-repeat kicks in, then 30 presses a second
+            trace.events.append((offset, mapping_id))
+            offset += 0.5
+            for _ in range(rng.randint(20, 90)):
+                trace.events.append((offset, mapping_id))
+                offset += 1 / 30
+        elif burst == 'storm':
+            for _ in range(rng.randint(2, 6)):
+                for mapping_id in ids:
+                    trace.events.append((offset, mapping_id))
+                    offset += rng.uniform(0, 0.0001)
+                offset += 0.05
+        else:
+            raise ValueError(f"Unknown trace pattern: {pattern}")
+        offset += rng.uniform(0.2, 1.0) if pattern == 'mixed' else 0.1
+    return trace
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+def replay(trace: Trace, hotkey_manager, speed: float = 1.0) -> Dict:
+    """Press the trace's hotkeys on hotkey_manager, speed 0 meaning as fast as possible
+    
+    Presses are produced on schedule into a queue and handled one at a time by a
+    consumer thread, like the keyboard hook handles them, so a slow action delays
+    the presses behind it. Latency is measured from when a press was due.
+    """
+    hotkeys = [mapping.get('hotkey') for mapping in trace.mappings]
+    pending: queue.Queue = queue.Queue()
+    latencies = []
+    max_depth = 0
+    
+    def consume():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            due, mapping_id = item
+            hotkey_manager.handle_hotkey_press(hotkeys[mapping_id], trace.mappings[mapping_id])
+            latencies.append(time.perf_counter() - due)
+    
+    consumer = threading.Thread(target=consume, name="hotvolume-trace-replay", daemon=True)
+    consumer.start()
+    
+    started = time.perf_counter()
+    for offset, mapping_id in trace.events:
+        due = started + offset / speed if speed else time.perf_counter()
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        pending.put((due, mapping_id))
+        max_depth = max(max_depth, pending.qsize())
+    pending.put(None)
+    consumer.join()
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        'presses': len(trace.events),
+        'speed': speed or 'max',
+        'seconds': elapsed,
+        'actions_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'max_queue_depth': max_depth,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'p999_ms': _percentile(latencies, 99.9) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+def simulated_hotkey_manager(trace: Trace):
+    """HotkeyManager with the trace's mappings over simulated audio sessions of its apps"""
+    from simulated_audio import SimulatedAudioBackend
+    from audio_controller import AudioController
+    from hotkey_manager import HotkeyManager
+    
+    backend = SimulatedAudioBackend({mapping['app']: 0.5 for mapping in trace.mappings if mapping})
+    audio_controller = AudioController(session_source=backend)
+    hotkey_manager = HotkeyManager(audio_controller, load_config=False)
+    hotkey_manager.app_mappings = {
+        mapping['hotkey']: {key: value for key, value in mapping.items() if key != 'hotkey'}
+        for mapping in trace.mappings if mapping
+    }
+    return hotkey_manager
+
+def parse_speed(text: str) -> float:
+    """'max' or a multiplier such as 1, 10 or 10x"""
+    if text.lower() == 'max':
+        return 0.0
+    try:
+        speed = float(text.lower().rstrip('x'))
+    except ValueError:
+        raise ValueError(f"invalid speed: {text}")
+    if speed <= 0:
+        raise ValueError("speed must be positive, or max")
+    return speed
+
+def main(argv=None) -> int:
+    """Entry point for synthesizing, inspecting and replaying traces"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Synthesize, inspect and replay hotkey traces")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    synth = commands.add_parser('synthesize', help="write a synthetic bursty trace")
+    synth.add_argument('path')
+    synth.add_argument('--pattern', choices=('held', 'storm', 'mixed'), default='mixed')
+    synth.add_argument('--apps', type=int, default=3)
+    synth.add_argument('--duration', type=float, default=10.0, help="seconds of input")
+    synth.add_argument('--seed', type=int, default=0)
+    
+    info = commands.add_parser('info', help="summarize a trace")
+    info.add_argument('path')
+    
+    play = commands.add_parser('replay', help="replay a trace against simulated audio sessions")
+    play.add_argument('path')
+    play.add_argument('--speed', action='append', default=None,
+                      help="1, 10, max ... (repeat to compare several speeds)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+    
+    if args.command == 'synthesize':
+        trace = synthesize(args.pattern, args.apps, args.duration, args.seed)
+        trace.save(args.path)
+        print(f"Wrote {len(trace.events)} presses over {trace.duration:.1f}s to {args.path}")
+        return 0
+    
+    try:
+        trace = Trace.load(args.path)
+    except (OSError, TraceFormatError) as e:
+        print(e)
+        return 1
+    
+    if args.command == 'info':
+        print(f"{len(trace.events)} presses of {len(trace.mappings)} mappings over {trace.duration:.1f}s")
+        for mapping_id, mapping in enumerate(trace.mappings):
+            presses = sum(1 for _, pressed in trace.events if pressed == mapping_id)
+            print(f"  {mapping.get('hotkey')}: {mapping.get('action')} {mapping.get('app')} x{presses}")
+        return 0
+    
+    for text in args.speed or ['1']:
+        try:
+            speed = parse_speed(text)
+        except ValueError as e:
+            print(e)
+            return 2
+        # A fresh manager per run so counters and volumes start over
+        result = replay(trace, simulated_hotkey_manager(trace), speed)
+        print(f"speed {result['speed']!s:>4}: {result['actions_per_sec']:>10,.0f} actions/s   "
+              f"max queue {result['max_queue_depth']:>5}   p50 {result['p50_ms']:8.2f} ms   "
+              f"p99 {result['p99_ms']:8.2f} ms   p99.9 {result['p999_ms']:8.2f} ms   max {result['max_ms']:8.2f} ms")
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Logging Setup
+Queue-based logging with a rotating log file, runtime level changes and per-key rate limiting
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Hashable, Optional, Union
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FILE = 'hotvolume.log'
+
+# Size-based rotation: hotvolume.log plus three 1 MB backups
+MAX_LOG_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+def setup_logging(level: Union[int, str] = logging.INFO, log_file: str = LOG_FILE,
+                  max_bytes: int = MAX_LOG_BYTES, backup_count: int = LOG_BACKUP_COUNT) -> QueueListener:
+    """Route all logging through a queue drained by a background listener thread
+    
+    Callers (including the keyboard hook) only enqueue records, the console
+    and rotating file handlers run on the listener thread.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            set_log_level(level)
+            return _listener
+        
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        try:
+            handlers.append(RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            ))
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Could not open log file {log_file}: {e}")
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(QueueHandler(log_queue))
+        
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    
+    set_log_level(level)
+    return _listener
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def set_log_level(level: Union[int, str]):
+    """Change the level of the root logger at runtime, e.g. 'DEBUG' or logging.INFO"""
+    if isinstance(level, str):
+        name = level.upper()
+        level = logging.getLevelName(name)
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {name}")
+    logging.getLogger().setLevel(level)
+    logging.getLogger(__name__).info(f"Log level set to {logging.getLevelName(level)}")
+
+def get_log_level() -> str:
+    """Get the name of the root logger's current level"""
+    return logging.getLevelName(logging.getLogger().getEffectiveLevel())
+
+def is_debug_logging() -> bool:
+    """Check whether DEBUG records are currently logged"""
+    return logging.getLogger().isEnabledFor(logging.DEBUG)
+
+class RateLimiter:
+    def __init__(self, interval: float = 60.0):
+        """Allow one event per key every interval seconds"""
+        self.interval = interval
+        self._last: Dict[Hashable, float] = {}
+        self._suppressed: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+    
+    def allow(self, key: Hashable) -> bool:
+        """Check whether an event for key may be reported now, counting it as suppressed if not"""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            return True
+    
+    def pop_suppressed(self, key: Hashable) -> int:
+        """Get and reset how many events for key were suppressed since it was last allowed"""
+        with self._lock:
+            return self._suppressed.pop(key, 0)
+    
+    def reset(self, key: Hashable):
+        """Forget a key so its next event is reported immediately"""
+        with self._lock:
+            self._last.pop(key, None)
+            self._suppressed.pop(key, None)
+
+def log_rate_limited(log: logging.Logger, limiter: RateLimiter, key: Hashable, level: int, message: str):
+    """Log message at level at most once per interval per key, and at DEBUG otherwise"""
+    if limiter.allow(key):
+        suppressed = limiter.pop_suppressed(key)
+        if suppressed:
+            message = f"{message} ({suppressed} similar messages suppressed)"
+        log.log(level, message)
+    else:
+        log.debug(message)
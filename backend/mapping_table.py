@@ -0,0 +1,150 @@
+"""
+Hotkey Mapping Table
+Treeview of hotkey mappings keyed by hotkey, with incremental updates, filtering and sorting
+"""
+
+import tkinter as tk
+from tkinter import ttk
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    ('hotkey', "Hotkey", 160),
+    ('app', "Application", 200),
+    ('action', "Action", 110),
+    ('step', "Step", 60),
+)
+COLUMN_NAMES = [column for column, _, _ in COLUMNS]
+
+class MappingTable:
+    def __init__(self, parent, height: int = 8):
+        """Create the table and its filter box inside parent"""
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(1, weight=1)
+        self.frame.rowconfigure(1, weight=1)
+        
+        # Type-to-filter box
+        ttk.Label(self.frame, text="Filter:").grid(row=0, column=0, sticky=tk.W, padx=(0, 10), pady=(0, 5))
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', lambda *_: self.set_filter(self.filter_var.get()))
+        ttk.Entry(self.frame, textvariable=self.filter_var).grid(row=0, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        self.tree = ttk.Treeview(
+            self.frame, columns=COLUMN_NAMES,
+            show='headings', height=height, selectmode='extended'
+        )
+        for column, heading, width in COLUMNS:
+            self.tree.heading(column, text=heading, command=lambda column=column: self.sort_by(column))
+            self.tree.column(column, width=width, anchor=tk.W)
+        self.tree.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=1, column=2, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Row values and lowercase search text per hotkey, and the sorted order of all rows
+        self.rows: Dict[str, tuple] = {}
+        self.search_index: Dict[str, str] = {}
+        self.order: List[str] = []
+        self.hidden = set()
+        self.filter_text = ''
+        self.sort_column = 'hotkey'
+        self.sort_reverse = False
+    
+    @staticmethod
+    def _row_values(hotkey: str, mapping: Dict) -> tuple:
+        step = mapping.get('step')
+        return (hotkey, mapping['app'], mapping['action'], f"{step:.2f}" if step else '')
+    
+    def _sort_key(self, hotkey: str):
+        index = COLUMN_NAMES.index(self.sort_column)
+        return (self.rows[hotkey][index].lower(), hotkey)
+    
+    def _matches(self, hotkey: str) -> bool:
+        return not self.filter_text or self.filter_text in self.search_index[hotkey]
+    
+    def _visible_index(self, hotkey: str) -> int:
+        """Position a row should have among the rows currently shown"""
+        index = 0
+        for other in self.order:
+            if other == hotkey:
+                break
+            if other not in self.hidden:
+                index += 1
+        return index
+    
+    def sync(self, mappings: Dict[str, Dict]):
+        """Apply only the added, removed and changed mappings to the table"""
+        for hotkey in [hotkey for hotkey in self.rows if hotkey not in mappings]:
+            self.tree.delete(hotkey)
+            del self.rows[hotkey]
+            del self.search_index[hotkey]
+            self.order.remove(hotkey)
+            self.hidden.discard(hotkey)
+        
+        moved = []
+        for hotkey, mapping in mappings.items():
+            values = self._row_values(hotkey, mapping)
+            if self.rows.get(hotkey) == values:
+                continue
+            
+            if hotkey not in self.rows:
+                self.order.append(hotkey)
+                self.tree.insert('', tk.END, iid=hotkey, values=values)
+            else:
+                self.tree.item(hotkey, values=values)
+            self.rows[hotkey] = values
+            self.search_index[hotkey] = ' '.join(values).lower()
+            moved.append(hotkey)
+            
+            # New or edited rows may not match the active filter
+            if not self._matches(hotkey):
+                if hotkey not in self.hidden:
+                    self.tree.detach(hotkey)
+                    self.hidden.add(hotkey)
+            else:
+                self.hidden.discard(hotkey)
+        
+        if moved:
+            # Move only the new and edited rows into their sorted position, front to back
+            self.order.sort(key=self._sort_key, reverse=self.sort_reverse)
+            position = {hotkey: index for index, hotkey in enumerate(self.order)}
+            for hotkey in sorted(moved, key=position.get):
+                if hotkey not in self.hidden:
+                    self.tree.move(hotkey, '', self._visible_index(hotkey))
+    
+    def set_filter(self, text: str):
+        """Show only rows whose hotkey, app, action or step contain text"""
+        self.filter_text = text.strip().lower()
+        index = 0
+        for hotkey in self.order:
+            matches = self._matches(hotkey)
+            if matches:
+                if hotkey in self.hidden:
+                    self.hidden.discard(hotkey)
+                    self.tree.move(hotkey, '', index)
+                index += 1
+            elif hotkey not in self.hidden:
+                self.tree.detach(hotkey)
+                self.hidden.add(hotkey)
+    
+    def sort_by(self, column: str):
+        """Sort by a column, reversing the order when it is already sorted by it"""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        
+        self.order.sort(key=self._sort_key, reverse=self.sort_reverse)
+        index = 0
+        for hotkey in self.order:
+            if hotkey not in self.hidden:
+                self.tree.move(hotkey, '', index)
+                index += 1
+    
+    def selected_hotkeys(self) -> List[str]:
+        """Get the hotkeys of the selected rows"""
+        return list(self.tree.selection())
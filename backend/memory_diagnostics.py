@@ -0,0 +1,202 @@
+"""
+Memory Diagnostics
+Periodic tracemalloc snapshots and live COM wrapper, thread and Tk object counts for long-run leak hunting
+
+Only standard library modules are imported here, tracing has to start before
+the rest of the app is loaded to see where its memory comes from.
+"""
+
+import gc
+import os
+import re
+import sys
+import time
+import threading
+import tracemalloc
+import logging
+from collections import Counter as TallyCounter
+from logging.handlers import RotatingFileHandler
+from typing import Dict
+
+from metrics import process_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILE = 'hotvolume-memory.log'
+MAX_REPORT_BYTES = 1024 * 1024
+REPORT_BACKUP_COUNT = 3
+
+# Seconds between periodic reports
+DEFAULT_INTERVAL = 300.0
+
+# Frames kept per allocation, more gives better tracebacks but slows every allocation down
+TRACE_FRAMES = 1
+
+# Lines of allocation growth per report
+TOP_GROWTH = 15
+
+def start_tracing(frames: int = TRACE_FRAMES):
+    """Start tracemalloc, as early as possible so startup allocations are attributed"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        # The report's own bookkeeping
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ))
+
+def count_live_objects() -> Dict[str, int]:
+    """Count objects that leak in this app: COM wrappers, audio sessions and Tk objects
+    
+    Only modules that are already loaded are looked at, nothing gets imported
+    just to count it.
+    """
+    checks = []
+    comtypes = sys.modules.get('comtypes')
+    if comtypes is not None and hasattr(comtypes, '_compointer_base'):
+        checks.append(('com_pointers', comtypes._compointer_base))
+    pycaw_utils = sys.modules.get('pycaw.utils')
+    if pycaw_utils is not None and hasattr(pycaw_utils, 'AudioSession'):
+        checks.append(('pycaw_sessions', pycaw_utils.AudioSession))
+    tkinter = sys.modules.get('tkinter')
+    if tkinter is not None:
+        checks.extend([
+            ('tk_widgets', tkinter.Misc),
+            ('tk_variables', tkinter.Variable),
+            ('tk_images', tkinter.Image),
+        ])
+    
+    counts = {name: 0 for name, _ in checks}
+    objects = gc.get_objects()
+    counts['gc_objects'] = len(objects)
+    for obj in objects:
+        for name, cls in checks:
+            if isinstance(obj, cls):
+                counts[name] += 1
+    return counts
+
+def count_threads() -> Dict[str, int]:
+    """Live threads grouped by name with worker numbers stripped"""
+    return dict(TallyCounter(re.sub(r'[-_]?\d+$', '', thread.name) for thread in threading.enumerate()))
+
+class MemoryDiagnostics:
+    def __init__(self, interval: float = DEFAULT_INTERVAL, report_file: str = REPORT_FILE,
+                 audio_controller=None, top: int = TOP_GROWTH):
+        """Initialize the diagnostics, start() begins the periodic reports"""
+        self.interval = interval
+        self.report_file = report_file
+        self.audio_controller = audio_controller
+        self.top = top
+        self.report_count = 0
+        
+        self._baseline = None
+        self._previous = None
+        self._baseline_counts: Dict[str, int] = {}
+        self._previous_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.thread = None
+        
+        # Reports go to their own rotating file, not through the main log queue
+        self.report_logger = logging.getLogger('hotvolume.memory_report')
+        self.report_logger.propagate = False
+        self.report_logger.setLevel(logging.INFO)
+        self._handler = None
+    
+    def start(self):
+        """Take the baseline snapshot and report every interval seconds"""
+        if self.thread and self.thread.is_alive():
+            return
+        start_tracing()
+        if self._handler is None:
+            self._handler = RotatingFileHandler(
+                self.report_file, maxBytes=MAX_REPORT_BYTES, backupCount=REPORT_BACKUP_COUNT, encoding='utf-8'
+            )
+            self._handler.setFormatter(logging.Formatter('%(message)s'))
+            self.report_logger.addHandler(self._handler)
+        
+        self.dump('baseline')
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="hotvolume-memory", daemon=True)
+        self.thread.start()
+        logger.info(f"Memory diagnostics on, reporting to {self.report_file} every {self.interval:.0f}s")
+    
+    def stop(self):
+        """Write a last report and stop"""
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+            self.dump('shutdown')
+        if self._handler is not None:
+            self.report_logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.dump('periodic')
+            except Exception as e:
+                logger.error(f"Error writing memory report: {e}")
+    
+    def dump(self, reason: str = 'on demand') -> str:
+        """Write a report of growth since the last one and since the baseline, returns its summary line"""
+        with self._lock:
+            started = time.perf_counter()
+            snapshot = _snapshot()
+            counts = count_live_objects()
+            counts.update({f"threads:{name}": count for name, count in count_threads().items()})
+            counts['threads'] = threading.active_count()
+            if self.audio_controller is not None:
+                counts['session_entries'] = sum(len(entries) for entries in self.audio_controller.sessions.values())
+            
+            traced, peak = tracemalloc.get_traced_memory()
+            rss = process_rss_bytes()
+            summary = (f"report #{self.report_count} ({reason}): traced {traced / 1024:.0f} KiB (peak {peak / 1024:.0f} KiB)"
+                       + (f", RSS {rss / (1024 * 1024):.1f} MiB" if rss else "")
+                       + f", {counts['threads']} threads, {counts['gc_objects']} gc objects")
+            
+            lines = ["=" * 78, time.strftime('%Y-%m-%d %H:%M:%S ') + summary]
+            lines.append("Live objects (now / since last / since baseline):")
+            for name in sorted(counts):
+                lines.append(f"  {name:<32} {counts[name]:>8} {self._delta(counts, self._previous_counts, name):>8} "
+                             f"{self._delta(counts, self._baseline_counts, name):>8}")
+            if self._previous is not None:
+                lines.append("Top allocation growth since last report:")
+                lines.extend(self._growth(snapshot, self._previous))
+                lines.append("Top allocation growth since baseline:")
+                lines.extend(self._growth(snapshot, self._baseline))
+            lines.append(f"(report took {(time.perf_counter() - started) * 1000:.0f} ms)")
+            self.report_logger.info('\n'.join(lines))
+            
+            if self._baseline is None:
+                self._baseline = snapshot
+                self._baseline_counts = counts
+            self._previous = snapshot
+            self._previous_counts = counts
+            self.report_count += 1
+        return summary
+    
+    @staticmethod
+    def _delta(counts: Dict[str, int], earlier: Dict[str, int], name: str) -> str:
+        if not earlier:
+            return '-'
+        return f"{counts[name] - earlier.get(name, 0):+d}"
+    
+    def _growth(self, snapshot, earlier):
+        stats = [stat for stat in snapshot.compare_to(earlier, 'lineno') if stat.size_diff > 0][:self.top]
+        if not stats:
+            return ["  (none)"]
+        lines = []
+        for stat in stats:
+            frame = stat.traceback[0]
+            filename = frame.filename
+            if filename.startswith(os.getcwd()):
+                filename = os.path.relpath(filename)
+            lines.append(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blocks  {filename}:{frame.lineno}")
+        return lines
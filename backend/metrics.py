@@ -0,0 +1,192 @@
+"""
+Metrics
+Counters, gauges and histograms owned by the components, rendered in Prometheus text format
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond COM calls to slow process scans
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    kind = 'untyped'
+    
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), func: Optional[Callable] = None):
+        """Create a metric
+        
+        func, if given, is called at collection time and returns the value, or
+        a {label_values_tuple: value} dict for labelled metrics.
+        """
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.func = func
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, label_values: Tuple) -> Tuple:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {label_values}")
+        return tuple(str(value) for value in label_values)
+    
+    def value(self, *label_values) -> float:
+        """Current value for a label combination (0 if never set)"""
+        return self.samples().get(self._key(label_values), 0.0)
+    
+    def samples(self) -> Dict[Tuple, float]:
+        if self.func is not None:
+            result = self.func()
+            return result if isinstance(result, dict) else {(): result}
+        with self._lock:
+            return dict(self._values)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def inc(self, *label_values, amount: float = 1.0):
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+    
+    def set(self, value: float, *label_values):
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple, list] = {}
+    
+    def observe(self, value: float, *label_values):
+        key = self._key(label_values)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    @contextmanager
+    def time(self, *label_values):
+        """Observe how long the with-block took"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+    
+    def count(self, *label_values) -> int:
+        with self._lock:
+            series = self._series.get(self._key(label_values))
+            return series[2] if series else 0
+    
+    def quantile(self, q: float, *label_values) -> Optional[float]:
+        """Upper bucket bound below which a fraction q of observations fall"""
+        with self._lock:
+            series = self._series.get(self._key(label_values))
+            if not series or not series[2]:
+                return None
+            counts = list(series[0])
+            total = series[2]
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            running += bucket_count
+            if running >= q * total:
+                return bound
+        return float('inf')
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series_items = sorted((key, (list(series[0]), series[1], series[2])) for key, series in self._series.items())
+        for label_values, (counts, total, count) in series_items:
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                running += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, label_values, le)} {running}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident memory of this process, None if it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class MetricsRegistry:
+    def __init__(self):
+        """Collects the metrics of every registered component plus process gauges"""
+        self.sources = []
+        self._lock = threading.Lock()
+        self.process_metrics = [
+            Gauge("hotvolume_threads", "Live Python threads", func=threading.active_count),
+            Gauge("hotvolume_resident_memory_bytes", "Resident set size of the process",
+                  func=lambda: process_rss_bytes() or 0),
+        ]
+    
+    def add_source(self, source):
+        """Register a component whose `metrics` attribute lists its metric objects"""
+        with self._lock:
+            if source is not None and source not in self.sources:
+                self.sources.append(source)
+    
+    def metrics(self) -> Iterable[Metric]:
+        with self._lock:
+            sources = list(self.sources)
+        for source in sources:
+            yield from getattr(source, 'metrics', [])
+        yield from self.process_metrics
+    
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,214 @@
+"""
+Live Mixer Panel
+Shows every audio session as a strip with volume slider, mute toggle and peak meter
+"""
+
+import tkinter as tk
+from tkinter import ttk
+import threading
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Frame interval for meter updates (~30 fps)
+FRAME_INTERVAL_MS = 33
+
+# Volume and mute change rarely, so they are only read every few frames (~5 Hz)
+FULL_READ_EVERY = 6
+
+METER_WIDTH = 12
+METER_HEIGHT = 120
+
+class MixerStrip:
+    def __init__(self, panel, parent, app_name: str):
+        """Create the widgets for one app"""
+        self.panel = panel
+        self.app_name = app_name
+        self.frame = ttk.Frame(parent, padding="5")
+        
+        # Last values drawn, so unchanged frames cost nothing
+        self.volume = None
+        self.muted = None
+        self.meter_pixels = None
+        self.dragging = False
+        
+        label = app_name if len(app_name) <= 14 else app_name[:13] + "…"
+        ttk.Label(self.frame, text=label).grid(row=0, column=0, columnspan=2)
+        
+        self.volume_var = tk.DoubleVar(value=0.0)
+        self.scale = ttk.Scale(
+            self.frame, from_=1.0, to=0.0, orient=tk.VERTICAL, length=METER_HEIGHT,
+            variable=self.volume_var, command=self.on_scale_moved
+        )
+        self.scale.grid(row=1, column=0, padx=(0, 4))
+        self.scale.bind("<ButtonPress-1>", lambda _: self._set_dragging(True))
+        self.scale.bind("<ButtonRelease-1>", lambda _: self._set_dragging(False))
+        
+        self.meter = tk.Canvas(self.frame, width=METER_WIDTH, height=METER_HEIGHT, bg='black', highlightthickness=0)
+        self.meter.grid(row=1, column=1)
+        self.meter_bar = self.meter.create_rectangle(0, METER_HEIGHT, METER_WIDTH, METER_HEIGHT, fill='#3c3', width=0)
+        
+        self.muted_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.frame, text="Mute", variable=self.muted_var, command=self.on_mute_toggled).grid(
+            row=2, column=0, columnspan=2, pady=(5, 0)
+        )
+    
+    def _set_dragging(self, dragging: bool):
+        self.dragging = dragging
+    
+    def on_scale_moved(self, value):
+        """Send slider changes to the audio backend"""
+        volume = round(float(value), 2)
+        if volume != self.volume:
+            self.volume = volume
+            self.panel.request_volume(self.app_name, volume)
+    
+    def on_mute_toggled(self):
+        """Send mute changes to the audio backend"""
+        self.muted = self.muted_var.get()
+        # update() skips unchanged mute states, so the meter is recoloured here
+        self._color_meter(self.muted)
+        self.panel.request_mute(self.app_name, self.muted)
+    
+    def _color_meter(self, muted: bool):
+        self.meter.itemconfigure(self.meter_bar, fill='#666' if muted else '#3c3')
+    
+    def update(self, volume, muted, peak: float):
+        """Redraw only what changed since the last frame (None means not read this frame)"""
+        if volume is not None:
+            volume = round(volume, 2)
+            if volume != self.volume and not self.dragging:
+                self.volume = volume
+                self.volume_var.set(volume)
+        
+        if muted is not None and muted != self.muted:
+            self.muted = muted
+            self.muted_var.set(muted)
+            self._color_meter(muted)
+        
+        pixels = int(min(1.0, max(0.0, peak)) * METER_HEIGHT)
+        if pixels != self.meter_pixels:
+            self.meter_pixels = pixels
+            self.meter.coords(self.meter_bar, 0, METER_HEIGHT - pixels, METER_WIDTH, METER_HEIGHT)
+
+class MixerPanel:
+    def __init__(self, parent, audio_controller, task_pool):
+        """Create the mixer panel inside parent"""
+        self.audio_controller = audio_controller
+        self.task_pool = task_pool
+        self.frame = ttk.Frame(parent, padding="10")
+        
+        self.strips_frame = ttk.Frame(self.frame)
+        self.strips_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.empty_label = ttk.Label(self.strips_frame, text="No applications are playing audio")
+        self.empty_label.grid(row=0, column=0, sticky=tk.W)
+        self.strips: Dict[str, MixerStrip] = {}
+        
+        self.active = False
+        self._after_id = None
+        
+        # Latest batched read, swapped in by the worker and consumed by the Tk thread
+        self._levels = None
+        self._levels_seq = 0
+        self._applied_seq = 0
+        
+        # Slider/mute writes are coalesced per app: only the newest value is sent
+        self._pending_writes = {}
+        self._flushing = set()
+        self._pending_lock = threading.Lock()
+    
+    def start(self):
+        """Start the frame loop (while the panel is visible)"""
+        if not self.active:
+            self.active = True
+            self._tick()
+    
+    def stop(self):
+        """Stop the frame loop"""
+        self.active = False
+        if self._after_id is not None:
+            try:
+                self.frame.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+    
+    def _read_levels(self):
+        """Worker: one batched read of every session"""
+        peaks_only = self._levels_seq % FULL_READ_EVERY != 0
+        levels = self.audio_controller.get_session_levels(peaks_only=peaks_only)
+        self._levels = levels
+        self._levels_seq += 1
+    
+    def _tick(self):
+        """Tk thread: apply the newest read and ask for the next one"""
+        if not self.active:
+            return
+        
+        if self._levels_seq != self._applied_seq:
+            self._applied_seq = self._levels_seq
+            self._apply_levels(self._levels)
+        
+        # Keyed submit: if last frame's read is still running, this is a no-op
+        if self.audio_controller:
+            self.task_pool.submit(self._read_levels, key='mixer_levels')
+        
+        self._after_id = self.frame.after(FRAME_INTERVAL_MS, self._tick)
+    
+    def _apply_levels(self, levels):
+        """Add, remove and update strips to match the batched read"""
+        for app_name in list(self.strips):
+            if app_name not in levels:
+                self.strips.pop(app_name).frame.destroy()
+        
+        for app_name in sorted(levels):
+            if app_name not in self.strips:
+                strip = MixerStrip(self, self.strips_frame, app_name)
+                self.strips[app_name] = strip
+                self._layout_strips()
+            self.strips[app_name].update(*levels[app_name])
+        
+        if self.strips:
+            self.empty_label.grid_remove()
+        else:
+            self.empty_label.grid()
+    
+    def _layout_strips(self):
+        """Place strips left to right in name order"""
+        for column, app_name in enumerate(sorted(self.strips)):
+            self.strips[app_name].frame.grid(row=0, column=column, sticky=tk.N)
+    
+    def request_volume(self, app_name: str, volume: float):
+        """Queue a volume change from a slider, stopping a running ramp for the app"""
+        self.audio_controller.cancel_ramp(app_name)
+        self._queue_write(app_name, 'volume', volume)
+    
+    def request_mute(self, app_name: str, muted: bool):
+        """Queue a mute change from a checkbox"""
+        self._queue_write(app_name, 'mute', muted)
+    
+    def _queue_write(self, app_name, kind, value):
+        key = (app_name, kind)
+        with self._pending_lock:
+            self._pending_writes[key] = value
+            if key in self._flushing:
+                # The running flush picks up the new value
+                return
+            self._flushing.add(key)
+        self.task_pool.submit(self._flush_write, app_name, kind)
+    
+    def _flush_write(self, app_name, kind):
+        """Worker: apply the newest pending value for an app until none is left"""
+        key = (app_name, kind)
+        while True:
+            with self._pending_lock:
+                if key not in self._pending_writes:
+                    self._flushing.discard(key)
+                    return
+                value = self._pending_writes.pop(key)
+            
+            if kind == 'volume':
+                self.audio_controller.set_app_volume(app_name, value)
+            else:
+                self.audio_controller.mute_app(app_name, value)
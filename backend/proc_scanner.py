@@ -0,0 +1,95 @@
+"""
+Linux /proc Process Scanner
+Reads process names, executables and parents straight from procfs without psutil
+"""
+
+import os
+import sys
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Kernel truncates comm to 15 characters (TASK_COMM_LEN - 1)
+COMM_MAX_LENGTH = 15
+
+class ProcScanner:
+    def __init__(self, proc_root: str = '/proc'):
+        """Initialize the scanner for a procfs mount"""
+        self.proc_root = proc_root
+    
+    @staticmethod
+    def is_available(proc_root: str = '/proc') -> bool:
+        """Check if a usable procfs exists on this host"""
+        return sys.platform.startswith('linux') and os.path.isfile(os.path.join(proc_root, 'self', 'stat'))
+    
+    def _read_stat(self, pid_dir: str) -> Optional[tuple]:
+        """Read (comm, ppid) from a single /proc/<pid>/stat read"""
+        try:
+            with open(os.path.join(pid_dir, 'stat'), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        # comm may itself contain spaces and parentheses, so split on the last ')'
+        start = data.find(b'(')
+        end = data.rfind(b')')
+        if start < 0 or end < 0:
+            return None
+        comm = data[start + 1:end].decode('utf-8', 'replace')
+        fields = data[end + 2:].split(b' ', 2)
+        try:
+            ppid = int(fields[1])
+        except (IndexError, ValueError):
+            ppid = None
+        return comm, ppid
+    
+    def _read_exe(self, pid_dir: str) -> Optional[str]:
+        """Resolve /proc/<pid>/exe, None for kernel threads or unreadable processes"""
+        try:
+            exe = os.readlink(os.path.join(pid_dir, 'exe'))
+        except OSError:
+            return None
+        if exe.endswith(' (deleted)') and not os.path.exists(exe):
+            exe = exe[:-10]
+        return exe
+    
+    def _read_process(self, pid: int, pid_dir: str) -> Optional[Dict]:
+        stat = self._read_stat(pid_dir)
+        if stat is None:
+            # Process exited between listing and reading
+            return None
+        name, ppid = stat
+        exe = self._read_exe(pid_dir)
+        
+        # Recover names cut off at the kernel's comm limit from the exe path
+        if exe and len(name) >= COMM_MAX_LENGTH:
+            exe_name = os.path.basename(exe)
+            if exe_name.startswith(name):
+                name = exe_name
+        
+        return {'pid': pid, 'name': name, 'exe': exe, 'ppid': ppid}
+    
+    def read_process(self, pid: int) -> Optional[Dict]:
+        """Read one process like scan() does, None if it doesn't exist"""
+        return self._read_process(pid, os.path.join(self.proc_root, str(pid)))
+    
+    def scan(self) -> List[Dict]:
+        """Scan all processes, returning dicts with pid, name, exe and ppid"""
+        processes = []
+        try:
+            entries = os.scandir(self.proc_root)
+        except OSError as e:
+            logger.error(f"Error reading {self.proc_root}: {e}")
+            return processes
+        
+        with entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                
+                process = self._read_process(int(entry.name), entry.path)
+                if process is not None:
+                    processes.append(process)
+        
+        return processes
@@ -0,0 +1,117 @@
+"""
+Process Name Index
+Keeps an inverted trigram index over running process names for fast lookups
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+class ProcessNameIndex:
+    def __init__(self, loader: Callable[[], List[Dict]], ttl: float = 2.0):
+        """Initialize the index
+        
+        loader returns the current process list (dicts with at least 'name');
+        it is only called when the index is older than ttl seconds.
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self._by_name: Dict[str, List[Dict]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        # Freshness checks answered from the cached snapshot vs ones that reloaded it
+        self.hits = 0
+        self.reloads = 0
+    
+    @staticmethod
+    def _trigrams_of(text: str) -> Set[str]:
+        """Split a lowercase string into its set of trigrams"""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def rebuild(self, processes: List[Dict]):
+        """Rebuild the index from a fresh process list"""
+        by_name: Dict[str, List[Dict]] = {}
+        for process in processes:
+            name = process.get('name')
+            if name:
+                by_name.setdefault(name.lower(), []).append(process)
+        
+        trigrams: Dict[str, Set[str]] = {}
+        for name in by_name:
+            for gram in self._trigrams_of(name):
+                trigrams.setdefault(gram, set()).add(name)
+        
+        with self._lock:
+            self._by_name = by_name
+            self._trigrams = trigrams
+            self._built_at = time.monotonic()
+    
+    def invalidate(self):
+        """Force the next lookup to reload the process list"""
+        self._built_at = 0.0
+    
+    def is_stale(self) -> bool:
+        """Check whether the index is older than its TTL"""
+        return time.monotonic() - self._built_at > self.ttl
+    
+    def ensure_fresh(self):
+        """Reload the process list if the index is older than its TTL"""
+        if not self.is_stale():
+            self.hits += 1
+            return
+        with self._reload_lock:
+            # Another caller may have reloaded while we waited
+            if self.is_stale():
+                self.reloads += 1
+                try:
+                    self.rebuild(self.loader())
+                except Exception as e:
+                    logger.error(f"Error rebuilding process name index: {e}")
+    
+    def _matching_names(self, fragment: str) -> List[str]:
+        """Get indexed names that contain fragment (already lowercase)"""
+        if fragment in self._by_name:
+            exact = [fragment]
+        else:
+            exact = []
+        
+        if len(fragment) < 3:
+            # Too short for trigrams, fall back to scanning the distinct names
+            return exact + [name for name in self._by_name if fragment in name and name != fragment]
+        
+        candidates = None
+        # Intersect smallest posting lists first
+        for gram in sorted(self._trigrams_of(fragment), key=lambda g: len(self._trigrams.get(g, ()))):
+            postings = self._trigrams.get(gram)
+            if not postings:
+                return exact
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return exact
+        
+        # Trigram hits are only candidates, confirm the real substring match
+        return exact + [name for name in candidates if fragment in name and name != fragment]
+    
+    def find(self, fragment: str) -> List[Dict]:
+        """Find processes whose name contains fragment (case-insensitive)"""
+        self.ensure_fresh()
+        fragment = fragment.lower()
+        with self._lock:
+            matches = []
+            for name in self._matching_names(fragment):
+                matches.extend(self._by_name[name])
+            return matches
+    
+    def contains(self, fragment: str) -> bool:
+        """Check if any process name contains fragment (case-insensitive)"""
+        self.ensure_fresh()
+        with self._lock:
+            return bool(self._matching_names(fragment.lower()))
+    
+    def __len__(self):
+        return sum(len(processes) for processes in self._by_name.values())
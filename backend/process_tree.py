@@ -0,0 +1,166 @@
+"""
+Process Tree Cache
+Keeps a parent-child process tree so helper processes can be grouped under their application
+"""
+
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Ancestors looked up one by one before resolve() gives up on a chain
+MAX_RESOLVE_DEPTH = 32
+
+class ProcessTree:
+    def __init__(self):
+        """Initialize an empty process tree"""
+        self.nodes: Dict[int, Dict] = {}
+        self.children: Dict[int, Set[int]] = {}
+        self._root_cache: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        
+        # Helper executables that belong to whatever application spawned them
+        self.helper_processes = {
+            'msedgewebview2.exe',
+            'chrome_crashpad_handler.exe',
+            'crashpad_handler.exe',
+            'cefsharp.browsersubprocess.exe',
+            'qtwebengineprocess.exe',
+            'steamwebhelper.exe'
+        }
+    
+    def _link(self, pid: int, ppid: Optional[int]):
+        if ppid is not None and ppid != pid:
+            self.children.setdefault(ppid, set()).add(pid)
+    
+    def _unlink(self, pid: int, ppid: Optional[int]):
+        siblings = self.children.get(ppid)
+        if siblings is not None:
+            siblings.discard(pid)
+            if not siblings:
+                del self.children[ppid]
+    
+    def update(self, processes: List[Dict]):
+        """Apply a fresh process snapshot, touching only what changed"""
+        current = {process['pid']: process for process in processes}
+        added = removed = changed = 0
+        
+        with self._lock:
+            for pid in self.nodes.keys() - current.keys():
+                node = self.nodes.pop(pid)
+                self._unlink(pid, node['ppid'])
+                removed += 1
+            
+            for pid, process in current.items():
+                node = self.nodes.get(pid)
+                ppid = process.get('ppid')
+                name = process.get('name') or ''
+                if node is None:
+                    added += 1
+                elif node['ppid'] != ppid or node['name'] != name:
+                    # PID was reused by a different process
+                    self._unlink(pid, node['ppid'])
+                    changed += 1
+                else:
+                    continue
+                
+                self.nodes[pid] = {'name': name, 'ppid': ppid}
+                self._link(pid, ppid)
+            
+            if added or removed or changed:
+                self._root_cache.clear()
+        
+        if added or removed or changed:
+            logger.debug(f"Process tree updated: +{added} -{removed} ~{changed} ({len(self.nodes)} processes)")
+    
+    def resolve(self, pid: int, lookup: Callable[[int], Optional[Tuple[str, Optional[int]]]],
+                name: Optional[str] = None):
+        """Add a process missing from the tree, and the ancestors its root depends on
+        
+        lookup(pid) returns (name, ppid) for a single process or None if it is
+        gone. Processes already in the tree aren't looked up again unless their
+        name differs from name, which means the PID was reused since the last
+        snapshot.
+        """
+        node = self.nodes.get(pid)
+        if node is not None and (name is None or node['name'] == name):
+            return
+        
+        added = 0
+        child = None
+        while added < MAX_RESOLVE_DEPTH:
+            found = lookup(pid)
+            if found is None:
+                break
+            with self._lock:
+                old = self.nodes.get(pid)
+                if old is not None:
+                    self._unlink(pid, old['ppid'])
+                node = {'name': found[0] or '', 'ppid': found[1]}
+                self.nodes[pid] = node
+                self._link(pid, node['ppid'])
+                self._root_cache.clear()
+            added += 1
+            
+            # Ancestors only matter while the chain still belongs to one application
+            if child is not None and not self._belongs_to_parent(child, node):
+                break
+            parent_pid = node['ppid']
+            if parent_pid is None or parent_pid == pid or parent_pid in self.nodes:
+                break
+            child, pid = node, parent_pid
+        
+        if added:
+            logger.debug(f"Process tree resolved {added} processes without a scan ({len(self.nodes)} processes)")
+    
+    def _belongs_to_parent(self, node: Dict, parent: Dict) -> bool:
+        """Check whether a process is part of its parent's application"""
+        name = node['name'].lower()
+        return name == parent['name'].lower() or name in self.helper_processes
+    
+    def get_root(self, pid: int) -> int:
+        """Get the PID of the top-level application a process belongs to"""
+        with self._lock:
+            root = self._root_cache.get(pid)
+            if root is not None:
+                return root
+            
+            root = pid
+            visited = {pid}
+            node = self.nodes.get(pid)
+            while node is not None:
+                parent_pid = node['ppid']
+                parent = self.nodes.get(parent_pid)
+                if parent is None or parent_pid in visited or not self._belongs_to_parent(node, parent):
+                    break
+                visited.add(parent_pid)
+                root = parent_pid
+                node = parent
+            
+            self._root_cache[pid] = root
+            return root
+    
+    def get_name(self, pid: int) -> Optional[str]:
+        """Get the process name for a PID, if known"""
+        node = self.nodes.get(pid)
+        return node['name'] if node else None
+    
+    def get_descendants(self, pid: int) -> List[int]:
+        """Get all descendant PIDs of a process"""
+        with self._lock:
+            descendants = set()
+            pending = list(self.children.get(pid, ()))
+            while pending:
+                child = pending.pop()
+                if child in descendants or child == pid:
+                    continue
+                descendants.add(child)
+                pending.extend(self.children.get(child, ()))
+            return list(descendants)
+    
+    def __contains__(self, pid):
+        return pid in self.nodes
+    
+    def __len__(self):
+        return len(self.nodes)
@@ -0,0 +1,219 @@
+"""
+Sampling Profiler
+Samples every thread's stack on demand and writes pstats and collapsed-stack profiles
+"""
+
+import os
+import sys
+import math
+import time
+import marshal
+import threading
+import logging
+from collections import Counter as TallyCounter
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 100 samples a second, stretched when sampling gets expensive (see MAX_OVERHEAD)
+DEFAULT_INTERVAL = 0.01
+
+# Share of wall time the sampler may spend walking stacks
+MAX_OVERHEAD = 0.02
+
+# Profiles stop on their own after this long so a forgotten one doesn't grow forever
+MAX_DURATION = 300.0
+
+# Deeper frames are cut off, recursion would otherwise make every stack unique
+MAX_DEPTH = 64
+
+Frame = Tuple[str, int, str]
+
+def _thread_names() -> Dict[int, str]:
+    """Thread names by ident, naming the keyboard module's unnamed hook threads"""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    keyboard = sys.modules.get('keyboard')
+    listener = getattr(keyboard, '_listener', None)
+    for attribute, name in (('listening_thread', 'keyboard-hook'), ('processing_thread', 'keyboard-events')):
+        thread = getattr(listener, attribute, None)
+        if thread is not None and thread.ident in names:
+            names[thread.ident] = name
+    return names
+
+class SamplingProfiler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL, output_dir: str = '.',
+                 tags: Optional[Callable[[], Dict[str, int]]] = None):
+        """Initialize the profiler, start() begins sampling
+        
+        tags returns values describing the app's state (e.g. mapping and
+        session counts) that are recorded with each profile.
+        """
+        self.interval = interval
+        self.output_dir = output_dir
+        self.tags = tags
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._stopping = False
+        # (thread name, stack from outermost to innermost frame) -> samples
+        self._stacks: TallyCounter = TallyCounter()
+        self._started_at = 0.0
+        self._sampling_seconds = 0.0
+        self.sample_count = 0
+        self.last_paths: List[str] = []
+    
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+    
+    def start(self, duration: float = MAX_DURATION) -> bool:
+        """Start sampling all threads for at most duration seconds, False if already running"""
+        if not math.isfinite(duration) or duration <= 0:
+            raise ValueError(f"profile duration must be a positive number of seconds, got {duration}")
+        duration = min(duration, MAX_DURATION)
+        with self._lock:
+            if self.running or self._stopping:
+                return False
+            self._stacks = TallyCounter()
+            self.sample_count = 0
+            self._sampling_seconds = 0.0
+            self._started_at = time.perf_counter()
+            self._stop_event.clear()
+            self.thread = threading.Thread(
+                target=self._run, args=(duration,), name="hotvolume-profiler", daemon=True
+            )
+            self.thread.start()
+        logger.info(f"Sampling profiler started ({1 / self.interval:.0f} Hz, stops after {duration:.0f}s)")
+        return True
+    
+    def stop(self) -> List[str]:
+        """Stop sampling and write the profile, returns the files written
+        
+        Called by the sampler thread itself when the time limit is reached, a
+        stop() racing with that returns [] and leaves the writing to it.
+        """
+        with self._lock:
+            thread = self.thread
+            if thread is None or self._stopping:
+                return []
+            self._stopping = True
+            self._stop_event.set()
+        # Not joined under the lock, the sampler may be waiting for it to stop itself
+        if thread is not threading.current_thread():
+            thread.join()
+        with self._lock:
+            self.last_paths = self._write()
+            self.thread = None
+            self._stopping = False
+        return self.last_paths
+    
+    def _run(self, duration: float):
+        own_ident = threading.get_ident()
+        interval = self.interval
+        deadline = time.perf_counter() + duration
+        while not self._stop_event.wait(interval):
+            started = time.perf_counter()
+            self._sample(own_ident)
+            cost = time.perf_counter() - started
+            self._sampling_seconds += cost
+            # Keep sampling cost under MAX_OVERHEAD of wall time
+            interval = max(self.interval, cost / MAX_OVERHEAD)
+            if started >= deadline:
+                logger.info("Sampling profiler reached its time limit")
+                # Written from this thread, stop() doesn't join the thread that calls it
+                self.stop()
+                return
+    
+    def _sample(self, own_ident: int):
+        names = _thread_names()
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+            self._stacks[(names.get(ident, f"thread-{ident}"), tuple(stack))] += 1
+        self.sample_count += 1
+    
+    def _tag_values(self) -> Dict[str, int]:
+        if self.tags is None:
+            return {}
+        try:
+            return dict(self.tags())
+        except Exception as e:
+            logger.debug(f"Could not read profile tags: {e}")
+            return {}
+    
+    def _write(self) -> List[str]:
+        """Write <name>.pstats and <name>.collapsed, tags go into the file name"""
+        elapsed = time.perf_counter() - self._started_at
+        tags = self._tag_values()
+        now = time.time()
+        name = 'hotvolume-profile-' + time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f"{int(now % 1 * 1000):03d}"
+        name += ''.join(f"-{key}{value}" for key, value in tags.items())
+        base = os.path.join(self.output_dir, name)
+        # Two profiles within the same millisecond get numbered instead of overwriting each other
+        suffix = 1
+        while os.path.exists(base + '.pstats'):
+            suffix += 1
+            base = os.path.join(self.output_dir, f"{name}-{suffix}")
+        
+        try:
+            with open(base + '.collapsed', 'w', encoding='utf-8') as collapsed:
+                for (thread_name, stack), count in sorted(self._stacks.items()):
+                    frames = [thread_name] + [f"{function} ({os.path.basename(filename)}:{line})"
+                                              for filename, line, function in stack]
+                    collapsed.write(f"{';'.join(frames)} {count}\n")
+            with open(base + '.pstats', 'wb') as pstats_file:
+                marshal.dump(self._pstats_dict(elapsed / max(self.sample_count, 1)), pstats_file)
+        except OSError as e:
+            logger.error(f"Could not write profile to {base}: {e}")
+            return []
+        
+        overhead = self._sampling_seconds / elapsed * 100 if elapsed else 0.0
+        tag_text = ', '.join(f"{key}={value}" for key, value in tags.items())
+        logger.info(f"Profile written to {base}.pstats/.collapsed: {self.sample_count} samples over {elapsed:.1f}s, "
+                    f"{overhead:.1f}% sampling overhead" + (f", {tag_text}" if tag_text else ""))
+        return [base + '.pstats', base + '.collapsed']
+    
+    def _pstats_dict(self, seconds_per_sample: float) -> Dict:
+        """Samples in the marshalled format pstats.Stats loads
+        
+        A sample counts as one call. Each thread appears as a root function
+        named after it, so pstats callers show which thread a function ran on.
+        """
+        # function -> [self samples, cumulative samples, {caller: [samples, cumulative samples]}]
+        entries: Dict[Frame, list] = {}
+        
+        def entry(function):
+            if function not in entries:
+                entries[function] = [0, 0, {}]
+            return entries[function]
+        
+        for (thread_name, stack), count in self._stacks.items():
+            frames = [('~', 0, f"<thread {thread_name}>")] + list(stack)
+            seen = set()
+            for index, function in enumerate(frames):
+                stats = entry(function)
+                # Recursive functions count once per sample for cumulative time
+                if function not in seen:
+                    stats[1] += count
+                    seen.add(function)
+                if index:
+                    caller = stats[2].setdefault(frames[index - 1], [0, 0])
+                    caller[0] += count
+                    caller[1] += count
+            entry(frames[-1])[0] += count
+        
+        stats = {}
+        for function, (self_samples, cumulative_samples, callers) in entries.items():
+            calls = max(cumulative_samples, 1)
+            stats[function] = (
+                calls, calls, self_samples * seconds_per_sample, cumulative_samples * seconds_per_sample,
+                {caller: (samples, samples, 0.0, cumulative * seconds_per_sample)
+                 for caller, (samples, cumulative) in callers.items()}
+            )
+        return stats
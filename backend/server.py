@@ -6,42 +6,262 @@ Main application that provides system-wide volume control for individual applica
 import logging
 import threading
 import time
+import math
 import sys
 import os
+import signal
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Import our custom modules
+# The profiler has to be armed before the heavy imports below to see them
+from startup_profiler import profiler
+if '--profile-startup' in sys.argv:
+    profiler.enable()
+
+# Likewise allocation tracing, so memory reports can attribute what startup allocated
+import memory_diagnostics
+if any(arg.startswith('--diagnose-memory') for arg in sys.argv):
+    memory_diagnostics.start_tracing()
+
+# Import our custom modules (the config GUI, app detector and tray are imported on first use)
 from audio_controller import AudioController
 from hotkey_manager import HotkeyManager
-from app_detector import AppDetector
-from tray_interface import TrayInterface
-from config_gui import ConfigGUI
+from app_registry import AppRegistry
+from task_pool import init_com_for_thread, shutdown_shared_pool
+from logging_setup import setup_logging, set_log_level, get_log_level
+from metrics import MetricsRegistry, process_rss_bytes
+from sampling_profiler import SamplingProfiler, MAX_DURATION as MAX_PROFILE_SECONDS
+from single_instance import ensure_single_instance
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('hotvolume.log')
-    ]
-)
+# Configure logging (queued, written to a rotating hotvolume.log by a background thread)
+setup_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Startup steps that run side by side: hotkeys, session scan, process snapshot, tray icon,
+# control channel and HTTP API
+STARTUP_WORKERS = 6
+
+# GUI toolkits that headless mode must never load
+GUI_MODULES = ('pystray', 'PIL', 'tkinter')
+
 class HotVolumeApp:
-    def __init__(self):
-        """Initialize the HotVolume application"""
+    def __init__(self, api_port=None, headless=False, record_trace=None, memory_interval=None):
+        """Initialize the HotVolume application
+        
+        With api_port set, the HTTP/WebSocket API is served on that port.
+        Headless runs without the tray icon and configuration window.
+        With record_trace set, hotkey presses are recorded to that file.
+        With memory_interval set, a memory report is written every that many seconds.
+        """
         logger.info("Initializing HotVolume application...")
         
-        # Initialize core components
-        self.audio_controller = AudioController()
-        self.app_detector = AppDetector()
-        self.hotkey_manager = HotkeyManager(self.audio_controller)
+        # Construct core components only, the slow parts run concurrently from start()
+        with profiler.phase("app registry"):
+            self.app_registry = AppRegistry()
+        with profiler.phase("audio controller"):
+            self.audio_controller = AudioController(app_registry=self.app_registry, auto_refresh=False)
+        with profiler.phase("hotkey manager"):
+            self.hotkey_manager = HotkeyManager(self.audio_controller, load_config=False)
+        self.metrics = MetricsRegistry()
+        self.metrics.add_source(self.audio_controller)
+        self.metrics.add_source(self.hotkey_manager)
+        self._app_detector = None
+        self._app_detector_lock = threading.Lock()
+        self.startup_futures = {}
+        self.control_server = None
+        self.api_port = api_port
+        self.api_server = None
         self.config_gui = None
         self.tray_interface = None
+        self.headless = headless
+        self.record_trace = record_trace
+        self.sampling_profiler = SamplingProfiler(tags=self._profile_tags)
+        self.memory_diagnostics = None
+        if memory_interval is not None:
+            self.memory_diagnostics = memory_diagnostics.MemoryDiagnostics(
+                memory_interval, audio_controller=self.audio_controller
+            )
+        self._shutdown_requested = threading.Event()
         
         self.running = False
     
+    @property
+    def app_detector(self):
+        """App detector, created on first use"""
+        with self._app_detector_lock:
+            if self._app_detector is None:
+                with profiler.phase("app detector"):
+                    from app_detector import AppDetector
+                    self._app_detector = AppDetector(app_registry=self.app_registry)
+                self.audio_controller.set_app_detector(self._app_detector)
+                self.metrics.add_source(self._app_detector)
+            return self._app_detector
+    
+    def initialize_sessions(self):
+        """Run the first session scan and subscribe to new sessions"""
+        try:
+            # Touch the detector first so the scan can group helper processes
+            self.app_detector
+            with profiler.phase("initial session scan"):
+                self.audio_controller.refresh_sessions()
+            with profiler.phase("session notifications"):
+                self.audio_controller.start_session_notifications()
+        except Exception as e:
+            logger.error(f"Error during initial session scan: {e}")
+    
+    def _start_hotkeys(self) -> bool:
+        """Startup step: load the hotkey configuration and arm the listener"""
+        with profiler.phase("hotkey config"):
+            self.hotkey_manager.load_configuration()
+            self.setup_default_hotkeys()
+        
+        logger.info("Starting hotkey listener...")
+        if self.record_trace:
+            self.hotkey_manager.start_trace(self.record_trace)
+        
+        with profiler.phase("hotkey listener"):
+            return self.hotkey_manager.start_hotkey_listener()
+    
+    def _warm_app_detector(self):
+        """Startup step: load the first process snapshot"""
+        with profiler.phase("process snapshot"):
+            self.app_detector.warm_up()
+    
+    def _prepare_tray(self):
+        """Startup step: import the tray modules and render the icon"""
+        logger.info("Initializing system tray interface...")
+        with profiler.phase("tray interface"):
+            from tray_interface import TrayInterface
+            tray_interface = TrayInterface(
+                self.audio_controller,
+                self.hotkey_manager,
+                self.config_callback,
+                memory_diagnostics=self.memory_diagnostics,
+                sampling_profiler=self.sampling_profiler
+            )
+            tray_interface.prepare()
+        return tray_interface
+    
+    def _start_control_server(self):
+        """Startup step: open the local control channel for scripts and `ctl`"""
+        with profiler.phase("control channel"):
+            from control_server import ControlServer
+            control_server = ControlServer(self.audio_controller)
+            # Arguments of a second launch arrive as commands (see single_instance)
+            control_server.register_command('open-config', self._cmd_open_config)
+            control_server.register_command('log-level', self._cmd_log_level)
+            control_server.register_command('metrics', self._cmd_metrics)
+            control_server.register_command('trace', self._cmd_trace)
+            control_server.register_command('memory', self._cmd_memory)
+            control_server.register_command('profile', self._cmd_profile)
+            if control_server.start():
+                self.control_server = control_server
+    
+    def _cmd_open_config(self, args):
+        if self.headless:
+            from control_server import CommandError
+            raise CommandError("running headless, there is no configuration window")
+        self.config_callback()
+        return "opened"
+    
+    def _cmd_log_level(self, args):
+        if args:
+            set_log_level(args[0])
+        return get_log_level()
+    
+    def _cmd_trace(self, args):
+        from control_server import CommandError
+        if args[:1] == ['start'] and len(args) == 2:
+            try:
+                self.hotkey_manager.start_trace(args[1])
+            except OSError as e:
+                raise CommandError(f"cannot record to {args[1]}: {e}")
+            return f"recording to {args[1]}"
+        if args == ['stop']:
+            return f"recorded {self.hotkey_manager.stop_trace()} presses"
+        raise CommandError("usage: trace start PATH | trace stop")
+    
+    def _cmd_memory(self, args):
+        if self.memory_diagnostics is None:
+            from control_server import CommandError
+            raise CommandError("memory diagnostics are off, start with --diagnose-memory")
+        summary = self.memory_diagnostics.dump('control command')
+        return f"{summary}\nwritten to {self.memory_diagnostics.report_file}"
+    
+    def _profile_tags(self):
+        """State recorded with each profile"""
+        return {
+            'mappings': len(self.hotkey_manager.app_mappings),
+            'sessions': len(self.audio_controller.sessions),
+        }
+    
+    def _cmd_profile(self, args):
+        from control_server import CommandError
+        if args[:1] == ['start'] and len(args) <= 2:
+            try:
+                duration = float(args[1]) if len(args) == 2 else MAX_PROFILE_SECONDS
+            except ValueError:
+                raise CommandError(f"invalid duration: {args[1]}")
+            if not math.isfinite(duration) or duration <= 0:
+                raise CommandError(f"duration must be a positive number of seconds: {args[1]}")
+            if not self.sampling_profiler.start(duration):
+                raise CommandError("profiler is already running")
+            return "profiling all threads"
+        if args == ['stop']:
+            if not self.sampling_profiler.running:
+                raise CommandError("profiler is not running")
+            paths = self.sampling_profiler.stop()
+            if not paths:
+                raise CommandError("profile could not be written, see the log")
+            return '\n'.join(paths)
+        if not args:
+            return "running" if self.sampling_profiler.running else "stopped"
+        raise CommandError("usage: profile [start [SECONDS] | stop]")
+    
+    def _cmd_metrics(self, args):
+        return self.metrics.render().rstrip('\n')
+    
+    def _start_api_server(self):
+        """Startup step: serve the HTTP/WebSocket API if it was asked for"""
+        if self.api_port is None:
+            return
+        with profiler.phase("api server"):
+            try:
+                from api_server import ApiServer
+                api_server = ApiServer(self.audio_controller, self.hotkey_manager, port=self.api_port,
+                                       metrics_registry=self.metrics)
+            except ImportError as e:
+                logger.error(f"HTTP API not available: {e}")
+                return
+            if api_server.start():
+                self.api_server = api_server
+    
+    def start_components(self):
+        """Run the independent startup steps concurrently
+        
+        Returns a future per step. Hotkeys pressed before the session scan
+        finishes are queued by the hotkey manager until audio_controller.ready
+        resolves, so startup only waits for the hotkey and tray steps.
+        """
+        pool = ThreadPoolExecutor(
+            max_workers=STARTUP_WORKERS,
+            thread_name_prefix="hotvolume-startup",
+            initializer=init_com_for_thread
+        )
+        self.startup_futures = {
+            'hotkeys': pool.submit(self._start_hotkeys),
+            'sessions': pool.submit(self.initialize_sessions),
+            'app_detector': pool.submit(self._warm_app_detector),
+            'control': pool.submit(self._start_control_server),
+            'api': pool.submit(self._start_api_server),
+        }
+        if not self.headless:
+            self.startup_futures['tray'] = pool.submit(self._prepare_tray)
+        # Workers exit once their step is done
+        pool.shutdown(wait=False)
+        return self.startup_futures
+    
     def setup_default_hotkeys(self):
         """Set up default hotkey mappings"""
         logger.info("Setting up default hotkeys...")
@@ -75,6 +295,7 @@ class HotVolumeApp:
     def config_callback(self):
         """Callback to open configuration GUI"""
         if not self.config_gui:
+            from config_gui import ConfigGUI
             self.config_gui = ConfigGUI(
                 self.audio_controller,
                 self.hotkey_manager,
@@ -88,24 +309,18 @@ class HotVolumeApp:
         try:
             logger.info("Starting HotVolume application...")
             
-            # Set up default hotkeys
-            self.setup_default_hotkeys()
+            futures = self.start_components()
             
-            # Start hotkey listener
-            logger.info("Starting hotkey listener...")
-            if not self.hotkey_manager.start_hotkey_listener():
+            # The session scan keeps running in the background
+            if not futures['hotkeys'].result():
                 logger.error("Failed to start hotkey listener")
                 return False
-            
-            # Initialize tray interface
-            logger.info("Initializing system tray interface...")
-            self.tray_interface = TrayInterface(
-                self.audio_controller,
-                self.hotkey_manager,
-                self.config_callback
-            )
+            if not self.headless:
+                self.tray_interface = futures['tray'].result()
             
             self.running = True
+            if self.memory_diagnostics:
+                self.memory_diagnostics.start()
             
             # Show initial information
             logger.info("HotVolume is now running!")
@@ -113,9 +328,15 @@ class HotVolumeApp:
             for hotkey, mapping in self.hotkey_manager.get_active_mappings().items():
                 logger.info(f"  {hotkey}: {mapping['action']} {mapping['app']}")
             
-            # Start tray interface (this will block)
-            logger.info("Starting system tray interface...")
-            self.tray_interface.start()
+            profiler.report()
+            self.log_memory_usage()
+            
+            if self.headless:
+                self.run_headless()
+            else:
+                # Start tray interface (this will block)
+                logger.info("Starting system tray interface...")
+                self.tray_interface.start()
             
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt")
@@ -126,6 +347,32 @@ class HotVolumeApp:
         
         return True
     
+    def run_headless(self):
+        """Block until SIGINT/SIGTERM (or Ctrl+Break on Windows) asks to shut down"""
+        def request_shutdown(signum, frame):
+            logger.info(f"Received signal {signal.Signals(signum).name}")
+            self._shutdown_requested.set()
+        
+        for name in ('SIGINT', 'SIGTERM', 'SIGBREAK'):
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), request_shutdown)
+        
+        leaked = [name for name in GUI_MODULES if name in sys.modules]
+        if leaked:
+            logger.warning(f"Headless mode loaded GUI modules: {', '.join(leaked)}")
+        logger.info("Running headless, stop with Ctrl+C or SIGTERM")
+        
+        # A timed wait so signal handlers get to run on Windows too
+        while not self._shutdown_requested.wait(1.0):
+            pass
+    
+    def log_memory_usage(self):
+        """Log resident memory once startup is done, benchmarks/bench_headless_memory.py compares the modes"""
+        rss = process_rss_bytes()
+        if rss is not None:
+            mode = "headless" if self.headless else "tray"
+            logger.info(f"Resident memory after startup ({mode} mode): {rss / (1024 * 1024):.1f} MB")
+    
     def stop(self):
         """Stop the HotVolume application"""
         logger.info("Stopping HotVolume application...")
@@ -135,20 +382,49 @@ class HotVolumeApp:
         # Stop hotkey listener
         if self.hotkey_manager:
             self.hotkey_manager.stop_hotkey_listener()
+            self.hotkey_manager.stop_trace()
+        
+        # Stop the HTTP API
+        if self.api_server:
+            self.api_server.stop()
+        
+        # Close the control channel
+        if self.control_server:
+            self.control_server.stop()
         
         # Stop tray interface
         if self.tray_interface:
             self.tray_interface.stop()
         
-        # Close config GUI
-        if self.config_gui and self.config_gui.window_open:
-            self.config_gui.on_closing()
+        # Close config GUI and its UI thread
+        if self.config_gui:
+            self.config_gui.shutdown()
+        
+        # Release background workers
+        shutdown_shared_pool()
+        
+        # Keep a profile that was still running
+        if self.sampling_profiler.running:
+            self.sampling_profiler.stop()
+        
+        # Final memory report
+        if self.memory_diagnostics:
+            self.memory_diagnostics.stop()
+        
+        # Stop listening for new audio sessions
+        if self.audio_controller:
+            self.audio_controller.stop_session_notifications()
+        
+        # Persist learned audio apps
+        if self.app_registry is not None:
+            self.app_registry.flush()
         
         logger.info("HotVolume application stopped")
     
     def test_functionality(self):
         """Test the core functionality"""
         logger.info("Testing HotVolume functionality...")
+        self.initialize_sessions()
         
         # Test audio controller
         logger.info("Testing audio controller...")
@@ -171,8 +447,39 @@ class HotVolumeApp:
         
         return True
 
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="HotVolume - Application Volume Controller")
+    parser.add_argument('--test', action='store_true', help="test core functionality and exit")
+    parser.add_argument('--config', action='store_true', help="open the configuration window only")
+    parser.add_argument('--profile-startup', action='store_true', help="log import and initialization times")
+    parser.add_argument('--log-level', default=None, help="log level, e.g. DEBUG (can be changed from the tray)")
+    parser.add_argument('--api', nargs='?', type=int, const=8001, default=None, metavar='PORT',
+                        help="serve the HTTP/WebSocket API on 127.0.0.1 (default port 8001)")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without tray icon or configuration window, stop with Ctrl+C or SIGTERM")
+    parser.add_argument('--diagnose-memory', nargs='?', type=float, const=memory_diagnostics.DEFAULT_INTERVAL,
+                        default=None, metavar='SECONDS',
+                        help="trace allocations and write a memory report every SECONDS (default 300)")
+    parser.add_argument('--record-trace', default=None, metavar='PATH',
+                        help="record hotkey presses for replay with hotkey_trace.py")
+    args = parser.parse_args(argv)
+    if args.headless and args.config:
+        parser.error("--config needs the GUI and cannot be combined with --headless")
+    return args
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    
+    # Normally already checked by run_hotvolume.py, this covers running server.py directly
+    exit_code = ensure_single_instance(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    
+    if args.log_level:
+        set_log_level(args.log_level)
+    
     logger.info("=" * 60)
     logger.info("HotVolume - Application Volume Controller v1.0")
     logger.info("=" * 60)
@@ -183,21 +490,26 @@ def main():
         sys.exit(1)
     
     # Create and start the application
-    app = HotVolumeApp()
+    app = HotVolumeApp(api_port=args.api, headless=args.headless, record_trace=args.record_trace,
+                       memory_interval=args.diagnose_memory)
     
     # Handle command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--test':
-            app.test_functionality()
-            return
-        elif sys.argv[1] == '--config':
-            app.config_callback()
-            try:
-                while True:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                pass
-            return
+    if args.test:
+        app.test_functionality()
+        profiler.report()
+        return
+    elif args.config:
+        app.hotkey_manager.load_configuration()
+        app.initialize_sessions()
+        app._start_control_server()
+        app.config_callback()
+        profiler.report()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        return
     
     # Normal startup
     try:
@@ -0,0 +1,151 @@
+"""
+Simulated Audio Backend
+In-memory stand-in for the Windows audio session API, for tests, benchmarks and the API demo
+"""
+
+import itertools
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class SimulatedVolume:
+    """Mimics pycaw's ISimpleAudioVolume"""
+    def __init__(self, volume: float = 1.0, muted: bool = False):
+        self.volume = volume
+        self.muted = muted
+        # on_changed(volume, muted) callbacks of watch_session(), like OnSimpleVolumeChanged
+        self.listeners: List[Callable[[float, bool], None]] = []
+    
+    def GetMasterVolume(self):
+        return self.volume
+    
+    def SetMasterVolume(self, level, event_context):
+        self.volume = max(0.0, min(1.0, float(level)))
+        self._changed()
+    
+    def GetMute(self):
+        return int(self.muted)
+    
+    def SetMute(self, mute, event_context):
+        self.muted = bool(mute)
+        self._changed()
+    
+    def _changed(self):
+        for on_changed in list(self.listeners):
+            on_changed(self.volume, self.muted)
+
+class SimulatedMeter:
+    """Mimics pycaw's IAudioMeterInformation"""
+    def __init__(self):
+        self.peak = 0.0
+    
+    def GetPeakValue(self):
+        return self.peak
+
+class SimulatedProcess:
+    """Mimics the psutil.Process that pycaw attaches to a session"""
+    def __init__(self, name: str, pid: int):
+        self._name = name
+        self.pid = pid
+    
+    def name(self):
+        return self._name
+
+class SimulatedSession:
+    """Mimics pycaw's AudioSession"""
+    _instances = itertools.count(1)
+    
+    def __init__(self, name: str, pid: int, volume: float = 1.0, muted: bool = False, display_name: str = ''):
+        self.Process = SimulatedProcess(name, pid)
+        self.DisplayName = display_name
+        self.InstanceIdentifier = f"{name}%b{pid}%{next(self._instances)}"
+        self.SimpleAudioVolume = SimulatedVolume(volume, muted)
+        self.meter = SimulatedMeter()
+        # on_expired() callbacks of watch_session(), like OnStateChanged(Expired)
+        self.expiry_listeners: List[Callable[[], None]] = []
+
+class SimulatedAudioBackend:
+    def __init__(self, apps: Optional[Dict[str, float]] = None):
+        """Create the backend, optionally with {app_name: volume} sessions already playing"""
+        self.sessions: List[SimulatedSession] = []
+        self._pids = itertools.count(1000)
+        self._on_created: Optional[Callable[[], None]] = None
+        self._lock = threading.Lock()
+        for app_name, volume in (apps or {}).items():
+            self.add_app(app_name, volume=volume)
+    
+    # Session source interface used by AudioController
+    
+    def get_all_sessions(self) -> List[SimulatedSession]:
+        with self._lock:
+            return list(self.sessions)
+    
+    def get_meter(self, session: SimulatedSession) -> SimulatedMeter:
+        return session.meter
+    
+    def subscribe(self, on_created: Callable[[], None]) -> bool:
+        self._on_created = on_created
+        return True
+    
+    def unsubscribe(self):
+        self._on_created = None
+    
+    def watch_session(self, session: SimulatedSession, on_changed: Callable[[float, bool], None],
+                      on_expired: Callable[[], None]):
+        session.SimpleAudioVolume.listeners.append(on_changed)
+        session.expiry_listeners.append(on_expired)
+        return session, on_changed, on_expired
+    
+    def unwatch_session(self, handle):
+        session, on_changed, on_expired = handle
+        if on_changed in session.SimpleAudioVolume.listeners:
+            session.SimpleAudioVolume.listeners.remove(on_changed)
+        if on_expired in session.expiry_listeners:
+            session.expiry_listeners.remove(on_expired)
+    
+    # Test controls
+    
+    def add_app(self, name: str, volume: float = 1.0, muted: bool = False, sessions: int = 1,
+                pid: Optional[int] = None, display_name: str = '') -> List[SimulatedSession]:
+        """Start audio sessions for an app, like a program starting playback"""
+        added = [
+            SimulatedSession(name, pid or next(self._pids), volume, muted, display_name)
+            for _ in range(sessions)
+        ]
+        with self._lock:
+            self.sessions.extend(added)
+        if self._on_created:
+            self._on_created()
+        return added
+    
+    def remove_app(self, name: str) -> int:
+        """End every session of an app, returns how many were removed"""
+        with self._lock:
+            kept = [session for session in self.sessions if session.Process.name() != name]
+            ended = [session for session in self.sessions if session.Process.name() == name]
+            self.sessions = kept
+        for session in ended:
+            for on_expired in list(session.expiry_listeners):
+                on_expired()
+        return len(ended)
+    
+    def set_peak(self, name: str, peak: float):
+        """Set the meter level reported for an app's sessions"""
+        for session in self._sessions_of(name):
+            session.meter.peak = peak
+    
+    def set_volume(self, name: str, volume: float):
+        """Change an app's volume behind the controller's back, like the Windows mixer would"""
+        for session in self._sessions_of(name):
+            session.SimpleAudioVolume.SetMasterVolume(volume, None)
+    
+    def set_mute(self, name: str, muted: bool):
+        """Change an app's mute state behind the controller's back"""
+        for session in self._sessions_of(name):
+            session.SimpleAudioVolume.SetMute(muted, None)
+    
+    def _sessions_of(self, name: str) -> List[SimulatedSession]:
+        with self._lock:
+            return [session for session in self.sessions if session.Process.name() == name]
@@ -0,0 +1,137 @@
+"""
+Single Instance Lock
+Keeps one HotVolume per user and hands a second launch's arguments to the running one
+
+Only standard library modules are imported here so the check runs before pycaw,
+keyboard and the GUI toolkits are loaded.
+"""
+
+import os
+import sys
+import time
+import tempfile
+from typing import List, Optional
+
+# How long a second launch keeps trying to reach an instance that is still starting up
+FORWARD_TIMEOUT = 3.0
+
+def default_lock_path() -> str:
+    """Per-user lock file next to the control channel"""
+    if os.name == 'nt':
+        runtime_dir = os.environ.get('LOCALAPPDATA') or tempfile.gettempdir()
+        user = os.environ.get('USERNAME', 'user')
+        return os.path.join(runtime_dir, f'hotvolume-{user}.lock')
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f'hotvolume-{os.getuid()}.lock')
+
+class SingleInstance:
+    def __init__(self, path: str = None):
+        """Initialize the lock, acquire() takes it"""
+        self.path = path or default_lock_path()
+        self._file = None
+    
+    @property
+    def acquired(self) -> bool:
+        return self._file is not None
+    
+    def acquire(self) -> bool:
+        """Take the lock without blocking, False if another instance holds it
+        
+        The lock is tied to the open file, so the OS releases it when the
+        process exits, even after a crash.
+        """
+        if self._file is not None:
+            return True
+        
+        lock_file = open(self.path, 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        
+        # Informational only, the lock itself is what counts
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+    
+    def release(self):
+        """Give up the lock"""
+        if self._file is None:
+            return
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        self._file.close()
+        self._file = None
+
+def forwarded_commands(argv: List[str]) -> List[str]:
+    """Translate launch arguments into control commands for the running instance"""
+    commands = []
+    for index, arg in enumerate(argv):
+        if arg == '--config':
+            commands.append('open-config')
+        elif arg == '--log-level' and index + 1 < len(argv):
+            commands.append(f'log-level {argv[index + 1]}')
+        elif arg.startswith('--log-level='):
+            commands.append(f"log-level {arg.split('=', 1)[1]}")
+    # A plain second launch only checks that the running instance is alive
+    return commands or ['ping']
+
+def forward_to_running_instance(argv: List[str], timeout: float = FORWARD_TIMEOUT) -> int:
+    """Send argv to the running instance, returns the exit code for this process"""
+    from ctl import ControlClient
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with ControlClient() as client:
+                failed = False
+                for command, response in client.pipeline(forwarded_commands(argv)):
+                    if not response.startswith('ok'):
+                        failed = True
+                        print(f"{command}: {response}", file=sys.stderr)
+            print("HotVolume is already running" + (", arguments forwarded" if argv else ""))
+            return 1 if failed else 0
+        except (OSError, EOFError) as e:
+            # The lock holder may still be opening its control channel
+            if time.monotonic() >= deadline:
+                print(f"HotVolume is already running but not answering: {e}", file=sys.stderr)
+                return 1
+            time.sleep(0.05)
+
+_instance = SingleInstance()
+
+def ensure_single_instance(argv: List[str]) -> Optional[int]:
+    """Take the per-user lock, or forward argv to the instance holding it
+    
+    Returns None when this process should go on starting up, otherwise the
+    exit code to leave with.
+    """
+    if '--test' in argv:
+        # Diagnostics only read sessions, they don't hook keys or add a tray icon
+        return None
+    try:
+        if _instance.acquire():
+            return None
+    except OSError as e:
+        # No usable lock file location, run without the guard rather than not at all
+        print(f"Could not check for a running HotVolume: {e}", file=sys.stderr)
+        return None
+    return forward_to_running_instance(argv)
@@ -0,0 +1,101 @@
+"""
+Startup Profiler
+Measures per-module import time and initialization phases for --profile-startup
+"""
+
+import builtins
+import sys
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class StartupProfiler:
+    def __init__(self):
+        """Initialize a disabled profiler"""
+        self.enabled = False
+        self.started_at = time.perf_counter()
+        self.imports = []
+        self.phases = []
+        self.reported = False
+        self._original_import = None
+        self._import_depth = threading.local()
+        self._lock = threading.Lock()
+    
+    def enable(self):
+        """Start recording imports and phases"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+    
+    def disable(self):
+        """Stop recording imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+    
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """builtins.__import__ wrapper timing the first import of each top-level module"""
+        top_level = name.partition('.')[0]
+        if level or top_level in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        
+        depth = getattr(self._import_depth, 'value', 0)
+        entry = [top_level, depth, 0.0]
+        with self._lock:
+            self.imports.append(entry)
+        
+        self._import_depth.value = depth + 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._import_depth.value = depth
+            # Inclusive time: nested imports are counted inside their parent too
+            entry[2] = time.perf_counter() - start
+    
+    @contextmanager
+    def phase(self, name):
+        """Time an initialization phase"""
+        if not self.enabled:
+            yield
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases.append((name, elapsed, threading.current_thread().name))
+            if self.reported:
+                # Phases that finish after the report (background work) are logged as they end
+                logger.info(f"[startup] {name}: {elapsed * 1000:.1f} ms (after startup)")
+    
+    def report(self):
+        """Log import and phase timings, and stop timing imports"""
+        if not self.enabled:
+            return
+        self.reported = True
+        # Later imports (lazy keyboard load, function-local imports) are runtime, not startup
+        self.disable()
+        total = time.perf_counter() - self.started_at
+        
+        logger.info("[startup] Import times (inclusive, nested imports indented):")
+        for module, depth, elapsed in self.imports:
+            # Skip the noise of tiny stdlib imports
+            if elapsed >= 0.001 or depth == 0:
+                logger.info(f"[startup]   {'  ' * depth}{module:<{max(1, 28 - 2 * depth)}} {elapsed * 1000:8.1f} ms")
+        
+        logger.info("[startup] Initialization phases:")
+        for name, elapsed, thread_name in self.phases:
+            logger.info(f"[startup]   {name:<24} {elapsed * 1000:8.1f} ms  ({thread_name})")
+        
+        logger.info(f"[startup] Ready after {total * 1000:.1f} ms")
+
+# Shared instance, enabled by server.py before its heavy imports
+profiler = StartupProfiler()
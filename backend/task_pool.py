@@ -0,0 +1,94 @@
+"""
+Shared Task Pool
+Bounded background executor with in-flight deduplication for UI-triggered work
+"""
+
+import os
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+def init_com_for_thread():
+    """Initialize COM on the current thread, pycaw calls fail on threads without it"""
+    if os.name != 'nt':
+        return
+    try:
+        import comtypes
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+    except Exception as e:
+        logger.debug(f"COM initialization for worker thread skipped: {e}")
+
+class TaskPool:
+    def __init__(self, max_workers: int = 2, name: str = "hotvolume-worker"):
+        """Initialize the pool"""
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=name,
+            initializer=init_com_for_thread
+        )
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, func: Callable, *args, key: Optional[Hashable] = None, **kwargs) -> Future:
+        """Run func on the pool
+        
+        When key is given and a task with the same key is still queued or
+        running, that task's future is returned instead of queueing a duplicate.
+        """
+        if key is None:
+            return self.executor.submit(self._run, func, args, kwargs)
+        
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None and not future.done():
+                logger.debug(f"Task {key} already in flight, not queueing it again")
+                return future
+            
+            future = self.executor.submit(self._run, func, args, kwargs)
+            self._in_flight[key] = future
+        
+        future.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return future
+    
+    def _run(self, func, args, kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Error in background task {getattr(func, '__name__', func)}: {e}")
+            raise
+    
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+    
+    def in_flight(self) -> int:
+        """Get the number of deduplicated tasks still pending"""
+        with self._lock:
+            return len(self._in_flight)
+    
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and release the worker threads"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def get_shared_pool() -> TaskPool:
+    """Get the process-wide task pool, creating it on first use"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = TaskPool()
+        return _shared_pool
+
+def shutdown_shared_pool(wait: bool = False):
+    """Shut down the process-wide task pool if it was created"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.shutdown(wait=wait)
+            _shared_pool = None
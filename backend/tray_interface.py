@@ -7,48 +7,128 @@ import pystray
 from PIL import Image, ImageDraw
 import threading
 import logging
+from concurrent.futures import Future
 from pathlib import Path
+from functools import lru_cache
+from task_pool import get_shared_pool
+from logging_setup import is_debug_logging, set_log_level
 import base64
 import io
 
 logger = logging.getLogger(__name__)
 
+# Number of volume levels the icon can show: silent plus one to three sound waves
+ICON_LEVEL_BUCKETS = 4
+
+def volume_bucket(volume):
+    """Map a volume (0.0 to 1.0, or None if unknown) to an icon level bucket"""
+    if volume is None:
+        return ICON_LEVEL_BUCKETS - 1
+    if volume <= 0.0:
+        return 0
+    return min(ICON_LEVEL_BUCKETS - 1, 1 + int(volume * (ICON_LEVEL_BUCKETS - 1) - 1e-9))
+
+@lru_cache(maxsize=ICON_LEVEL_BUCKETS * 2)
+def render_icon(bucket, muted):
+    """Render the tray icon for a volume bucket and mute state (cached)"""
+    # Create a 64x64 image with a volume icon
+    width = 64
+    height = 64
+    image = Image.new('RGB', (width, height), color='black')
+    draw = ImageDraw.Draw(image)
+    
+    # Draw a simple speaker icon
+    # Speaker body
+    draw.rectangle([10, 20, 25, 44], fill='white')
+    # Speaker cone
+    draw.polygon([(25, 20), (40, 15), (40, 49), (25, 44)], fill='white')
+    
+    if muted:
+        # Cross instead of sound waves
+        draw.line([(46, 22), (60, 42)], fill='red', width=4)
+        draw.line([(46, 42), (60, 22)], fill='red', width=4)
+    else:
+        # One sound wave per volume bucket
+        waves = [[45, 18, 55, 28], [48, 25, 58, 35], [51, 32, 61, 42]]
+        for box in waves[:bucket]:
+            draw.arc(box, 0, 180, fill='white', width=2)
+    
+    return image
+
 class TrayInterface:
-    def __init__(self, audio_controller=None, hotkey_manager=None, config_callback=None):
+    def __init__(self, audio_controller=None, hotkey_manager=None, config_callback=None, task_pool=None,
+                 memory_diagnostics=None, sampling_profiler=None):
         """Initialize the system tray interface"""
         self.audio_controller = audio_controller
         self.hotkey_manager = hotkey_manager
         self.config_callback = config_callback
+        self.memory_diagnostics = memory_diagnostics
+        self.sampling_profiler = sampling_profiler
+        # Tray actions run here instead of on pystray's callback thread
+        self.task_pool = task_pool or get_shared_pool()
         self.icon = None
         self.is_running = False
+        
+        # Icon state (volume bucket, muted) currently shown, and last known levels per app
+        self._icon_state = (ICON_LEVEL_BUCKETS - 1, False)
+        self._app_levels = {}
+        
+        # Menu items are rebuilt only when the session/hotkey snapshot version changes
+        self._menu_items = None
+        self._menu_version = None
+        
+        # Resolved once the icon is visible
+        self.ready = Future()
+        
+        if self.audio_controller:
+            self.audio_controller.add_listener(self._on_audio_changed)
+        if self.hotkey_manager:
+            self.hotkey_manager.add_listener(self._on_hotkeys_changed)
     
     def create_icon_image(self):
-        """Create a simple icon image for the system tray"""
-        # Create a 64x64 image with a volume icon
-        width = 64
-        height = 64
-        image = Image.new('RGB', (width, height), color='black')
-        draw = ImageDraw.Draw(image)
-        
-        # Draw a simple speaker icon
-        # Speaker body
-        draw.rectangle([10, 20, 25, 44], fill='white')
-        # Speaker cone
-        draw.polygon([(25, 20), (40, 15), (40, 49), (25, 44)], fill='white')
-        # Sound waves
-        draw.arc([45, 18, 55, 28], 0, 180, fill='white', width=2)
-        draw.arc([48, 25, 58, 35], 0, 180, fill='white', width=2)
-        draw.arc([51, 32, 61, 42], 0, 180, fill='white', width=2)
+        """Get the default icon image for the system tray"""
+        return render_icon(ICON_LEVEL_BUCKETS - 1, False)
+    
+    def _on_volume_touched(self, app_name, volume=None, muted=None):
+        """Reflect the last-touched app's volume bucket and mute state in the icon"""
+        level = self._app_levels.setdefault(app_name, {'volume': None, 'muted': False})
+        if volume is not None:
+            level['volume'] = volume
+        if muted is not None:
+            level['muted'] = bool(muted)
         
-        return image
+        self._set_icon_state(volume_bucket(level['volume']), level['muted'])
+    
+    def _set_icon_state(self, bucket, muted):
+        """Swap in a cached icon, skipping the upload when nothing visible changed"""
+        state = (bucket, muted)
+        if state == self._icon_state:
+            return
+        self._icon_state = state
+        if self.icon:
+            self.icon.icon = render_icon(bucket, muted)
+    
+    def _snapshot_version(self):
+        """Get the version of the state the menu is built from"""
+        sessions_version = self.audio_controller.sessions_version if self.audio_controller else 0
+        hotkeys_version = self.hotkey_manager.state_version if self.hotkey_manager else 0
+        return (sessions_version, hotkeys_version)
     
     def get_menu_items(self):
+        """Get menu items for the tray icon, rebuilding them only if the snapshot changed"""
+        version = self._snapshot_version()
+        if self._menu_items is None or version != self._menu_version:
+            self._menu_items = tuple(self._build_menu_items())
+            self._menu_version = version
+        return self._menu_items
+    
+    def _build_menu_items(self):
         """Generate menu items for the tray icon"""
         menu_items = []
         
-        # Quick volume controls for common apps
+        # Quick volume controls for common apps, from the last session snapshot
         if self.audio_controller:
-            apps = self.audio_controller.get_available_apps()
+            apps = self.audio_controller.get_session_names()
             if apps:
                 menu_items.append(pystray.MenuItem("Quick Controls", None, enabled=False))
                 
@@ -75,65 +155,130 @@ class TrayInterface:
                 menu_items.append(pystray.MenuItem("Hotkeys: Active ✓", self.toggle_hotkeys))
             else:
                 menu_items.append(pystray.MenuItem("Hotkeys: Inactive ✗", self.toggle_hotkeys))
+            
+            # Shown once the watchdog has had to bring the keyboard hook back
+            watchdog = getattr(self.hotkey_manager, 'watchdog', None)
+            if watchdog and watchdog.restart_count:
+                menu_items.append(pystray.MenuItem(
+                    f"Hook restarts: {watchdog.restart_count} (last: {watchdog.last_failure})", None, enabled=False
+                ))
         
         menu_items.extend([
             pystray.MenuItem("", None),  # Separator
+            pystray.MenuItem("Debug Logging", self.toggle_debug_logging, checked=lambda _: is_debug_logging()),
+        ])
+        if self.sampling_profiler:
+            menu_items.append(pystray.MenuItem(
+                "Profiling", self.toggle_profiling, checked=lambda _: self.sampling_profiler.running
+            ))
+        if self.memory_diagnostics:
+            menu_items.append(pystray.MenuItem("Dump Memory Report", self.dump_memory_report))
+        menu_items.extend([
             pystray.MenuItem("About", self.show_about),
             pystray.MenuItem("Exit", self.quit_app)
         ])
         
         return menu_items
     
+    def _submit(self, func, *args, key=None):
+        """Run a tray action on the shared worker pool so the tray loop never blocks"""
+        try:
+            future = self.task_pool.submit(func, *args, key=key)
+            future.add_done_callback(self._on_task_done)
+            return future
+        except RuntimeError as e:
+            # Pool already shut down while the app is exiting
+            logger.debug(f"Tray action dropped: {e}")
+            return None
+    
+    def _on_task_done(self, future):
+        """Push results of finished tray actions back into the menu"""
+        self.update_menu()
+    
     def quick_volume_up(self, app_name):
         """Quick volume up for an app"""
-        if self.audio_controller:
-            success = self.audio_controller.increase_app_volume(app_name, 0.1)
-            logger.info(f"Volume up for {app_name}: {'Success' if success else 'Failed'}")
+        return self._submit(self._volume_up, app_name, key=(app_name, 'volume_up'))
     
     def quick_volume_down(self, app_name):
         """Quick volume down for an app"""
-        if self.audio_controller:
-            success = self.audio_controller.decrease_app_volume(app_name, 0.1)
-            logger.info(f"Volume down for {app_name}: {'Success' if success else 'Failed'}")
+        return self._submit(self._volume_down, app_name, key=(app_name, 'volume_down'))
     
     def quick_mute_toggle(self, app_name):
         """Toggle mute for an app"""
+        return self._submit(self._mute_toggle, app_name, key=(app_name, 'toggle_mute'))
+    
+    def _volume_up(self, app_name):
+        if self.audio_controller:
+            self.audio_controller.cancel_ramp(app_name)
+            success = self.audio_controller.increase_app_volume(app_name, 0.1)
+            logger.debug(f"Volume up for {app_name}: {'Success' if success else 'Failed'}")
+            return success
+    
+    def _volume_down(self, app_name):
+        if self.audio_controller:
+            self.audio_controller.cancel_ramp(app_name)
+            success = self.audio_controller.decrease_app_volume(app_name, 0.1)
+            logger.debug(f"Volume down for {app_name}: {'Success' if success else 'Failed'}")
+            return success
+    
+    def _mute_toggle(self, app_name):
         if self.audio_controller:
             is_muted = self.audio_controller.is_app_muted(app_name)
             if is_muted is not None:
                 success = self.audio_controller.mute_app(app_name, not is_muted)
-                logger.info(f"Toggle mute for {app_name}: {'Success' if success else 'Failed'}")
+                logger.debug(f"Toggle mute for {app_name}: {'Success' if success else 'Failed'}")
+                return success
+        return False
     
     def refresh_apps(self, icon=None, item=None):
         """Refresh the list of available applications"""
+        return self._submit(self._refresh_apps, key='refresh_apps')
+    
+    def _refresh_apps(self):
         if self.audio_controller:
             self.audio_controller.refresh_sessions()
-            # Update the menu
-            self.update_menu()
             logger.info("Refreshed application list")
     
     def open_config(self, icon=None, item=None):
         """Open the configuration window"""
-        try:
-            if self.config_callback:
-                # Run config in a separate thread to avoid blocking the tray
-                config_thread = threading.Thread(target=self.config_callback, daemon=True)
-                config_thread.start()
-            else:
-                logger.info("Configuration window requested but no callback provided")
-        except Exception as e:
-            logger.error(f"Error opening configuration: {e}")
+        if self.config_callback:
+            return self._submit(self.config_callback, key='open_config')
+        logger.info("Configuration window requested but no callback provided")
     
     def toggle_hotkeys(self, icon=None, item=None):
         """Toggle hotkey listening on/off"""
+        return self._submit(self._toggle_hotkeys, key='toggle_hotkeys')
+    
+    def _toggle_hotkeys(self):
         if self.hotkey_manager:
             if self.hotkey_manager.is_running:
                 self.hotkey_manager.stop_hotkey_listener()
             else:
                 self.hotkey_manager.start_hotkey_listener()
-            
-            # Update the menu
-            self.update_menu()
+    
+    def toggle_debug_logging(self, icon=None, item=None):
+        """Switch the log level between DEBUG and INFO"""
+        set_log_level(logging.INFO if is_debug_logging() else logging.DEBUG)
+        self.update_menu(force=True)
+    
+    def toggle_profiling(self, icon=None, item=None):
+        """Start the sampling profiler, or stop it and write the profile"""
+        return self._submit(self._toggle_profiling, key='toggle_profiling')
+    
+    def _toggle_profiling(self):
+        if self.sampling_profiler.running:
+            self.sampling_profiler.stop()
+        else:
+            self.sampling_profiler.start()
+        self.update_menu(force=True)
+    
+    def dump_memory_report(self, icon=None, item=None):
+        """Write a memory report now instead of waiting for the next periodic one"""
+        return self._submit(self._dump_memory_report, key='dump_memory_report')
+    
+    def _dump_memory_report(self):
+        summary = self.memory_diagnostics.dump('tray')
+        logger.info(f"Memory {summary}, written to {self.memory_diagnostics.report_file}")
     
     def show_about(self, icon=None, item=None):
         """Show about information"""
@@ -145,13 +290,34 @@ class TrayInterface:
         logger.info("Quitting application...")
         self.stop()
     
-    def update_menu(self):
-        """Update the tray menu"""
-        if self.icon:
-            menu_items = self.get_menu_items()
-            self.icon.menu = pystray.Menu(*menu_items)
+    def _on_audio_changed(self, event, app_name, data):
+        """Handle audio controller change notifications"""
+        if event == 'sessions':
+            self.update_menu()
+        elif event == 'volume':
+            self._on_volume_touched(app_name, volume=data)
+        elif event == 'mute':
+            self._on_volume_touched(app_name, muted=data)
+    
+    def _on_hotkeys_changed(self, event):
+        """Handle hotkey manager state notifications"""
+        self.update_menu()
+    
+    def update_menu(self, force=False):
+        """Update the tray menu if its snapshot changed (or always, for check marks)"""
+        if self.icon and (force or self._snapshot_version() != self._menu_version):
             self.icon.update_menu()
     
+    def prepare(self):
+        """Render the initial icon ahead of start(), safe to call from a worker thread"""
+        render_icon(*self._icon_state)
+    
+    def _on_icon_ready(self, icon):
+        """pystray setup callback, runs once the icon loop is up"""
+        icon.visible = True
+        if not self.ready.done():
+            self.ready.set_result(True)
+    
     def start(self):
         """Start the system tray interface"""
         try:
@@ -160,11 +326,10 @@ class TrayInterface:
                 return
             
             # Create the icon image
-            icon_image = self.create_icon_image()
+            icon_image = render_icon(*self._icon_state)
             
-            # Create menu items
-            menu_items = self.get_menu_items()
-            menu = pystray.Menu(*menu_items)
+            # Dynamic menu, pystray asks for the (cached) items whenever it needs them
+            menu = pystray.Menu(self.get_menu_items)
             
             # Create the system tray icon
             self.icon = pystray.Icon(
@@ -178,7 +343,7 @@ class TrayInterface:
             logger.info("Starting system tray interface...")
             
             # This will block until the icon is stopped
-            self.icon.run()
+            self.icon.run(setup=self._on_icon_ready)
             
         except Exception as e:
             logger.error(f"Error starting tray interface: {e}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Headless Memory Benchmark
+Starts HotVolume in tray mode and in headless mode and compares resident memory after startup
+
+    python benchmarks/bench_headless_memory.py
+    python benchmarks/bench_headless_memory.py --runs 5
+
+Windows only, like the app. Quit a running HotVolume first, a second launch would
+hand its arguments to it instead of starting.
+"""
+
+import argparse
+import os
+import queue
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+LAUNCHER = Path(__file__).resolve().parent.parent / 'run_hotvolume.py'
+
+# Logged by HotVolumeApp.log_memory_usage() once startup is done
+MEMORY_LINE = re.compile(r"Resident memory after startup \((\w+) mode\): ([\d.]+) MB")
+
+MODES = {'tray': [], 'headless': ['--headless']}
+
+def measure(mode: str, timeout: float) -> Optional[float]:
+    """Start one instance, return its resident memory after startup in MB (None if it never logged it)"""
+    process = subprocess.Popen(
+        [sys.executable, str(LAUNCHER)] + MODES[mode],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace'
+    )
+    lines: queue.Queue = queue.Queue()
+    
+    def read():
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+    threading.Thread(target=read, daemon=True).start()
+    
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"  {mode}: no memory line within {timeout:.0f}s")
+                return None
+            try:
+                line = lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                print(f"  {mode}: exited with {process.wait()} before startup finished "
+                      f"(is HotVolume already running?)")
+                return None
+            match = MEMORY_LINE.search(line)
+            if match:
+                return float(match.group(2))
+    finally:
+        # Memory is read, the instance can go (the tray icon may linger until hovered)
+        process.kill()
+        process.wait()
+
+def main(argv=None) -> int:
+    """Main entry point, returns 1 if a mode could not be measured"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help="launches per mode, the median is reported")
+    parser.add_argument('--timeout', type=float, default=60.0, help="seconds to wait for each startup")
+    args = parser.parse_args(argv)
+    
+    if os.name != 'nt':
+        print("HotVolume only runs on Windows, there is nothing to measure here")
+        return 2
+    
+    medians = {}
+    for mode in MODES:
+        samples = []
+        for _ in range(args.runs):
+            rss = measure(mode, args.timeout)
+            if rss is None:
+                return 1
+            samples.append(rss)
+        medians[mode] = statistics.median(samples)
+        print(f"{mode:<10} {medians[mode]:8.1f} MB   (runs: {', '.join(f'{rss:.1f}' for rss in samples)})")
+    
+    saved = medians['tray'] - medians['headless']
+    print(f"headless saves {saved:.1f} MB ({saved / medians['tray'] * 100:.0f}% of tray mode)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Hot Path Benchmarks
+Session refresh, hotkey action dispatch and process detection at 10, 100 and 1000 sessions/processes
+
+    python benchmarks/bench_hot_paths.py                 # run, compare with the saved baseline
+    python benchmarks/bench_hot_paths.py --save          # ... and make this run the new baseline
+    python benchmarks/bench_hot_paths.py -k refresh --sizes 1000
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from stubs import FakePsutil, app_name, install_keyboard_stub, install_psutil_stub, make_audio_backend
+from harness import DEFAULT_BASELINE, DEFAULT_THRESHOLD, compare, format_result, load_baseline, measure, save_baseline
+
+install_keyboard_stub()
+install_psutil_stub()
+
+import app_detector
+from app_detector import AppDetector
+from audio_controller import AudioController
+from hotkey_manager import HotkeyManager
+from proc_scanner import ProcScanner
+from bench_process_scan import build_fake_proc
+
+DEFAULT_SIZES = [10, 100, 1000]
+
+def bench_refresh_sessions(size: int):
+    """AudioController.refresh_sessions with size apps playing"""
+    audio = AudioController(session_source=make_audio_backend(size), auto_refresh=False)
+    return audio.refresh_sessions
+
+def bench_execute_hotkey_action(size: int):
+    """HotkeyManager._execute_hotkey_action over size mappings for size apps"""
+    audio = AudioController(session_source=make_audio_backend(size))
+    hotkeys = HotkeyManager(audio, load_config=False)
+    # Set directly, add_hotkey_mapping would save the configuration file
+    hotkeys.app_mappings = {
+        f"ctrl+alt+{index}": {'app': app_name(index), 'action': ('increase', 'decrease')[index % 2], 'step': 0.01}
+        for index in range(size)
+    }
+    mappings = list(hotkeys.app_mappings.values())
+    position = [0]
+    
+    def press():
+        mapping = mappings[position[0] % len(mappings)]
+        position[0] += 1
+        hotkeys._execute_hotkey_action(mapping)
+    return press
+
+def _psutil_detector(size: int) -> AppDetector:
+    app_detector.psutil = FakePsutil(size)
+    return AppDetector(backend='psutil')
+
+def bench_get_running_processes(size: int):
+    """AppDetector.get_running_processes with size processes"""
+    return _psutil_detector(size).get_running_processes
+
+def bench_get_audio_capable_apps(size: int):
+    """AppDetector.get_audio_capable_apps with size processes"""
+    return _psutil_detector(size).get_audio_capable_apps
+
+def bench_procfs_scan(size: int):
+    """ProcScanner.scan over a synthetic /proc with size processes (see bench_process_scan.py)"""
+    root = Path(tempfile.mkdtemp(prefix='hotvolume-proc-'))
+    build_fake_proc(root, size)
+    return ProcScanner(str(root)).scan, lambda: shutil.rmtree(root, ignore_errors=True)
+
+BENCHMARKS = {
+    'refresh_sessions': bench_refresh_sessions,
+    'execute_hotkey_action': bench_execute_hotkey_action,
+    'get_running_processes': bench_get_running_processes,
+    'get_audio_capable_apps': bench_get_audio_capable_apps,
+    'procfs_scan': bench_procfs_scan,
+}
+
+def run(names, sizes, min_time: float):
+    """Run the selected benchmarks at each size, returns {"name[size]": stats}"""
+    results = {}
+    for name in names:
+        for size in sizes:
+            setup = BENCHMARKS[name](size)
+            func, cleanup = setup if isinstance(setup, tuple) else (setup, None)
+            try:
+                result = measure(func, min_time=min_time)
+            finally:
+                if cleanup:
+                    cleanup()
+            key = f"{name}[{size}]"
+            results[key] = result
+            print(format_result(key, result))
+    return results
+
+def main(argv=None) -> int:
+    """Main entry point, returns 1 if --fail-on-regression is set and something regressed"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('-k', dest='keyword', default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument('--min-time', type=float, default=0.5, help="seconds to spend on each benchmark")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="median slowdown in percent that counts as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+    
+    # Hot paths log at debug level, warnings about the synthetic apps are noise here
+    logging.basicConfig(level=logging.ERROR)
+    
+    names = [name for name in BENCHMARKS if not args.keyword or args.keyword in name]
+    if os.name == 'nt' and 'procfs_scan' in names:
+        # The synthetic /proc tree needs symlinks and the scanner is Linux only
+        names.remove('procfs_scan')
+    if not names:
+        print(f"No benchmark matches {args.keyword!r}, available: {', '.join(BENCHMARKS)}")
+        return 2
+    
+    results = run(names, args.sizes, args.min_time)
+    
+    regressions = []
+    baseline = load_baseline(args.baseline)
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+    else:
+        print(f"\nNo baseline at {args.baseline}, run with --save to create one")
+    
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+    
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
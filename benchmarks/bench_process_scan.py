@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Process Scan Benchmark
+Compares the procfs scanner backend with the psutil path on a synthetic /proc tree
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from proc_scanner import ProcScanner
+
+def build_fake_proc(root: Path, count: int):
+    """Create a synthetic procfs with count processes"""
+    root.mkdir(parents=True, exist_ok=True)
+    (root / 'stat').write_text("cpu  0 0 0 0 0 0 0 0 0 0\nbtime 1700000000\n")
+    (root / 'uptime').write_text("1000.00 1000.00\n")
+    bin_dir = root / '_bin'
+    bin_dir.mkdir(exist_ok=True)
+    
+    for pid in range(1, count + 1):
+        name = f"app{pid % 97}.exe"
+        exe = bin_dir / name
+        if not exe.exists():
+            exe.write_text('')
+        
+        pid_dir = root / str(pid)
+        pid_dir.mkdir()
+        ppid = 0 if pid == 1 else max(1, pid // 4)
+        # 52 fields like a real stat line; psutil reads ppid and starttime from it
+        fields = ['S', str(ppid)] + ['0'] * 19 + ['100'] + ['0'] * 28
+        (pid_dir / 'stat').write_text(f"{pid} ({name}) {' '.join(fields)}\n")
+        (pid_dir / 'comm').write_text(name + "\n")
+        os.symlink(exe, pid_dir / 'exe')
+    
+    # Self link so the scanner considers the tree usable
+    os.symlink('1', root / 'self')
+
+def time_call(func, repeat: int):
+    """Run func repeat times and return per-call durations in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+def psutil_scan():
+    """The psutil path used by AppDetector"""
+    import psutil
+    processes = []
+    for process in psutil.process_iter(['pid', 'name', 'exe', 'ppid']):
+        try:
+            processes.append(process.info)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return processes
+
+def run(sizes, repeat: int):
+    """Benchmark both backends for each process count"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+        print("psutil is not installed, only the procfs backend will be measured")
+    
+    results = []
+    for size in sizes:
+        tmp_dir = Path(tempfile.mkdtemp(prefix='hotvolume-proc-'))
+        try:
+            build_fake_proc(tmp_dir, size)
+            scanner = ProcScanner(str(tmp_dir))
+            assert len(scanner.scan()) == size
+            
+            backends = [('proc', scanner.scan)]
+            if psutil is not None:
+                psutil.PROCFS_PATH = str(tmp_dir)
+                backends.append(('psutil', psutil_scan))
+            
+            for backend, func in backends:
+                durations = time_call(func, repeat)
+                result = {
+                    'backend': backend,
+                    'processes': size,
+                    'median_ms': statistics.median(durations),
+                    'min_ms': min(durations)
+                }
+                results.append(result)
+                print(f"{backend:>7} {size:>6} processes: median {result['median_ms']:8.2f} ms  min {result['min_ms']:8.2f} ms")
+        finally:
+            if psutil is not None:
+                psutil.PROCFS_PATH = '/proc'
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    return results
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 5000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    
+    run(args.sizes, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark Harness
+Timing, percentile statistics and JSON baselines shared by the benchmarks
+"""
+
+import json
+import platform
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Where baselines are kept unless --baseline says otherwise (ignored by git, numbers are per machine)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'results' / 'baseline.json'
+
+# Slowdown of the median latency, in percent, reported as a regression
+DEFAULT_THRESHOLD = 10.0
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    index = min(len(sorted_samples) - 1, max(0, int(round(q / 100 * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[index]
+
+def measure(func: Callable, min_time: float = 0.5, min_runs: int = 5, max_runs: int = 100000) -> Dict:
+    """Call func repeatedly for at least min_time seconds and summarize the call durations"""
+    # One untimed call so caches and lazy imports don't count against the first sample
+    func()
+    
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_runs:
+        call_started = time.perf_counter()
+        func()
+        now = time.perf_counter()
+        samples.append(now - call_started)
+        if len(samples) >= min_runs and now - started >= min_time:
+            break
+    
+    samples.sort()
+    total = sum(samples)
+    return {
+        'runs': len(samples),
+        'ops_per_sec': len(samples) / total if total else float('inf'),
+        'mean_us': total / len(samples) * 1e6,
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p90_us': percentile(samples, 90) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+        'max_us': samples[-1] * 1e6,
+    }
+
+def format_result(name: str, result: Dict) -> str:
+    return (f"{name:<36} {result['ops_per_sec']:>12,.0f} ops/s   p50 {result['p50_us']:>10,.1f} us"
+            f"   p90 {result['p90_us']:>10,.1f} us   p99 {result['p99_us']:>10,.1f} us")
+
+def save_baseline(path: Path, results: Dict[str, Dict]):
+    """Write results with enough context to tell runs on different machines apart"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True))
+
+def load_baseline(path: Path) -> Optional[Dict]:
+    """Load a saved baseline, None if there is none"""
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+def compare(baseline: Dict, results: Dict[str, Dict], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Print each benchmark's change against the baseline, returns the names that regressed"""
+    print(f"\nCompared with baseline from {baseline.get('created', '?')} (Python {baseline.get('python', '?')}):")
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            print(f"{name:<36} new")
+            continue
+        change = (result['p50_us'] - previous['p50_us']) / previous['p50_us'] * 100 if previous['p50_us'] else 0.0
+        ops_change = (result['ops_per_sec'] - previous['ops_per_sec']) / previous['ops_per_sec'] * 100
+        marker = ''
+        if change > threshold:
+            marker = '  REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            marker = '  improved'
+        print(f"{name:<36} p50 {change:+7.1f}%   ops/s {ops_change:+7.1f}%{marker}")
+    return regressions
@@ -0,0 +1,76 @@
+"""
+Benchmark Stubs
+Stand-ins for the keyboard, psutil and pycaw layers so the hot paths run on any OS
+"""
+
+import sys
+import types
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# Names that make up the synthetic workloads, a mix of audio apps and background noise
+APP_NAMES = ['Spotify.exe', 'chrome.exe', 'discord.exe', 'vlc.exe', 'svchost.exe', 'explorer.exe',
+             'steam.exe', 'code.exe', 'zoom.exe', 'notepad.exe']
+
+def app_name(index: int) -> str:
+    """Unique, realistic-looking process name for the index-th synthetic app"""
+    base = APP_NAMES[index % len(APP_NAMES)]
+    if index < len(APP_NAMES):
+        return base
+    stem, _, ext = base.rpartition('.')
+    return f"{stem}{index // len(APP_NAMES)}.{ext}"
+
+def install_keyboard_stub():
+    """Replace the keyboard module, the real one hooks the OS (and needs root on Linux)"""
+    keyboard = types.ModuleType('keyboard')
+    keyboard.add_hotkey = lambda hotkey, callback, suppress=False: hotkey
+    keyboard.remove_hotkey = lambda hotkey: None
+    keyboard.unhook_all_hotkeys = lambda: None
+    keyboard.hook = lambda callback: callback
+    keyboard.unhook = lambda callback: None
+    keyboard.parse_hotkey = lambda hotkey: hotkey
+    keyboard.wait = lambda: None
+    sys.modules['keyboard'] = keyboard
+    return keyboard
+
+def install_psutil_stub():
+    """Provide a psutil module if it is not installed, AppDetector imports it at load time"""
+    try:
+        import psutil  # noqa: F401
+    except ImportError:
+        sys.modules['psutil'] = FakePsutil(0)
+
+class FakeProcess:
+    """What psutil.process_iter yields, with the attributes AppDetector reads"""
+    def __init__(self, pid: int, name: str, ppid: int):
+        self.pid = pid
+        self.info = {'pid': pid, 'name': name, 'exe': f"C:\\Program Files\\{name}", 'ppid': ppid}
+
+class FakePsutil:
+    """Module-like psutil replacement listing a fixed set of processes"""
+    class NoSuchProcess(Exception):
+        pass
+    
+    class AccessDenied(Exception):
+        pass
+    
+    def __init__(self, count: int):
+        # Every fourth process is a child of an earlier one, like browser helpers
+        self.processes = [
+            FakeProcess(1000 + index, app_name(index), 1000 + index // 4 if index % 4 else 1)
+            for index in range(count)
+        ]
+    
+    def process_iter(self, attrs=None):
+        return iter(self.processes)
+
+def make_audio_backend(sessions: int):
+    """Simulated audio sessions standing in for pycaw"""
+    from simulated_audio import SimulatedAudioBackend
+    backend = SimulatedAudioBackend()
+    for index in range(sessions):
+        backend.add_app(app_name(index), volume=0.5)
+    return backend
@@ -12,6 +12,17 @@ from pathlib import Path
 backend_dir = Path(__file__).parent / 'backend'
 sys.path.insert(0, str(backend_dir))
 
+# `run_hotvolume.py ctl ...` talks to the running instance without starting another one
+if len(sys.argv) > 1 and sys.argv[1] == 'ctl':
+    from ctl import main as ctl_main
+    sys.exit(ctl_main(sys.argv[2:]))
+
+# A second launch hands its arguments to the running instance and exits before any heavy imports
+from single_instance import ensure_single_instance
+exit_code = ensure_single_instance(sys.argv[1:])
+if exit_code is not None:
+    sys.exit(exit_code)
+
 try:
     from server import main
     main()
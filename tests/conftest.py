@@ -0,0 +1,11 @@
+"""
+Test Configuration
+Makes the backend modules importable, as run_hotvolume.py does
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
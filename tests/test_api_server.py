@@ -0,0 +1,223 @@
+"""
+API Server Tests
+REST endpoints, batches, the WebSocket snapshot and deltas, and origin checks against simulated audio
+"""
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+pytest.importorskip('aiohttp')
+from aiohttp.test_utils import TestClient, TestServer
+
+from api_server import ApiServer
+from audio_controller import AudioController
+from hotkey_manager import HotkeyManager
+from simulated_audio import SimulatedAudioBackend
+
+TOKEN = 'test-token'
+AUTH = {'Authorization': f'Bearer {TOKEN}'}
+FRONTEND = 'http://localhost:3000'
+
+@pytest.fixture
+def backend():
+    return SimulatedAudioBackend({'Spotify.exe': 0.5, 'chrome.exe': 1.0})
+
+@pytest.fixture
+def server(backend, tmp_path):
+    audio_controller = AudioController(session_source=backend)
+    audio_controller.start_session_notifications()
+    hotkey_manager = HotkeyManager(audio_controller, load_config=False)
+    hotkey_manager.config_file = tmp_path / 'hotkey_config.json'
+    server = ApiServer(audio_controller, hotkey_manager, cors_origins=[FRONTEND],
+                       token=TOKEN, token_path=str(tmp_path / 'token'))
+    yield server
+    audio_controller.stop_session_notifications()
+    server.executor.shutdown(wait=True)
+
+def run(server, scenario):
+    """Run scenario(client) against the server's app on a fresh event loop"""
+    async def main():
+        async with TestClient(TestServer(server.create_app())) as client:
+            await scenario(client)
+    asyncio.run(main())
+
+async def receive(ws):
+    return await ws.receive_json(timeout=2)
+
+def test_list_and_get_sessions(server):
+    async def scenario(client):
+        response = await client.get('/api/sessions')
+        assert response.status == 200
+        body = await response.json()
+        assert [session['app'] for session in body['sessions']] == ['Spotify.exe', 'chrome.exe']
+        assert body['sessions'][0]['volume'] == 0.5
+        
+        response = await client.get('/api/sessions/chrome.exe')
+        assert await response.json() == {'app': 'chrome.exe', 'volume': 1.0, 'muted': False}
+        
+        response = await client.get('/api/sessions/missing.exe')
+        assert response.status == 404
+    run(server, scenario)
+
+def test_set_volume_and_mute(server, backend):
+    async def scenario(client):
+        response = await client.put('/api/sessions/Spotify.exe/volume', json={'volume': 0.25}, headers=AUTH)
+        assert response.status == 200
+        response = await client.put('/api/sessions/Spotify.exe/volume', json={'delta': -0.05}, headers=AUTH)
+        assert (await response.json())['volume'] == pytest.approx(0.2)
+        response = await client.put('/api/sessions/Spotify.exe/mute', json={'toggle': True}, headers=AUTH)
+        assert await response.json() == {'app': 'Spotify.exe', 'muted': True}
+        response = await client.put('/api/sessions/Spotify.exe/volume', json={'volume': 'loud'}, headers=AUTH)
+        assert response.status == 400
+    run(server, scenario)
+    
+    volume = backend.get_all_sessions()[0].SimpleAudioVolume
+    assert volume.volume == pytest.approx(0.2)
+    assert volume.muted
+
+def test_batch_reports_each_operation(server):
+    async def scenario(client):
+        operations = [
+            {'op': 'volume', 'app': 'chrome.exe', 'volume': 0.4},
+            {'op': 'mute', 'app': 'missing.exe', 'muted': True},
+            {'op': 'get', 'app': 'chrome.exe'},
+        ]
+        response = await client.post('/api/batch', json={'operations': operations}, headers=AUTH)
+        results = (await response.json())['results']
+        assert [result['ok'] for result in results] == [True, False, True]
+        assert results[1]['status'] == 404
+        assert results[2]['volume'] == 0.4
+        
+        response = await client.post('/api/batch', json={'operations': 'all'}, headers=AUTH)
+        assert response.status == 400
+    run(server, scenario)
+
+def test_hotkey_routes(server, monkeypatch):
+    # Only hotkey parsing is needed, the real keyboard module would hook the OS
+    keyboard = types.SimpleNamespace(parse_hotkey=lambda hotkey: hotkey)
+    monkeypatch.setitem(sys.modules, 'keyboard', keyboard)
+    
+    async def scenario(client):
+        mapping = {'hotkey': 'ctrl+alt+s', 'app': 'Spotify.exe', 'action': 'increase'}
+        response = await client.post('/api/hotkeys', json=mapping, headers=AUTH)
+        assert response.status == 201
+        response = await client.get('/api/hotkeys')
+        assert (await response.json())['mappings']['ctrl+alt+s']['app'] == 'Spotify.exe'
+        response = await client.delete('/api/hotkeys/ctrl+alt+s', headers=AUTH)
+        assert response.status == 200
+        response = await client.delete('/api/hotkeys/ctrl+alt+s', headers=AUTH)
+        assert response.status == 404
+    run(server, scenario)
+
+def test_hotkey_mapping_is_validated(server, monkeypatch):
+    keyboard = types.SimpleNamespace(parse_hotkey=lambda hotkey: hotkey)
+    monkeypatch.setitem(sys.modules, 'keyboard', keyboard)
+    valid = {'hotkey': 'ctrl+alt+s', 'app': 'Spotify.exe', 'action': 'increase', 'step': 0.05}
+    
+    async def scenario(client):
+        for invalid in ({'action': 'explode'}, {'app': 42}, {'app': ''}, {'hotkey': ['ctrl']},
+                        {'step': 0}, {'step': -0.1}, {'step': 'fast'}, {'step': True}, {'step': 1e400}):
+            response = await client.post('/api/hotkeys', json=dict(valid, **invalid), headers=AUTH)
+            assert response.status == 400, invalid
+        response = await client.post('/api/hotkeys', json={'hotkey': 'ctrl+alt+s'}, headers=AUTH)
+        assert response.status == 400
+        assert server.hotkey_manager.app_mappings == {}
+        
+        response = await client.post('/api/hotkeys', json=valid, headers=AUTH)
+        assert response.status == 201
+    run(server, scenario)
+
+def test_adding_a_mapped_hotkey_replaces_it(server, monkeypatch):
+    hooks = {}
+    keyboard = types.SimpleNamespace(
+        parse_hotkey=lambda hotkey: hotkey,
+        add_hotkey=lambda hotkey, callback, suppress: hooks.setdefault(hotkey, []).append(callback),
+        remove_hotkey=lambda hotkey: hooks.pop(hotkey),
+    )
+    monkeypatch.setitem(sys.modules, 'keyboard', keyboard)
+    server.hotkey_manager.is_running = True
+    
+    async def scenario(client):
+        mapping = {'hotkey': 'ctrl+alt+s', 'app': 'Spotify.exe', 'action': 'increase'}
+        response = await client.post('/api/hotkeys', json=mapping, headers=AUTH)
+        assert response.status == 201
+        response = await client.post('/api/hotkeys', json=dict(mapping, action='toggle_mute'), headers=AUTH)
+        assert response.status == 200
+        # One hook left, so a press runs only the new action
+        assert len(hooks['ctrl+alt+s']) == 1
+        assert server.hotkey_manager.app_mappings['ctrl+alt+s']['action'] == 'toggle_mute'
+    run(server, scenario)
+
+def test_changes_need_the_token(server):
+    async def scenario(client):
+        response = await client.put('/api/sessions/Spotify.exe/volume', json={'volume': 0.1})
+        assert response.status == 401
+        response = await client.put('/api/sessions/Spotify.exe/volume', json={'volume': 0.1},
+                                    headers={'Authorization': 'Bearer wrong'})
+        assert response.status == 401
+        response = await client.get('/api/ws')
+        assert response.status == 401
+        # Reads stay open
+        response = await client.get('/api/sessions')
+        assert response.status == 200
+    run(server, scenario)
+
+def test_body_must_be_json(server):
+    async def scenario(client):
+        headers = dict(AUTH, **{'Content-Type': 'text/plain'})
+        response = await client.put('/api/sessions/Spotify.exe/volume', data='{"volume": 0.1}', headers=headers)
+        assert response.status == 403
+    run(server, scenario)
+
+def test_cors_allows_only_the_configured_origin(server):
+    async def scenario(client):
+        response = await client.get('/api/sessions', headers={'Origin': FRONTEND})
+        assert response.status == 200
+        assert response.headers['Access-Control-Allow-Origin'] == FRONTEND
+        
+        response = await client.options('/api/batch', headers={'Origin': FRONTEND})
+        assert 'Authorization' in response.headers['Access-Control-Allow-Headers']
+        
+        response = await client.get('/api/sessions', headers={'Origin': 'http://evil.example'})
+        assert response.status == 403
+        assert 'Access-Control-Allow-Origin' not in response.headers
+        
+        response = await client.get(f'/api/ws?token={TOKEN}', headers={'Origin': 'http://evil.example'})
+        assert response.status == 403
+    run(server, scenario)
+
+def test_wildcard_origin_is_ignored(backend, tmp_path):
+    server = ApiServer(AudioController(session_source=backend), cors_origins=['*', FRONTEND],
+                       token_path=str(tmp_path / 'token'))
+    assert server.cors_origins == [FRONTEND]
+    server.executor.shutdown()
+
+def test_websocket_snapshot_then_deltas(server, backend):
+    async def scenario(client):
+        ws = await client.ws_connect(f'/api/ws?token={TOKEN}', headers={'Origin': FRONTEND})
+        snapshot = await receive(ws)
+        assert snapshot['type'] == 'snapshot'
+        assert {session['app'] for session in snapshot['sessions']} == {'Spotify.exe', 'chrome.exe'}
+        
+        # Changes made outside HotVolume arrive through the session events
+        backend.set_volume('Spotify.exe', 0.3)
+        assert await receive(ws) == {'type': 'volume', 'app': 'Spotify.exe', 'volume': 0.3}
+        backend.set_mute('chrome.exe', True)
+        assert await receive(ws) == {'type': 'mute', 'app': 'chrome.exe', 'muted': True}
+        
+        backend.add_app('discord.exe', volume=0.8)
+        assert await receive(ws) == {'type': 'session_added', 'app': 'discord.exe', 'volume': 0.8, 'muted': False}
+        backend.remove_app('Spotify.exe')
+        assert await receive(ws) == {'type': 'session_removed', 'app': 'Spotify.exe'}
+        
+        # Operations over the socket answer inline
+        await ws.send_json({'id': 7, 'operations': [{'op': 'volume', 'app': 'discord.exe', 'volume': 0.5}]})
+        messages = [await receive(ws), await receive(ws)]
+        results = next(message for message in messages if message['type'] == 'results')
+        assert results['id'] == 7 and results['results'][0]['ok']
+        assert {'type': 'volume', 'app': 'discord.exe', 'volume': 0.5} in messages
+        await ws.close()
+    run(server, scenario)
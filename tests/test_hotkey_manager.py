@@ -0,0 +1,40 @@
+"""
+Hotkey Manager Tests
+Hotkey actions against simulated audio sessions
+"""
+
+import threading
+
+import pytest
+
+from audio_controller import AudioController
+from hotkey_manager import HotkeyManager
+from simulated_audio import SimulatedAudioBackend
+
+@pytest.fixture
+def hotkey_manager():
+    audio_controller = AudioController(session_source=SimulatedAudioBackend({'Spotify.exe': 0.5}))
+    return HotkeyManager(audio_controller, load_config=False)
+
+def test_volume_keys_step_the_volume(hotkey_manager):
+    mapping = {'app': 'Spotify.exe', 'action': 'increase', 'step': 0.1}
+    hotkey_manager.handle_hotkey_press('ctrl+alt+up', mapping)
+    hotkey_manager.handle_hotkey_press('ctrl+alt+up', mapping)
+    assert hotkey_manager.audio_controller.get_app_volume('Spotify.exe') == pytest.approx(0.7)
+
+def test_volume_key_stops_a_running_ramp(hotkey_manager):
+    audio_controller = hotkey_manager.audio_controller
+    results = []
+    ramp = threading.Thread(target=lambda: results.append(
+        audio_controller.ramp_app_volume('Spotify.exe', 0.0, duration=2.0, interval=0.01)))
+    ramp.start()
+    while audio_controller.get_app_volume('Spotify.exe') == pytest.approx(0.5):
+        pass
+    
+    hotkey_manager.handle_hotkey_press('ctrl+alt+up', {'app': 'Spotify.exe', 'action': 'increase', 'step': 0.3})
+    pressed_volume = audio_controller.get_app_volume('Spotify.exe')
+    ramp.join(timeout=5)
+    
+    assert results == [False]
+    # The ramp's next step did not overwrite the press
+    assert audio_controller.get_app_volume('Spotify.exe') == pytest.approx(pressed_volume)
@@ -0,0 +1,111 @@
+"""
+Hotkey Trace Tests
+Recorder and file format round trips, corrupt files, and replay against simulated audio
+"""
+
+import struct
+
+import pytest
+
+from hotkey_trace import (HEADER, MAGIC, PRESS_RECORD, RECORD_PRESS, Trace, TraceFormatError, TraceRecorder,
+                          replay, simulated_hotkey_manager, synthesize)
+
+MAPPING = {'app': 'Spotify.exe', 'action': 'increase', 'step': 0.05}
+
+def test_recorder_round_trip(tmp_path):
+    path = str(tmp_path / 'presses.hvtrace')
+    recorder = TraceRecorder(path)
+    recorder.record('ctrl+shift+f1', MAPPING)
+    recorder.record('ctrl+shift+f2', dict(MAPPING, action='decrease'))
+    recorder.record('ctrl+shift+f1', MAPPING)
+    assert recorder.close() == 3
+    # Presses after close are dropped
+    recorder.record('ctrl+shift+f1', MAPPING)
+    
+    trace = Trace.load(path)
+    assert trace.mappings == [
+        dict(MAPPING, hotkey='ctrl+shift+f1'),
+        dict(MAPPING, hotkey='ctrl+shift+f2', action='decrease'),
+    ]
+    assert [mapping_id for _, mapping_id in trace.events] == [0, 1, 0]
+    offsets = [offset for offset, _ in trace.events]
+    assert offsets[0] == 0.0 and offsets == sorted(offsets)
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / 'synthetic.hvtrace')
+    trace = Trace()
+    first = trace.add_mapping('ctrl+f1', 'a.exe', 'increase')
+    second = trace.add_mapping('ctrl+f2', 'b.exe', 'toggle_mute', 0.2)
+    trace.events = [(0.0, first), (0.25, second), (1.5, first)]
+    trace.save(path)
+    
+    loaded = Trace.load(path)
+    assert loaded.mappings == trace.mappings
+    assert [mapping_id for _, mapping_id in loaded.events] == [first, second, first]
+    assert [offset for offset, _ in loaded.events] == pytest.approx([0.0, 0.25, 1.5])
+    assert loaded.duration == pytest.approx(1.5)
+
+def test_synthesized_trace_survives_save(tmp_path):
+    path = str(tmp_path / 'storm.hvtrace')
+    trace = synthesize('storm', apps=2, duration=1.0)
+    trace.save(path)
+    loaded = Trace.load(path)
+    assert len(loaded.events) == len(trace.events)
+    assert loaded.duration == pytest.approx(trace.duration, abs=1e-3)
+
+@pytest.mark.parametrize('content', [
+    b'',
+    b'HVTR',
+    b'NOTATRACE',
+    HEADER.pack(MAGIC, 99),
+], ids=['empty', 'short header', 'wrong magic', 'wrong version'])
+def test_load_rejects_non_traces(tmp_path, content):
+    path = tmp_path / 'bad.hvtrace'
+    path.write_bytes(content)
+    with pytest.raises(TraceFormatError):
+        Trace.load(str(path))
+
+def test_load_rejects_truncated_and_corrupt_files(tmp_path):
+    path = tmp_path / 'good.hvtrace'
+    trace = Trace()
+    trace.events = [(0.0, trace.add_mapping('ctrl+f1', 'a.exe', 'increase')), (0.1, 0)]
+    trace.save(str(path))
+    data = path.read_bytes()
+    
+    truncated = tmp_path / 'truncated.hvtrace'
+    truncated.write_bytes(data[:-3])
+    with pytest.raises(TraceFormatError, match="truncated or corrupt"):
+        Trace.load(str(truncated))
+    
+    unknown_record = tmp_path / 'unknown.hvtrace'
+    unknown_record.write_bytes(data + b'\x07')
+    with pytest.raises(TraceFormatError, match="unknown record type"):
+        Trace.load(str(unknown_record))
+    
+    undefined_mapping = tmp_path / 'undefined.hvtrace'
+    undefined_mapping.write_bytes(HEADER.pack(MAGIC, 1) + bytes([RECORD_PRESS]) + PRESS_RECORD.pack(0, 5))
+    with pytest.raises(TraceFormatError, match="undefined mapping"):
+        Trace.load(str(undefined_mapping))
+    
+    bad_json = tmp_path / 'json.hvtrace'
+    bad_json.write_bytes(HEADER.pack(MAGIC, 1) + bytes([0]) + struct.pack('<HH', 0, 3) + b'{x}')
+    with pytest.raises(TraceFormatError):
+        Trace.load(str(bad_json))
+
+def test_replay_at_max_speed_changes_volumes():
+    trace = Trace()
+    up = trace.add_mapping('ctrl+f1', 'Spotify.exe', 'increase', 0.1)
+    mute = trace.add_mapping('ctrl+f2', 'chrome.exe', 'toggle_mute')
+    trace.events = [(0.0, up), (5.0, up), (10.0, mute)]
+    hotkey_manager = simulated_hotkey_manager(trace)
+    
+    result = replay(trace, hotkey_manager, speed=0)
+    
+    assert result['presses'] == 3
+    assert result['speed'] == 'max'
+    # Recorded gaps are skipped at max speed
+    assert result['seconds'] < 5.0
+    audio_controller = hotkey_manager.audio_controller
+    assert audio_controller.get_app_volume('Spotify.exe') == pytest.approx(0.7)
+    assert audio_controller.is_app_muted('chrome.exe')
+    assert hotkey_manager.press_count.value('ctrl+f1') == 2
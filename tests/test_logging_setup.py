@@ -0,0 +1,67 @@
+"""
+Logging Setup Tests
+Rate limiting of repeated log messages
+"""
+
+import logging
+
+import pytest
+
+import logging_setup
+from logging_setup import RateLimiter, log_rate_limited
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(logging_setup.time, 'monotonic', clock)
+    return clock
+
+def test_allows_one_event_per_interval(clock):
+    limiter = RateLimiter(interval=60)
+    assert limiter.allow('refresh')
+    assert not limiter.allow('refresh')
+    assert not limiter.allow('refresh')
+    # Keys are limited independently
+    assert limiter.allow('scan')
+    
+    clock.now += 59
+    assert not limiter.allow('refresh')
+    clock.now += 1
+    assert limiter.allow('refresh')
+
+def test_counts_suppressed_events(clock):
+    limiter = RateLimiter(interval=60)
+    limiter.allow('refresh')
+    limiter.allow('refresh')
+    limiter.allow('refresh')
+    assert limiter.pop_suppressed('refresh') == 2
+    assert limiter.pop_suppressed('refresh') == 0
+    assert limiter.pop_suppressed('unknown') == 0
+
+def test_reset_reports_the_next_event(clock):
+    limiter = RateLimiter(interval=60)
+    limiter.allow('refresh')
+    limiter.allow('refresh')
+    limiter.reset('refresh')
+    assert limiter.allow('refresh')
+    assert limiter.pop_suppressed('refresh') == 0
+
+def test_log_rate_limited_mentions_suppressed_messages(clock, caplog):
+    log = logging.getLogger('hotvolume.test')
+    limiter = RateLimiter(interval=60)
+    with caplog.at_level(logging.DEBUG, logger='hotvolume.test'):
+        for _ in range(3):
+            log_rate_limited(log, limiter, 'refresh', logging.ERROR, "Session refresh failed")
+        clock.now += 60
+        log_rate_limited(log, limiter, 'refresh', logging.ERROR, "Session refresh failed")
+    
+    levels = [record.levelno for record in caplog.records]
+    assert levels == [logging.ERROR, logging.DEBUG, logging.DEBUG, logging.ERROR]
+    assert caplog.records[-1].getMessage() == "Session refresh failed (2 similar messages suppressed)"
@@ -0,0 +1,47 @@
+"""
+Metrics Tests
+Prometheus text rendering of histograms
+"""
+
+from metrics import Histogram
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("hotvolume_test_seconds", "Test latency", labels=('action',), buckets=(1.0, 0.125))
+    for value in (0.0625, 0.5, 4, 0.125):
+        histogram.observe(value, 'increase')
+    histogram.observe(0.25, 'decrease')
+    
+    assert histogram.render() == [
+        '# HELP hotvolume_test_seconds Test latency',
+        '# TYPE hotvolume_test_seconds histogram',
+        'hotvolume_test_seconds_bucket{action="decrease",le="0.125"} 0',
+        'hotvolume_test_seconds_bucket{action="decrease",le="1"} 1',
+        'hotvolume_test_seconds_bucket{action="decrease",le="+Inf"} 1',
+        'hotvolume_test_seconds_sum{action="decrease"} 0.25',
+        'hotvolume_test_seconds_count{action="decrease"} 1',
+        # Bounds are inclusive, 0.125 lands in the le="0.125" bucket
+        'hotvolume_test_seconds_bucket{action="increase",le="0.125"} 2',
+        'hotvolume_test_seconds_bucket{action="increase",le="1"} 3',
+        'hotvolume_test_seconds_bucket{action="increase",le="+Inf"} 4',
+        'hotvolume_test_seconds_sum{action="increase"} 4.6875',
+        'hotvolume_test_seconds_count{action="increase"} 4',
+    ]
+
+def test_unlabelled_histogram_and_quantiles():
+    histogram = Histogram("hotvolume_test_seconds", "Test latency", buckets=(0.01, 0.1))
+    assert histogram.render()[2:] == []
+    assert histogram.quantile(0.5) is None
+    for value in (0.001, 0.002, 0.05, 1.0):
+        histogram.observe(value)
+    
+    assert histogram.render()[2:] == [
+        'hotvolume_test_seconds_bucket{le="0.01"} 2',
+        'hotvolume_test_seconds_bucket{le="0.1"} 3',
+        'hotvolume_test_seconds_bucket{le="+Inf"} 4',
+        'hotvolume_test_seconds_sum 1.053',
+        'hotvolume_test_seconds_count 4',
+    ]
+    assert histogram.count() == 4
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.75) == 0.1
+    assert histogram.quantile(1.0) == float('inf')
@@ -0,0 +1,63 @@
+"""
+Proc Scanner Tests
+Reads a synthetic /proc tree laid out like the kernel's
+"""
+
+import os
+import sys
+
+import pytest
+
+from proc_scanner import ProcScanner
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="procfs layout uses symlinks, Linux only")
+
+def add_process(root, pid, comm, ppid, exe=None):
+    pid_dir = root / str(pid)
+    pid_dir.mkdir()
+    (pid_dir / 'stat').write_bytes(f"{pid} ({comm}) S {ppid} {pid} {pid} 0 -1 4194304 0 0 0 0\n".encode('utf-8'))
+    if exe is not None:
+        os.symlink(exe, pid_dir / 'exe')
+    return pid_dir
+
+@pytest.fixture
+def proc_root(tmp_path):
+    (tmp_path / 'self').mkdir()
+    (tmp_path / 'self' / 'stat').write_text("1 (self) S 0\n")
+    add_process(tmp_path, 1, 'systemd', 0, '/usr/lib/systemd/systemd')
+    # Kernel threads have no readable exe
+    add_process(tmp_path, 2, 'kthreadd', 0)
+    add_process(tmp_path, 100, 'Web Content (x)', 1, '/usr/lib/firefox/firefox')
+    # comm cut off at 15 characters, the exe has the full name
+    add_process(tmp_path, 101, 'gnome-shell-cal', 1, '/usr/libexec/gnome-shell-calendar-server')
+    # Entries that aren't processes are skipped
+    (tmp_path / 'sys').mkdir()
+    (tmp_path / 'version').write_text("Linux\n")
+    return tmp_path
+
+def test_scan_reads_every_process(proc_root):
+    processes = {process['pid']: process for process in ProcScanner(str(proc_root)).scan()}
+    assert sorted(processes) == [1, 2, 100, 101]
+    assert processes[1] == {'pid': 1, 'name': 'systemd', 'exe': '/usr/lib/systemd/systemd', 'ppid': 0}
+    assert processes[2]['exe'] is None
+    assert processes[100]['name'] == 'Web Content (x)'
+    assert processes[100]['ppid'] == 1
+    assert processes[101]['name'] == 'gnome-shell-calendar-server'
+
+def test_read_process(proc_root):
+    scanner = ProcScanner(str(proc_root))
+    assert scanner.read_process(100)['exe'] == '/usr/lib/firefox/firefox'
+    assert scanner.read_process(999) is None
+
+def test_unreadable_entries_are_skipped(proc_root):
+    # Process exited between listing and reading
+    (proc_root / '102').mkdir()
+    corrupt = add_process(proc_root, 103, 'x', 1)
+    (corrupt / 'stat').write_bytes(b"103 no parentheses")
+    pids = [process['pid'] for process in ProcScanner(str(proc_root)).scan()]
+    assert sorted(pids) == [1, 2, 100, 101]
+
+def test_is_available(proc_root, tmp_path_factory):
+    assert ProcScanner.is_available(str(proc_root))
+    assert not ProcScanner.is_available(str(tmp_path_factory.mktemp('empty')))
+    assert ProcScanner(str(proc_root / 'missing')).scan() == []
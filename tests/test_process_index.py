@@ -0,0 +1,68 @@
+"""
+Process Name Index Tests
+Substring lookups against the trigram index and when the process list is reloaded
+"""
+
+from process_index import ProcessNameIndex
+
+PROCESSES = [
+    {'pid': 1, 'name': 'Spotify.exe'},
+    {'pid': 2, 'name': 'chrome.exe'},
+    {'pid': 3, 'name': 'chrome.exe'},
+    {'pid': 4, 'name': 'Discord.exe'},
+    {'pid': 5, 'name': 'vlc'},
+    {'pid': 6, 'name': ''},
+]
+
+class CountingLoader:
+    def __init__(self, processes):
+        self.processes = processes
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        return list(self.processes)
+
+def test_find_matches_substrings_case_insensitively():
+    index = ProcessNameIndex(CountingLoader(PROCESSES), ttl=60)
+    assert [p['pid'] for p in index.find('SPOTIFY')] == [1]
+    assert sorted(p['pid'] for p in index.find('chrome.exe')) == [2, 3]
+    assert [p['pid'] for p in index.find('cord')] == [4]
+    assert index.find('firefox') == []
+    # Processes without a name are not indexed
+    assert len(index) == 5
+
+def test_short_fragments_fall_back_to_a_scan():
+    index = ProcessNameIndex(CountingLoader(PROCESSES), ttl=60)
+    assert [p['pid'] for p in index.find('vl')] == [5]
+    assert sorted(p['pid'] for p in index.find('.e')) == [1, 2, 3, 4]
+    assert index.contains('c')
+    assert not index.contains('zz')
+
+def test_reloads_only_when_stale():
+    loader = CountingLoader(PROCESSES)
+    index = ProcessNameIndex(loader, ttl=60)
+    index.find('spotify')
+    index.contains('chrome')
+    index.ensure_fresh()
+    assert loader.calls == 1
+    assert index.reloads == 1
+    assert index.hits == 2
+    
+    loader.processes = [{'pid': 7, 'name': 'firefox.exe'}]
+    assert not index.contains('firefox')
+    index.invalidate()
+    assert index.contains('firefox')
+    assert not index.contains('spotify')
+    assert loader.calls == 2
+
+def test_loader_errors_keep_the_previous_snapshot():
+    loader = CountingLoader(PROCESSES)
+    index = ProcessNameIndex(loader, ttl=60)
+    index.ensure_fresh()
+    
+    def failing():
+        raise OSError("process list unavailable")
+    index.loader = failing
+    index.invalidate()
+    assert index.contains('spotify')
@@ -0,0 +1,58 @@
+"""
+Task Pool Tests
+Keyed submissions share one future while the task is in flight
+"""
+
+import threading
+
+import pytest
+
+from task_pool import TaskPool
+
+@pytest.fixture
+def pool():
+    pool = TaskPool(max_workers=2, name="hotvolume-test")
+    yield pool
+    pool.shutdown(wait=True)
+
+def test_same_key_returns_the_in_flight_future(pool):
+    release = threading.Event()
+    calls = []
+    
+    def task(value):
+        calls.append(value)
+        release.wait(5)
+        return value
+    
+    first = pool.submit(task, 1, key='refresh')
+    second = pool.submit(task, 2, key='refresh')
+    other = pool.submit(task, 3, key='scan')
+    assert second is first
+    assert other is not first
+    assert pool.in_flight() == 2
+    
+    release.set()
+    assert first.result(timeout=5) == 1
+    assert other.result(timeout=5) == 3
+    assert sorted(calls) == [1, 3]
+
+def test_key_is_released_when_the_task_finishes(pool):
+    first = pool.submit(lambda: 'first', key='refresh')
+    assert first.result(timeout=5) == 'first'
+    second = pool.submit(lambda: 'second', key='refresh')
+    assert second is not first
+    assert second.result(timeout=5) == 'second'
+    assert pool.in_flight() == 0
+
+def test_unkeyed_tasks_are_never_deduplicated(pool):
+    futures = [pool.submit(lambda value=value: value) for value in range(4)]
+    assert [future.result(timeout=5) for future in futures] == [0, 1, 2, 3]
+    assert pool.in_flight() == 0
+
+def test_failed_task_releases_its_key(pool):
+    def fail():
+        raise RuntimeError("boom")
+    failed = pool.submit(fail, key='refresh')
+    with pytest.raises(RuntimeError):
+        failed.result(timeout=5)
+    assert pool.submit(lambda: 'retry', key='refresh').result(timeout=5) == 'retry'